@@ -1 +1,10 @@
 from .daptics_client import *
+from .async_client import *
+from .campaign import *
+from .store import *
+from .table import *
+from .space import *
+from .validation import *
+from .mixture import *
+from .random_experiments import *
+from .design_space import *
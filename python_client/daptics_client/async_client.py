@@ -0,0 +1,586 @@
+"""# Asynchronous Python API Client
+
+An `asyncio` counterpart of the `DapticsClient` class, for use from an
+already-running event loop, such as a Jupyter notebook or a service that
+drives many daptics sessions concurrently. GraphQL requests and file
+downloads are sent with a pooled `aiohttp` session.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import asyncio
+import os
+import re
+import time
+
+import graphql
+import gql
+from graphql.execution import ExecutionResult
+
+from .daptics_client import (
+    DapticsClient, ConnectionPoolStats, NoHostError, IncompatibleApiError,
+    cached_gql, cached_print_ast, encode_payload)
+
+AIOHTTP_INSTALL = 'Please install with "pip install aiohttp>=3.6".'
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncHTTPTransport(object):
+    """An asynchronous GraphQL transport that sends HTTP POST requests with
+    a pooled `aiohttp.ClientSession`. The session is created on first use,
+    inside the running event loop.
+
+    # Arguments
+    url (str):
+        The GraphQL endpoint URL.
+
+    auth (`TokenAuth`):
+        The authentication object whose `token` is sent as a "Bearer" token.
+
+    verify (bool):
+        If False, the server's SSL certificates are not verified.
+
+    pool_connections (int):
+        The number of hosts to size the connection pool for.
+
+    pool_maxsize (int):
+        The maximum number of connections to a single host.
+
+    keep_alive (bool):
+        If False, connections are closed after every request.
+
+    # Attributes
+    stats (`ConnectionPoolStats`):
+        Counters for connection re-use.
+    """
+
+    def __init__(self, url, auth, verify=True, pool_connections=4, pool_maxsize=10, keep_alive=True):
+        if aiohttp is None:
+            raise Exception('Could not import aiohttp. ' + AIOHTTP_INSTALL)
+        self.url = url
+        self.auth = auth
+        self.verify = verify
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.stats = ConnectionPoolStats()
+        self.session = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create_end)
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections * self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+                force_close=not self.keep_alive,
+                ssl=None if self.verify else False)
+            self.session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[trace_config])
+        return self.session
+
+    async def _on_request_start(self, session, context, params):
+        self.stats.record_request()
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.stats.record_miss()
+
+    def _headers(self):
+        if self.auth is not None and self.auth.token is not None:
+            return {'Authorization': 'Bearer ' + self.auth.token}
+        return {}
+
+    async def execute(self, document, variable_values=None, timeout=None):
+        """Executes the document with an HTTP request and returns
+        a `graphql.execution.ExecutionResult`."""
+        payload = {'query': cached_print_ast(document)}
+        if variable_values:
+            payload['variables'] = variable_values
+
+        headers = self._headers()
+        post_args = {'json': payload}
+        body = encode_payload(payload)
+        if body is not None:
+            post_args = {'data': body}
+            headers['Content-Type'] = 'application/json'
+
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with self._get_session().post(
+                self.url, headers=headers, timeout=client_timeout, **post_args) as response:
+            try:
+                result = await response.json(content_type=None)
+                if not isinstance(result, dict):
+                    raise ValueError
+            except ValueError:
+                result = {}
+
+            if 'errors' not in result and 'data' not in result:
+                response.raise_for_status()
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message='Server did not return a GraphQL result')
+        return ExecutionResult(errors=result.get('errors'), data=result.get('data'))
+
+    async def get(self, url, params=None):
+        """Sends an HTTP GET request and returns a tuple of the
+        `aiohttp.ClientResponse` and the body of the response."""
+        async with self._get_session().get(url, params=params) as response:
+            content = await response.read()
+        return (response, content)
+
+    async def close(self):
+        """Closes all pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncDapticsClient(DapticsClient):
+    """An `asyncio` version of `DapticsClient`. Every method that makes a
+    request to the API is a coroutine that must be awaited, and can be called
+    from a running event loop. The client's attributes, runtime options and
+    return values are the same as for `DapticsClient`.
+
+    GraphQL requests and file downloads share a pooled `aiohttp` session,
+    configured by the `http_pool_connections`, `http_pool_maxsize` and
+    `http_keep_alive` options. The `aiohttp` package must be installed.
+
+    # Examples
+    ```python
+    >>> daptics = AsyncDapticsClient('https://api.daptics.ai')
+    >>> await daptics.connect()
+    >>> await daptics.login(email, password)
+    >>> await daptics.create_session('my session', 'description')
+    ```
+    """
+
+    def __init__(self, host=None, config=None):
+        super().__init__(host, config)
+
+        self.transport = None
+        """The `AsyncHTTPTransport` used to make GraphQL requests and downloads."""
+
+    async def connect(self):
+        """Reads and processes client configuration, creates the asynchronous
+        HTTP transport, checks the compatibility of the API and loads the GraphQL
+        schema. See `DapticsClient.connect`.
+
+        # Returns
+        Nothing
+
+        # Raises
+        IncompatibleApiError
+            If the API at `self.host` requires a higher client version number.
+
+        NoHostError
+            If there is no config file specifed and no host has been set.
+        """
+        if self.gql is None:
+            self.init_config()
+            if self.host is None:
+                raise NoHostError()
+
+            ws_host = re.sub(r'^http', 'ws', self.host)
+            self.api_url = '{0}/api'.format(self.host)
+            self.websocket_url = '{0}/socket/websocket'.format(ws_host)
+
+            self.transport = AsyncHTTPTransport(
+                self.api_url,
+                self.auth,
+                verify=self._options['verify_ssl_certificates'],
+                pool_connections=self._options['http_pool_connections'],
+                pool_maxsize=self._options['http_pool_maxsize'],
+                keep_alive=self._options['http_keep_alive'])
+            self.gql = gql.Client()
+
+        compat = await self.check_api_compatibility()
+        if compat['compatible'] is not None and not compat['compatible']:
+            raise IncompatibleApiError(self.host, compat['minimumClientVersion'])
+
+        if self.gql.schema is None:
+            await self._load_schema(compat.get('version'))
+
+    async def _load_schema(self, version):
+        fname = self.schema_cache_file(version)
+        introspection = self._read_cached_schema(fname)
+        if introspection is None:
+            data, errors = await self.call_api(
+                cached_gql(graphql.introspection_query), None)
+            self._raise_exception_on_error(data, errors)
+            introspection = data
+            self._write_cached_schema(fname, introspection)
+
+        self.gql = gql.Client(introspection=introspection)
+
+    def connection_pool_stats(self):
+        """Returns the connection re-use counters for the client's `transport`.
+
+        # Returns
+        stats (dict):
+            A Python `dict` with `requests`, `hits` and `misses` items.
+        """
+        if self.transport is None:
+            return ConnectionPoolStats().as_dict()
+        return self.transport.stats.as_dict()
+
+    async def close(self):
+        """Closes all pooled HTTP connections, the task websocket connection
+        and the experiment store. The client can be used again after calling `connect`.
+        See `DapticsClient.close` for clients created by `session_client`.
+        """
+        parent = self._parent
+        if self.transport is not None:
+            if parent is None or self.transport is not parent.transport:
+                await self.transport.close()
+            self.transport = None
+        if self.task_socket is not None:
+            await self.task_socket.close()
+            self.task_socket = None
+        if self.store is not None:
+            if parent is None or self.store is not parent.store:
+                self.store.close()
+            self.store = None
+        self.gql = None
+
+    async def execute_query(self, document, vars, timeout=None):
+        """See `DapticsClient.execute_query`."""
+        data, errors = await self.call_api(document, vars, timeout=timeout)
+        self._raise_exception_on_error(data, errors)
+        return data
+
+    async def call_api(self, document, vars, timeout=None):
+        """See `DapticsClient.call_api`."""
+        self._validate(document)
+
+        try:
+            result = await self.transport.execute(
+                document, variable_values=vars, timeout=timeout)
+            return (result.data, result.errors)
+        except Exception as e:
+            return (None, [{'message': str(e)}])
+
+    async def run_task_async(self, document, vars):
+        """See `DapticsClient.run_task_async`."""
+        loop = asyncio.get_event_loop()
+        task_future = loop.create_future()
+        await self._do_run_async(document, vars, loop, task_future)
+        return task_future.result()
+
+    async def _start_task(self, key, doc, vars):
+        if self._options.get('run_tasks_async', False):
+            data, errors = await self.run_task_async(doc, vars)
+        else:
+            data, errors = await self.call_api(doc, vars)
+        self._raise_exception_on_error(data, errors)
+
+        if self._task_started(key, data):
+            if self._options.get('return_task_handles', False):
+                return self.task_watcher.watch(data[key], self)
+            auto_task = await self._auto_task()
+            if auto_task is not None:
+                return {key: auto_task}
+        return data
+
+    async def _auto_task(self, timeout_override=None):
+        timeout = timeout_override
+        if timeout is None:
+            timeout = self._options.get('auto_task_timeout')
+        if timeout is None:
+            return None
+
+        data, errors = await self.wait_for_current_task(
+            task_type=None, timeout=timeout)
+        self._raise_exception_on_error(data, errors)
+
+        return data['currentTask']
+
+    async def check_api_compatibility(self):
+        """See `DapticsClient.check_api_compatibility`."""
+        vars = {
+            'clientVersion': self.client_version
+        }
+        data = await self.execute_query(cached_gql(self.CLIENT_COMPATIBILITY_QUERY), vars)
+        return data['clientCompatibility']
+
+    async def login(self, email=None, password=None):
+        """See `DapticsClient.login`."""
+        vars = self._login_vars(email, password)
+        data = await self.execute_query(cached_gql(self.LOGIN_MUTATION), vars)
+        self._set_login(data)
+        return data
+
+    async def create_session(self, name, description):
+        """See `DapticsClient.create_session`."""
+        vars = {
+            'session': {
+                'userId': self.user_id,
+                'name': name,
+                'description': description,
+                'demo': False
+            }
+        }
+        data, errors = await self.call_api(cached_gql(self.CREATE_SESSION_MUTATION), vars)
+        return self._set_created_session(data, errors)
+
+    async def list_sessions(self, user_id=None, name=None):
+        """See `DapticsClient.list_sessions`."""
+        return await super().list_sessions(user_id, name)
+
+    async def reconnect_session(self, session_id):
+        """See `DapticsClient.reconnect_session`."""
+        vars = {
+            'sessionId': session_id
+        }
+        data = await self.execute_query(cached_gql(self.SESSION_QUERY), vars)
+        self._set_reconnected_session(data)
+        return data
+
+    async def is_session_fresh(self):
+        """See `DapticsClient.is_session_fresh`."""
+        if self.session_id is None:
+            return False
+        vars = {
+            'sessionId': self.session_id
+        }
+        data = await self.execute_query(cached_gql(self.SESSION_FRESHNESS_QUERY), vars)
+        return self._session_matches(data)
+
+    async def halt_session(self, session_id):
+        """See `DapticsClient.halt_session`."""
+        return await super().halt_session(session_id)
+
+    async def put_experimental_parameters(self, params):
+        """See `DapticsClient.put_experimental_parameters`."""
+        return await super().put_experimental_parameters(params)
+
+    async def put_experimental_parameters_csv(self, fname, params):
+        """See `DapticsClient.put_experimental_parameters_csv`."""
+        return await super().put_experimental_parameters_csv(fname, params)
+
+    async def get_experiments(self, design_only=False, gen=None):
+        """See `DapticsClient.get_experiments`."""
+        return await super().get_experiments(design_only, gen)
+
+    async def get_experiments_history(self):
+        """See `DapticsClient.get_experiments_history`."""
+        vars = {
+            'sessionId': self.session_id
+        }
+        data = await self.execute_query(cached_gql(self.EXPERIMENTS_HISTORY_QUERY), vars)
+        self._set_experiments_history(data)
+        return data
+
+    async def sync_experiments_history(self):
+        """See `DapticsClient.sync_experiments_history`."""
+        if self.experiments_history is None and self._stored_history() is None:
+            await self.get_experiments_history()
+            return self.experiments_history
+
+        gens = self._history_sync_gens()
+        results = await self._history_sync_batch(gens, True).execute_async()
+        server_gen = self._history_server_gen(results.pop(0))
+        more = list(range(gens[-1] + 1, server_gen + 1))
+        if len(more) > 0:
+            gens += more
+            results += await self._history_sync_batch(more, False).execute_async()
+        self._merge_experiments_history(server_gen, gens, results)
+        return self.experiments_history
+
+    async def get_experiments_history_since(self, gen):
+        """See `DapticsClient.get_experiments_history_since`."""
+        history = await self.sync_experiments_history()
+        return self._history_since(history, gen)
+
+    async def get_generated_design(self, gen=None):
+        """See `DapticsClient.get_generated_design`."""
+        design = self._stored_design(gen)
+        if design is None:
+            data = await self.get_experiments(design_only=True, gen=gen)
+            design = data['experiments']
+            self._store_design(design)
+        return design
+
+    async def simulate_experiment_responses(self, experiments=None):
+        """See `DapticsClient.simulate_experiment_responses`."""
+        return await super().simulate_experiment_responses(experiments)
+
+    async def simulate_experiment_responses_csv(self, fname):
+        """See `DapticsClient.simulate_experiment_responses_csv`."""
+        return await super().simulate_experiment_responses_csv(fname)
+
+    async def put_experiments(self, experiments_type, experiments):
+        """See `DapticsClient.put_experiments`."""
+        return await super().put_experiments(experiments_type, experiments)
+
+    async def put_experiments_csv(self, experiments_type, fname):
+        """See `DapticsClient.put_experiments_csv`."""
+        return await super().put_experiments_csv(experiments_type, fname)
+
+    async def generate_design(self, gen=None):
+        """See `DapticsClient.generate_design`."""
+        return await super().generate_design(gen)
+
+    async def start_simulation(self, ngens, params):
+        """See `DapticsClient.start_simulation`."""
+        return await super().start_simulation(ngens, params)
+
+    async def start_simulation_csv(self, ngens, fname, params):
+        """See `DapticsClient.start_simulation_csv`."""
+        return await super().start_simulation_csv(ngens, fname, params)
+
+    async def generate_analytics(self):
+        """See `DapticsClient.generate_analytics`."""
+        return await super().generate_analytics()
+
+    async def poll_for_current_task(self, task_type=None):
+        """See `DapticsClient.poll_for_current_task`."""
+        vars = self._current_task_vars(task_type)
+        data, errors = await self.call_api(cached_gql(self.CURRENT_TASK_STATUS_QUERY), vars)
+        if self._task_succeeded(data):
+            vars['taskId'] = data['currentTask']['taskId']
+            full_data, full_errors = await self.call_api(
+                cached_gql(self.CURRENT_TASK_QUERY), vars)
+            if not full_data or full_data.get('currentTask') is None:
+                return self._task_result_failed(full_errors)
+            data, errors = full_data, full_errors
+
+        data, type_ = self._process_current_task(data)
+        if type_ == 'update' and self._should_auto_generate():
+            await asyncio.sleep(0.2)
+            task_data = await self.generate_design()
+            data['currentTask']['autoGenerateTask'] = task_data['generateDesign']
+        elif type_ == 'analytics':
+            auto_export_path = self._options.get('auto_export_path')
+            if auto_export_path is not None:
+                await self.download_all_analytics_files(
+                    self.analytics, auto_export_path, True)
+        return (data, errors)
+
+    async def wait_for_current_task(self, task_type=None, timeout=None):
+        """See `DapticsClient.wait_for_current_task`."""
+        max_time = self._wait_max_time(timeout)
+
+        sub_id = None
+        if self._options.get('wait_with_subscription', False):
+            sub_id = await self._subscribe_task_updates(asyncio.get_event_loop(), task_type)
+
+        wait_started = time.time()
+        last_progress = None
+        retry = 0
+        while True:
+            data, errors = await self.poll_for_current_task(task_type)
+            done, errors = self._check_task_wait(data, errors, retry, max_time)
+            if done:
+                self._record_task_duration(data, wait_started)
+                return (data, errors)
+
+            retry += 1
+            if sub_id is not None:
+                if await self._wait_for_task_update(sub_id, max_time):
+                    continue
+                sub_id = None
+            interval, last_progress = self._poll_interval(data, wait_started, last_progress, max_time)
+            await asyncio.sleep(interval)
+
+    async def download_all_analytics_files(self, analytics, directory=".", name_by_gen=False):
+        """See `DapticsClient.download_all_analytics_files`."""
+        file_count = 0
+        if analytics is not None and 'files' in analytics:
+            gen = analytics.get('gen')
+            path = os.path.abspath(directory)
+
+            for file in analytics['files']:
+                if 'url' in file and 'filename' in file:
+                    url, params = self.download_url_and_params(file['url'])
+                    response, content = await self.transport.get(url, params=_query_items(params))
+                    if response.status == 200 and content is not None:
+                        if file_count == 0:
+                            os.makedirs(path, exist_ok=True)
+                        filename = file['filename']
+                        if name_by_gen and (gen is not None):
+                            filename = 'auto_gen{}_{}'.format(gen, filename)
+                        save_as = os.path.join(path, filename)
+                        with open(save_as, 'wb') as pdf_file:
+                            pdf_file.write(content)
+                            file_count += 1
+
+        return file_count
+
+    async def download_analytics_file(self, file_url, fname):
+        """See `DapticsClient.download_analytics_file`.
+
+        # Returns
+        response (`aiohttp.ClientResponse`)
+            The `aiohttp` library's `response` object for the authenticated HTTP request.
+        """
+        url, params = self.download_url_and_params(file_url)
+        response, content = await self.transport.get(url, params=_query_items(params))
+        if response.status == 200 and content is not None:
+            with open(fname, "wb") as pdf_file:
+                pdf_file.write(content)
+        return response
+
+    async def export_generated_design_csv(self, fname, gen=None):
+        """See `DapticsClient.export_generated_design_csv`."""
+        design = await self.get_generated_design(gen=gen)
+        self.export_csv(fname, design['table'], True)
+        return design
+
+    async def export_generated_design_arrow(self, fname, gen=None, file_format=None):
+        """See `DapticsClient.export_generated_design_arrow`."""
+        design = await self.get_generated_design(gen=gen)
+        self._write_design_arrow(fname, design, file_format)
+        return design
+
+    async def _update_history_for_export(self):
+        if self.get_store() is not None:
+            await self.sync_experiments_history()
+        elif self.experiments_history is None:
+            await self.get_experiments_history()
+
+    async def export_experiments_history_arrow(self, fname, file_format=None):
+        """See `DapticsClient.export_experiments_history_arrow`."""
+        await self._update_history_for_export()
+        return self._write_experiments_history_arrow(fname, self.experiments_history, file_format)
+
+    async def export_experiments_history_csv(self, fname):
+        """See `DapticsClient.export_experiments_history_csv`."""
+        await self._update_history_for_export()
+        return self._write_experiments_history_csv(fname, self.experiments_history)
+
+
+# `aiohttp` does not accept lists as query parameter values, as
+# returned by `urllib.parse.parse_qs`.
+def _query_items(params):
+    items = []
+    for key, value in params.items():
+        if isinstance(value, list):
+            items.extend((key, v) for v in value)
+        else:
+            items.append((key, value))
+    return items
@@ -0,0 +1,219 @@
+"""# Campaign Runner
+
+Runs many independent optimization campaigns in parallel, each in its own
+daptics session, from a single connected and logged-in `DapticsClient`.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import concurrent.futures
+import threading
+import time
+
+from .daptics_client import DapticsExperimentsType, TaskFailedError
+
+
+class CampaignRunner(object):
+    """Drives several optimization campaigns at once, with at most `max_workers`
+    campaigns running at any time. Each campaign is run in its own session by a
+    client created with `DapticsClient.session_client`, so session state is not shared,
+    while the HTTP connection pool, schema and access token are. Set the client's
+    `http_pool_maxsize` option to at least `max_workers` before connecting, so that
+    every worker can keep its connection open.
+
+    Each campaign creates a session, saves the experimental space parameters, and
+    generates the first design (or uploads initial experiments, which generates
+    the first design). Then, for each generation, the `response_function` is called
+    to perform the designed experiments, and the experiments and their responses are
+    uploaded, which generates the next design. Optionally, analytics are generated
+    at the end.
+
+    # Arguments
+    client (`DapticsClient`):
+        A connected client that has logged in.
+
+    response_function (function):
+        Called as `response_function(client, design)`, where `client` is the campaign's
+        session client, and `design` is the client's `design` attribute. Must return an
+        experiments `dict` with `colHeaders` and `data` items, as for the `put_experiments`
+        method, with the responses filled in. It is called from worker threads.
+
+    max_workers (int, optional):
+        The maximum number of campaigns that run at the same time.
+
+    generations (int, optional):
+        The number of generations of experiments to perform in each campaign, unless
+        a campaign specifies its own number.
+
+    analytics (bool, optional):
+        If True, generate analytics at the end of each campaign.
+
+    task_timeout (float, optional):
+        The maximum number of seconds to wait for each task. A negative number
+        means to wait indefinitely.
+
+    # Examples
+    ```python
+    >>> def respond(client, design):
+    ...     space = client.validated_params['space']
+    ...     return client.random_experiments_with_responses(space, design)
+    >>> runner = CampaignRunner(daptics, respond, max_workers=8, generations=5)
+    >>> results = runner.run([
+    ...     {'name': 'campaign {}'.format(i), 'description': 'batch run', 'params': space_params}
+    ...     for i in range(20)])
+    >>> runner.generations_per_minute()
+    ```
+    """
+
+    def __init__(self, client, response_function, max_workers=4, generations=1,
+                 analytics=False, task_timeout=-1):
+        self.client = client
+        self.response_function = response_function
+        self.max_workers = max_workers
+        self.generations = generations
+        self.analytics = analytics
+        self.task_timeout = task_timeout
+
+        self.generations_completed = 0
+        """The number of generations of experiments uploaded by all campaigns
+        in the last call to `run`."""
+
+        self.elapsed = 0.0
+        """The number of seconds taken by the last call to `run`."""
+
+        self._lock = threading.Lock()
+
+    def run(self, campaigns):
+        """Runs the campaigns and waits for all of them to finish.
+
+        # Arguments
+        campaigns (list):
+            A list of Python `dict`s, one for each campaign, with these items:
+
+        `name` - the session name, which must be unique
+
+        `description` - the session description
+
+        `params` - the experimental space parameters, as for the
+        `put_experimental_parameters` method
+
+        `generations` - optional, overrides the runner's `generations`
+
+        `initial_experiments` - optional initial experiments with responses, as for the
+        `put_experiments` method with the `INITIAL_EXTRAS_ONLY` experiments type
+
+        # Returns
+        results (list):
+            A list of Python `dict`s, in the order of `campaigns`, with these items:
+
+        `name` - the session name
+
+        `client` - the session client for the campaign
+
+        `session_id` - the id of the created session, or None
+
+        `gen` - the last generation number of the session
+
+        `generations` - the number of generations of experiments uploaded
+
+        `elapsed` - the number of seconds the campaign took
+
+        `error` - the exception that stopped the campaign, or None
+        """
+        self.generations_completed = 0
+        started = time.time()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_campaign, campaign) for campaign in campaigns]
+            results = [future.result() for future in futures]
+        self.elapsed = time.time() - started
+        return results
+
+    def generations_per_minute(self):
+        """Returns the throughput of the last call to `run`, in generations
+        of experiments uploaded per minute, over all campaigns."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.generations_completed * 60.0 / self.elapsed
+
+    def stats(self):
+        """Returns a Python `dict` with the `generations`, `elapsed` and
+        `generations_per_minute` for the last call to `run`."""
+        return {'generations': self.generations_completed,
+                'elapsed': self.elapsed,
+                'generations_per_minute': self.generations_per_minute()}
+
+    def _run_campaign(self, campaign):
+        client = self.client.session_client()
+        # Each step blocks this worker until its task has finished.
+        client.set_options({
+            'auto_task_timeout': self.task_timeout,
+            'auto_generate_next_design': True,
+            'return_task_handles': False,
+            'run_tasks_async': False,
+            'wait_with_subscription': False
+        })
+        result = {'name': campaign['name'], 'client': client, 'session_id': None,
+                  'gen': None, 'generations': 0, 'elapsed': 0.0, 'error': None}
+        started = time.time()
+        try:
+            self._do_run_campaign(client, campaign, result)
+        except Exception as e:
+            result['error'] = e
+        result['session_id'] = client.session_id
+        result['gen'] = client.gen
+        result['elapsed'] = time.time() - started
+        return result
+
+    def _do_run_campaign(self, client, campaign, result):
+        if client.create_session(campaign['name'], campaign.get('description', '')) is None:
+            raise TaskFailedError('create')
+
+        client.put_experimental_parameters(campaign['params'])
+        if client.validated_params is None:
+            raise TaskFailedError('space')
+
+        initial_experiments = campaign.get('initial_experiments')
+        if initial_experiments is not None:
+            client.put_experiments(DapticsExperimentsType.INITIAL_EXTRAS_ONLY, initial_experiments)
+        else:
+            client.generate_design()
+
+        generations = campaign.get('generations', self.generations)
+        for i in range(generations):
+            if client.design is None:
+                raise TaskFailedError('generate')
+            if client.completed:
+                break
+            experiments = self.response_function(client, client.design)
+            # Don't generate a design that no one will use.
+            client.set_option('auto_generate_next_design', i < generations - 1)
+            design = client.design
+            client.put_experiments(DapticsExperimentsType.DESIGNED_WITH_OPTIONAL_EXTRAS, experiments)
+            if client.design is design:
+                raise TaskFailedError('update')
+            result['generations'] += 1
+            with self._lock:
+                self.generations_completed += 1
+
+        if self.analytics:
+            client.generate_analytics()
@@ -34,21 +34,35 @@ IN THE SOFTWARE.
 
 import asyncio
 from async_timeout import timeout as atimeout
+import collections
+import concurrent.futures
+import copy
 import csv
+import datetime
 import enum
+import functools
+import gzip
+import io
 import os
 import json
 import pprint
 import random
 import re
 import requests
+import requests.adapters
 import requests.auth
+import threading
 import time
 import sys
 import json
 import logging
 import urllib.parse
 from phoenix import Phoenix, Absinthe
+from phoenix.exceptions import CommunicationError, ConnectionClosed
+from .mixture import MixtureCompositions
+from .store import ExperimentStore
+from .table import Table, numpy
+from .validation import ExperimentsValidator, ValidationReport
 
 GRAPHQL_INSTALL = 'Please install with "pip install graphql-core>=2.3.2,<3".'
 GQL_INSTALL = 'Please install with "pip install gql>=2,<3".'
@@ -65,6 +79,8 @@ if graphql_version < (2, 3, 2) or graphql_version >= (3, 0, 0):
     raise Exception(f'Incorrect graphql version {graphql_version}. ' + GRAPHQL_INSTALL)
 
 from graphql import GraphQLError
+from graphql.language import ast as graphql_ast
+from graphql.execution import ExecutionResult
 from graphql.language.printer import print_ast
 
 try:
@@ -103,6 +119,722 @@ class TokenAuth(requests.auth.AuthBase):
         return r
 
 
+# Pooled HTTP connections shared by the GraphQL transport and file downloads
+
+class ConnectionPoolStats(object):
+    """Counters for the connections checked out of a `ConnectionPool`.
+
+    # Attributes
+    requests (int):
+        The number of times a connection was checked out of the pool.
+
+    misses (int):
+        The number of times a TCP (and TLS) connection had to be opened
+        because no idle keep-alive connection was available for the host.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    @property
+    def hits(self):
+        """The number of requests that re-used an idle keep-alive connection."""
+        return self.requests - self.misses
+
+    def as_dict(self):
+        """Returns the counters as a Python `dict`."""
+        return {'requests': self.requests, 'hits': self.hits, 'misses': self.misses}
+
+
+def _counting_pool_class(pool_class, stats):
+    # Subclass a urllib3 connection pool class so that every checkout and
+    # every socket that is (re)opened is recorded in `stats`.
+    conn_class = pool_class.ConnectionCls
+
+    def connect(self):
+        stats.record_miss()
+        return conn_class.connect(self)
+
+    def _get_conn(self, timeout=None):
+        stats.record_request()
+        return pool_class._get_conn(self, timeout=timeout)
+
+    counting_conn_class = type('Counting' + conn_class.__name__, (conn_class,),
+                               {'connect': connect})
+    return type('Counting' + pool_class.__name__, (pool_class,),
+                {'ConnectionCls': counting_conn_class, '_get_conn': _get_conn})
+
+
+class _CountingHTTPAdapter(requests.adapters.HTTPAdapter):
+    """A `requests` transport adapter whose connection pools report
+    their hits and misses to a `ConnectionPoolStats` object."""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_class, self.stats)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class ConnectionPool(object):
+    """A client-owned `requests.Session` with a configurable pool of keep-alive
+    connections. The same session is used by the GraphQL HTTP transport and
+    by the analytics file download methods, so that TCP and TLS handshakes
+    are only paid once per pooled connection.
+
+    # Arguments
+    pool_connections (int):
+        The number of per-host connection pools to keep.
+
+    pool_maxsize (int):
+        The maximum number of connections to keep open to a single host.
+
+    pool_block (bool):
+        If True, a request will wait for a free connection instead of opening
+        more than `pool_maxsize` connections to a single host.
+
+    keep_alive (bool):
+        If False, connections are closed after every request.
+
+    # Attributes
+    session (`requests.Session`):
+        The pooled session.
+
+    stats (`ConnectionPoolStats`):
+        Counters for connection re-use.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, pool_block=False, keep_alive=True):
+        self.stats = ConnectionPoolStats()
+        self.session = requests.Session()
+        adapter = _CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block)
+        for prefix in ('http://', 'https://'):
+            self.session.mount(prefix, adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+
+# Module-level registry of parsed GraphQL documents
+
+_parsed_documents = {}
+_printed_documents = {}
+_documents_lock = threading.Lock()
+
+# The merged documents of `QueryBatch` requests, which vary with the queries
+# in each batch, are kept apart in a bounded, least-recently-used registry.
+_batch_documents = collections.OrderedDict()
+_BATCH_DOCUMENTS_MAXSIZE = 64
+
+
+def cached_gql(source):
+    """Parses a GraphQL query, mutation or subscription, like `gql.gql`, but
+    only once per source string. The parsed `Document` is shared by all
+    `DapticsClient` instances, so the same object is returned for the same source,
+    and its validation result can be re-used by a `DocumentValidationCache`.
+
+    # Arguments
+    source (str):
+        The GraphQL document source.
+
+    # Returns
+    document (`graphql.language.ast.Document`):
+        The parsed document.
+    """
+    document = _parsed_documents.get(source)
+    if document is None:
+        with _documents_lock:
+            document = _parsed_documents.get(source)
+            if document is None:
+                document = gql.gql(source)
+                _parsed_documents[source] = document
+    return document
+
+
+def cached_print_ast(document):
+    """Returns the printed form of a parsed GraphQL document. The printed form
+    of documents obtained from `cached_gql` is computed only once.
+
+    # Arguments
+    document (`graphql.language.ast.Document`):
+        The parsed document.
+
+    # Returns
+    query (str):
+        The document printed as a GraphQL query string.
+    """
+    printed = _printed_documents.get(id(document))
+    if printed is not None and printed[0] is document:
+        return printed[1]
+    query = print_ast(document)
+    source = getattr(getattr(document, 'loc', None), 'source', None)
+    if source is not None and (_parsed_documents.get(source.body) is document or
+                               _batch_documents.get(source.body) is document):
+        with _documents_lock:
+            _printed_documents[id(document)] = (document, query)
+    return query
+
+
+def _batch_document(source):
+    # Parses the merged query of a batch once while it is in the bounded
+    # registry. Evicted documents are also dropped from `_printed_documents`.
+    document = _batch_documents.get(source)
+    if document is None:
+        document = gql.gql(source)
+    with _documents_lock:
+        document = _batch_documents.setdefault(source, document)
+        _batch_documents.move_to_end(source)
+        while len(_batch_documents) > _BATCH_DOCUMENTS_MAXSIZE:
+            _source, evicted = _batch_documents.popitem(last=False)
+            _printed_documents.pop(id(evicted), None)
+    return document
+
+
+# CSV tables read and serialized in a single pass
+
+def open_csv(fname):
+    """Opens a CSV file for reading as text. Files whose name ends with ".gz", or
+    that start with the gzip magic number, are decompressed while they are read.
+
+    # Arguments
+    fname (str):
+        The location of the file on the filesystem.
+
+    # Returns
+    file (file object):
+        A text file object opened with `newline=''`, as required by `csv.reader`.
+    """
+    with open(fname, 'rb') as f:
+        magic = f.read(2)
+    if fname.endswith('.gz') or magic == b'\x1f\x8b':
+        return gzip.open(fname, 'rt', newline='')
+    return open(fname, newline='')
+
+
+def read_csv_rows(fname):
+    """Reads all the rows of a (possibly gzipped) CSV file, skipping empty lines.
+
+    # Arguments
+    fname (str):
+        The location of the file on the filesystem.
+
+    # Returns
+    rows (list):
+        A list with a list of strings for each row.
+    """
+    with open_csv(fname) as csvfile:
+        return [row for row in csv.reader(csvfile, delimiter=',') if len(row) > 0]
+
+
+class EncodedTable(object):
+    """An experiments table that has already been serialized as the JSON
+    for a `DataFrameInput` value. Create one with `EncodedTable.from_csv`,
+    which reads, checks and serializes a CSV file row by row, so that only the
+    compact JSON text is held in memory rather than a list of lists of strings.
+
+    An `EncodedTable` can be used in place of a table `dict` in the variables
+    of a request. The client's HTTP transports insert the JSON text directly into
+    the request body.
+
+    # Arguments
+    col_headers (list):
+        The column names.
+
+    num_rows (int):
+        The number of data rows.
+
+    body (bytes):
+        The UTF-8 encoded JSON object, with `colHeaders` and `data` items.
+    """
+
+    ROWS_PER_CHUNK = 1000
+    """The number of rows that are serialized together."""
+
+    def __init__(self, col_headers, num_rows, body):
+        self.col_headers = col_headers
+        self.num_rows = num_rows
+        self.body = body
+        self.report = None
+
+    def __len__(self):
+        return self.num_rows
+
+    @classmethod
+    def from_csv(cls, fname, validator=None):
+        """Reads a (possibly gzipped) CSV file with a header row. Empty lines are skipped.
+
+        # Arguments
+        fname (str):
+            The location of the file on the filesystem.
+
+        validator (`ExperimentsValidator`, optional):
+            If given, the header and each chunk of rows are checked as they are read,
+            and the result is saved in the table's `report` attribute.
+
+        # Returns
+        table (`EncodedTable`)
+
+        # Raises
+        CsvNoDataRowsError
+            If the file does not have a header row and at least one data row.
+
+        CsvRowLengthError
+            If a data row does not have the same number of columns as the header row.
+        """
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        with open_csv(fname) as csvfile:
+            reader = csv.reader(csvfile, delimiter=',')
+            col_headers = next((row for row in reader if len(row) > 0), None)
+            if col_headers is None:
+                raise CsvNoDataRowsError(fname)
+            report = None
+            if validator is not None:
+                report = ValidationReport(validator.check_header(col_headers))
+            body = io.BytesIO()
+            body.write('{{"colHeaders":{},"data":['.format(encode(col_headers)).encode())
+            num_rows = 0
+            chunk = []
+            for row in reader:
+                if len(row) == 0:
+                    continue
+                if len(row) != len(col_headers):
+                    raise CsvRowLengthError(fname, reader.line_num, len(row), len(col_headers))
+                chunk.append(row)
+                if len(chunk) == cls.ROWS_PER_CHUNK:
+                    num_rows = cls._write_rows(
+                        body, encode, chunk, num_rows, validator, col_headers, report)
+                    chunk = []
+            num_rows = cls._write_rows(
+                body, encode, chunk, num_rows, validator, col_headers, report)
+        if num_rows == 0:
+            raise CsvNoDataRowsError(fname)
+        body.write(b']}')
+        table = cls(col_headers, num_rows, body.getvalue())
+        table.report = report
+        return table
+
+    @staticmethod
+    def _write_rows(body, encode, rows, num_rows, validator, col_headers, report):
+        if validator is not None:
+            report.extend(validator.check_rows(col_headers, rows, num_rows + 1), len(rows))
+        if len(rows) > 0:
+            if num_rows > 0:
+                body.write(b',')
+            # Strip the brackets of the encoded list of rows.
+            body.write(encode(rows)[1:-1].encode())
+        return num_rows + len(rows)
+
+    def to_wire(self):
+        """Returns the table as a Python `dict` with `colHeaders` and `data` items."""
+        return json.loads(self.body)
+
+
+_ENCODED_TABLE_RE = re.compile(r'"@@EncodedTable(\d+)@@"')
+
+
+def encode_payload(payload):
+    """Serializes the JSON body of a GraphQL request, inserting the JSON text of
+    any `EncodedTable` values.
+
+    # Arguments
+    payload (dict):
+        The request body, with `query` and `variables` items.
+
+    # Returns
+    body (bytes):
+        The UTF-8 encoded body, or None if there are no `EncodedTable`s in
+        the payload, in which case it can be sent as usual.
+    """
+    tables = []
+
+    def default(value):
+        if isinstance(value, EncodedTable):
+            tables.append(value)
+            return '@@EncodedTable{}@@'.format(len(tables) - 1)
+        raise TypeError('Object of type {} is not JSON serializable'.format(
+            type(value).__name__))
+
+    text = json.dumps(payload, default=default)
+    if len(tables) == 0:
+        return None
+    parts = _ENCODED_TABLE_RE.split(text)
+    # Split parts alternate between JSON text and table indices.
+    return b''.join(tables[int(part)].body if i % 2 else part.encode()
+                    for i, part in enumerate(parts))
+
+
+def decode_encoded_tables(value):
+    """Returns a copy of request variables in which any `EncodedTable`s
+    are replaced with table `dict`s, for transports that serialize the variables
+    themselves."""
+    if isinstance(value, EncodedTable):
+        return value.to_wire()
+    if isinstance(value, dict):
+        return {key: decode_encoded_tables(item) for key, item in value.items()}
+    return value
+
+
+class CachedPrintHTTPTransport(gql.transport.requests.RequestsHTTPTransport):
+    """A `gql` HTTP transport that sends the cached printed form of the
+    documents obtained from `cached_gql`, and can be given a shared
+    `requests.Session` in place of its own.
+    """
+
+    def __init__(self, url, session=None, **kwargs):
+        super().__init__(url, **kwargs)
+        if session is not None:
+            self.session.close()
+            self.session = session
+
+    def execute(self, document, variable_values=None, operation_name=None, timeout=None):
+        """Executes the document with an HTTP request and returns
+        a `graphql.execution.ExecutionResult`."""
+        payload = {'query': cached_print_ast(document)}
+        if variable_values:
+            payload['variables'] = variable_values
+        if operation_name:
+            payload['operationName'] = operation_name
+
+        data_key = 'json' if self.use_json else 'data'
+        headers = self.headers
+        body = encode_payload(payload)
+        if body is not None:
+            data_key = 'data'
+            payload = body
+            headers = dict(headers or {})
+            headers['Content-Type'] = 'application/json'
+        post_args = {
+            'headers': headers,
+            'auth': self.auth,
+            'cookies': self.cookies,
+            'timeout': timeout or self.default_timeout,
+            'verify': self.verify,
+            data_key: payload
+        }
+        post_args.update(self.kwargs)
+
+        response = self.session.request(self.method, self.url, **post_args)
+        try:
+            result = response.json()
+            if not isinstance(result, dict):
+                raise ValueError
+        except ValueError:
+            result = {}
+
+        if 'errors' not in result and 'data' not in result:
+            response.raise_for_status()
+            raise requests.HTTPError(
+                'Server did not return a GraphQL result', response=response)
+        return ExecutionResult(errors=result.get('errors'), data=result.get('data'))
+
+
+# Memoized validation of GraphQL documents
+
+class DocumentValidationCache(object):
+    """A bounded, least-recently-used record of the GraphQL documents that
+    have already been validated against a schema. Documents are keyed by
+    their source text, or by object identity if the source is not available.
+    The cache is cleared whenever it is used with a different schema.
+
+    # Arguments
+    maxsize (int):
+        The maximum number of validated documents to remember.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._schema = None
+        self._documents = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, document):
+        loc = getattr(document, 'loc', None)
+        source = getattr(loc, 'source', None)
+        body = getattr(source, 'body', None)
+        if body is not None:
+            return body
+        return id(document)
+
+    def validate(self, client, document):
+        """Validates `document` with `client.validate`, unless the same document
+        was already validated against the client's current schema.
+
+        # Arguments
+        client (`gql.Client`):
+            A client with a schema.
+
+        document (`graphql.language.ast.Document`):
+            The parsed GraphQL document.
+
+        # Raises
+        GraphQLError
+            If the document is not valid. Invalid documents are not remembered.
+        """
+        key = self._key(document)
+        with self._lock:
+            if self._schema is not client.schema:
+                self._documents.clear()
+                self._schema = client.schema
+            if key in self._documents:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return
+            self.misses += 1
+
+        client.validate(document)
+
+        with self._lock:
+            if self._schema is client.schema:
+                # Keep a reference so that an identity key cannot be re-used.
+                self._documents[key] = document
+                while len(self._documents) > self.maxsize:
+                    self._documents.popitem(last=False)
+
+    def clear(self):
+        """Forgets all validated documents and resets the counters."""
+        with self._lock:
+            self._documents.clear()
+            self._schema = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns a Python `dict` with `hits`, `misses`, `size` and `maxsize` items."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._documents), 'maxsize': self.maxsize}
+
+
+# Batching of read queries into a single aliased GraphQL document
+
+def _rename_variables(node, suffix):
+    if isinstance(node, graphql_ast.Variable):
+        node.name = graphql_ast.Name(value=node.name.value + suffix)
+    elif isinstance(node, list):
+        for item in node:
+            _rename_variables(item, suffix)
+    elif isinstance(node, graphql_ast.Node):
+        for slot in node.__slots__:
+            if slot != 'loc':
+                _rename_variables(getattr(node, slot, None), suffix)
+
+
+def _query_operation(source):
+    for definition in cached_gql(source).definitions:
+        if isinstance(definition, graphql_ast.OperationDefinition):
+            if definition.operation != 'query':
+                raise ValueError('Only queries can be batched.')
+            return definition
+    raise ValueError('No operation found in document.')
+
+
+def _root_keys(source):
+    operation = _query_operation(source)
+    return [(field.alias or field.name).value for field in operation.selection_set.selections]
+
+
+def _variable_names(source):
+    operation = _query_operation(source)
+    return [vd.variable.name.value for vd in (operation.variable_definitions or [])]
+
+
+def _batch_alias(key, i):
+    return 'b{}_{}'.format(i, key)
+
+
+@functools.lru_cache(maxsize=64)
+def _batch_source(sources):
+    # Merge the queries in `sources` (a tuple of source strings) into a
+    # single query. The variables of the i-th query are suffixed with `_i`,
+    # and its root fields are aliased with `_batch_alias`. Fragments with
+    # the same name are only included once.
+    variable_definitions = []
+    selections = []
+    fragments = collections.OrderedDict()
+    for i, source in enumerate(sources):
+        for definition in cached_gql(source).definitions:
+            if isinstance(definition, graphql_ast.FragmentDefinition):
+                fragments.setdefault(definition.name.value, definition)
+        operation = copy.deepcopy(_query_operation(source))
+        _rename_variables(operation, '_{}'.format(i))
+        variable_definitions.extend(operation.variable_definitions or [])
+        for field in operation.selection_set.selections:
+            key = (field.alias or field.name).value
+            field.alias = graphql_ast.Name(value=_batch_alias(key, i))
+            selections.append(field)
+
+    operation = graphql_ast.OperationDefinition(
+        operation='query',
+        name=graphql_ast.Name(value='Batch'),
+        variable_definitions=variable_definitions,
+        selection_set=graphql_ast.SelectionSet(selections=selections))
+    return print_ast(graphql_ast.Document(definitions=[operation] + list(fragments.values())))
+
+
+class QueryBatch(object):
+    """Collects several read queries, for one or many sessions, and sends them
+    to the API as a single GraphQL document, in which each query's root fields
+    are aliased. The response is split back into one result per query.
+    Use the `query_batch` method of a `DapticsClient` to create a batch.
+
+    Batched queries do not update the attributes of the client.
+
+    # Arguments
+    client (`DapticsClient`):
+        The connected client used to send the requests.
+
+    batch_size (int):
+        The maximum number of queries to send in one request. Larger batches are
+        split into several requests.
+
+    # Examples
+    ```python
+    >>> batch = daptics.query_batch()
+    >>> for session_id in session_ids:
+    ...     batch.session(session_id)
+    ...     batch.current_task(session_id)
+    >>> results = batch.execute()
+    >>> data, errors = results[0]
+    >>> data['session']['name']
+    ```
+    """
+
+    def __init__(self, client, batch_size=50):
+        self.client = client
+        self.batch_size = batch_size
+        self._calls = []
+
+    def __len__(self):
+        return len(self._calls)
+
+    def add(self, source, vars=None):
+        """Adds a GraphQL query to the batch.
+
+        # Arguments
+        source (str):
+            The query source, for example one of the `*_QUERY` constants of `DapticsClient`.
+            Mutations and subscriptions cannot be batched.
+
+        vars (dict, optional):
+            The variables for the query.
+
+        # Returns
+        index (int):
+            The position of this query's result in the list returned by `execute`.
+        """
+        _query_operation(source)
+        self._calls.append((source, vars or {}))
+        return len(self._calls) - 1
+
+    def session(self, session_id):
+        """Adds a `session` query. See `DapticsClient.reconnect_session`."""
+        return self.add(self.client.SESSION_QUERY, {'sessionId': session_id})
+
+    def session_parameters(self, session_id):
+        """Adds a `session` query for only the experimental space parameters of a session."""
+        return self.add(self.client.SESSION_PARAMETERS_QUERY, {'sessionId': session_id})
+
+    def experiments_history(self, session_id):
+        """Adds an `experimentsHistory` query. See `DapticsClient.get_experiments_history`."""
+        return self.add(self.client.EXPERIMENTS_HISTORY_QUERY, {'sessionId': session_id})
+
+    def experiments(self, session_id, gen=None, design_only=False):
+        """Adds an `experiments` query. See `DapticsClient.get_experiments`."""
+        vars = {'sessionId': session_id, 'designOnly': False}
+        if gen is not None:
+            vars['gen'] = gen
+            vars['designOnly'] = bool(design_only)
+        return self.add(self.client.EXPERIMENTS_QUERY, vars)
+
+    def current_task(self, session_id, task_type=None, full=False):
+        """Adds a `currentTask` query. Only the status of the task is requested,
+        unless `full` is True. See `DapticsClient.poll_for_current_task`."""
+        vars = {'sessionId': session_id, 'taskId': None, 'type': None}
+        if task_type is not None:
+            if type(task_type) != DapticsTaskType:
+                raise InvalidTaskTypeError(task_type)
+            vars['type'] = task_type.value
+        source = self.client.CURRENT_TASK_QUERY if full else self.client.CURRENT_TASK_STATUS_QUERY
+        return self.add(source, vars)
+
+    def _requests(self):
+        # Yields a (document, vars, calls) tuple for each request.
+        for start in range(0, len(self._calls), self.batch_size):
+            calls = self._calls[start:start + self.batch_size]
+            sources = tuple(source for source, _vars in calls)
+            vars = {}
+            for i, (source, call_vars) in enumerate(calls):
+                for name in _variable_names(source):
+                    if name in call_vars:
+                        vars['{}_{}'.format(name, i)] = call_vars[name]
+            yield (_batch_document(_batch_source(sources)), vars, calls)
+
+    def _demultiplex(self, calls, data, errors):
+        results = []
+        for i, (source, _vars) in enumerate(calls):
+            aliases = {_batch_alias(key, i): key for key in _root_keys(source)}
+            call_errors = None
+            if errors:
+                call_errors = [e for e in errors
+                               if not e.get('path') or e['path'][0] in aliases]
+                call_errors = call_errors or None
+            call_data = None
+            if data is not None:
+                call_data = {key: data.get(alias) for alias, key in aliases.items()}
+            results.append((call_data, call_errors))
+        return results
+
+    def execute(self):
+        """Sends the queries in the batch and clears the batch.
+
+        # Returns
+        results (list):
+            A list with one `(data, errors)` tuple for each query, in the order in which
+            the queries were added. `data` is a Python `dict` keyed by the query's root field name,
+            as it would have been returned for the query on its own. `errors` is a list
+            of the GraphQL errors for that query, or None.
+        """
+        results = []
+        for document, vars, calls in self._requests():
+            data, errors = self.client.call_api(document, vars)
+            results.extend(self._demultiplex(calls, data, errors))
+        self._calls = []
+        return results
+
+    async def execute_async(self):
+        """Like `execute`, for use with an `AsyncDapticsClient`."""
+        results = []
+        for document, vars, calls in self._requests():
+            data, errors = await self.client.call_api(document, vars)
+            results.extend(self._demultiplex(calls, data, errors))
+        self._calls = []
+        return results
+
+
 # Errors raised by the DapticsClient class
 class MissingConfigError(Exception):
     """An error raised if the option configuration file cannot be found."""
@@ -169,6 +901,13 @@ class TaskFailedError(Exception):
             type_)
 
 
+class InvalidSnapshotError(Exception):
+    """An error raised if a saved client snapshot cannot be read."""
+
+    def __init__(self, path, reason):
+        self.message = 'The snapshot file {} is invalid: {}.'.format(path, reason)
+
+
 class SessionParametersNotValidatedError(Exception):
     """An error raised if the method cannot be completed, because the experimental space
     parameters for the session have not been saved and validated yet."""
@@ -185,6 +924,24 @@ class InvalidSpaceParameterError(Exception):
             space_type, param)
 
 
+class UnsupportedSpaceTypeError(Exception):
+    """An error raised if the experiments of an experimental space cannot be enumerated
+    locally, because its type is not "factorial" or "mixture"."""
+
+    def __init__(self, space_type):
+        self.message = 'Experiments cannot be enumerated locally for space type {}.'.format(
+            space_type)
+
+
+class NoValidMixturesError(Exception):
+    """An error raised if no combination of the units of a "mixture" space's parameters
+    adds up to the space's `totalUnits`."""
+
+    def __init__(self, total_units):
+        self.message = 'No mixture of the parameters in the space adds up to {} units.'.format(
+            total_units)
+
+
 class InvalidExperimentsTypeError(Exception):
     """An error raised if the type of experiments is not a valid type."""
 
@@ -216,6 +973,35 @@ class CsvNoDataRowsError(Exception):
         self.message = 'No data rows were found in the file {}.'.format(fname)
 
 
+class CsvRowLengthError(Exception):
+    """An error raised if a data row in a CSV file does not have the same number of
+    columns as the header row."""
+
+    def __init__(self, fname, line, length, expected):
+        self.message = 'Line {} of the file {} has {} columns, but the header has {}.'.format(
+            line, fname, length, expected)
+
+
+class InvalidExperimentsError(Exception):
+    """An error raised if an experiments table does not match the validated
+    experimental space. The `report` attribute is the `ValidationReport`."""
+
+    def __init__(self, report):
+        self.report = report
+        self.message = 'The experiments table has {} errors:\n{}'.format(
+            len(report), report.format())
+
+
+class InvalidExperimentalParametersError(Exception):
+    """An error raised if the experimental space submitted to `put_experimental_parameters`
+    fails the client's checks. The `problems` attribute is the list of problems found."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        self.message = 'The experimental parameters are not valid:\n{}'.format(
+            '\n'.join(problems))
+
+
 class SpaceOrDesignRequiredError(Exception):
     """An error raised if neither an experimental space nor an experimental design was
     submitted for generating random experiments."""
@@ -302,6 +1088,806 @@ def can_set_result(future):
     return (True, "")
 
 
+class TaskSocket(object):
+    """A long-lived, authenticated websocket connection used by a `DapticsClient`
+    whose `run_tasks_async` option is set. The connection joins the Absinthe
+    control channel once, and keeps one "taskUpdated" subscription open for each
+    session, so that task-creating mutations can be pushed over the already open
+    channel. Use the client's `close` method to close the connection.
+
+    # Arguments
+    url (str):
+        The websocket endpoint URL.
+
+    token (str):
+        The access token used to authenticate the connection.
+
+    subscription_doc (str):
+        The "taskUpdated" subscription document.
+
+    loop (`asyncio.AbstractEventLoop`):
+        The event loop that the connection runs on.
+    """
+
+    def __init__(self, url, token, subscription_doc, loop):
+        self.url = url
+        self.token = token
+        self.subscription_doc = subscription_doc
+        self.loop = loop
+        self.socket = None
+        self.absinthe = None
+        self._subscriptions = {}
+        self.stats = {'connects': 0, 'subscribes': 0, 'pushes': 0}
+        """Counts of websocket connections made, subscriptions created, and
+        documents pushed."""
+
+    @property
+    def connected(self):
+        if self.socket is None or not self.socket.connected:
+            return False
+        websocket = self.socket._socket
+        return websocket is not None and not getattr(websocket, 'closed', False)
+
+    async def connect(self):
+        """Opens the connection and joins the Absinthe control channel, unless
+        already connected."""
+        # Let the receive loop notice a connection that the server closed
+        # while the event loop was not running.
+        await asyncio.sleep(0)
+        if self.socket is not None:
+            await self.socket.wait_for_reconnect()
+        if self.connected:
+            return
+        await self.close()
+        self.socket = Phoenix(self.url, params={'token': self.token}, loop=self.loop)
+        await self.socket.connect()
+        self.absinthe = Absinthe(self.socket, max_queue=0)
+        await self.absinthe.join()
+        self.stats['connects'] += 1
+
+    async def subscribe(self, session_id, coroutine, **kwargs):
+        """Returns the subscription id of the "taskUpdated" subscription for the session,
+        subscribing if necessary, and binds the subscription to `coroutine`.
+        Updates received while the subscription was not running are discarded.
+        """
+        try:
+            return await self._subscribe(session_id, coroutine, **kwargs)
+        except (CommunicationError, ConnectionClosed, OSError):
+            # The server may have closed an idle connection; try again once
+            # with a new one.
+            await self.close()
+            return await self._subscribe(session_id, coroutine, **kwargs)
+
+    async def _subscribe(self, session_id, coroutine, **kwargs):
+        await self.connect()
+        timeout = kwargs.pop('timeout', 10)
+        sub_id = self._subscriptions.get(session_id)
+        subscription = None
+        if sub_id is not None:
+            subscription = self.absinthe.get_subscription(sub_id)
+        if subscription is None:
+            sub_id = await self.absinthe.subscribe(
+                coroutine, self.subscription_doc,
+                variables={'sessionId': session_id}, timeout=timeout, **kwargs)
+            self._subscriptions[session_id] = sub_id
+            self.stats['subscribes'] += 1
+        else:
+            subscription.coroutine = coroutine
+            subscription.timeout = timeout
+            subscription.kwargs = kwargs
+            subscription.drain()
+        return sub_id
+
+    async def unsubscribe(self, session_id):
+        """Removes the "taskUpdated" subscription for the session, if any."""
+        sub_id = self._subscriptions.pop(session_id, None)
+        if sub_id is not None and self.connected:
+            await self.absinthe.unsubscribe(sub_id)
+
+    async def push_doc(self, doc, variables=None):
+        """Sends a GraphQL document over the Absinthe control channel and
+        returns the reply."""
+        await self.connect()
+        self.stats['pushes'] += 1
+        return await self.absinthe.push_doc(doc, variables=variables)
+
+    async def run(self, sub_id, timeout=None):
+        """Passes subscription data messages to the subscription's coroutine
+        until it returns False. If `timeout` is not None, it replaces the
+        number of seconds to wait for each message."""
+        if timeout is not None:
+            subscription = self.absinthe.get_subscription(sub_id)
+            if subscription is not None:
+                subscription.timeout = timeout
+        await self.absinthe.run_subscription(sub_id)
+
+    async def close(self):
+        """Unsubscribes, leaves the Absinthe control channel and disconnects."""
+        socket, absinthe = self.socket, self.absinthe
+        self.socket = None
+        self.absinthe = None
+        self._subscriptions = {}
+        if socket is None:
+            return
+        try:
+            if absinthe is not None and socket.connected:
+                await absinthe.leave()
+        except Exception:
+            pass
+        finally:
+            await socket.disconnect()
+
+
+def _started_at_time(task):
+    # Convert the ISO 8601 `startedAt` value of a task to a POSIX timestamp,
+    # or return None.
+    started_at = task.get('startedAt') if task else None
+    if not started_at:
+        return None
+    try:
+        started = datetime.datetime.fromisoformat(started_at.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=datetime.timezone.utc)
+    return started.timestamp()
+
+
+class PollScheduler(object):
+    """Chooses how long `wait_for_current_task` sleeps between polls of a task.
+
+    The scheduler remembers how long recent tasks of each type took to complete.
+    While a task is expected to run for a long time, it is polled rarely; as
+    the typical duration approaches, polls become more frequent; if the task runs
+    longer than usual, the interval backs off again in proportion to the overrun.
+    For a task type without history, the interval grows with the elapsed time.
+    A change in the task's `progress` phase or message shortens the next interval,
+    and a percentage in the progress message is used to estimate the remaining time.
+    Intervals are kept between `min_interval` and `max_interval`, and randomized by
+    `jitter` so that many waiting clients do not poll in step.
+
+    A scheduler can be shared by several clients.
+
+    # Arguments
+    min_interval (float):
+        The shortest interval, in seconds.
+
+    max_interval (float):
+        The longest interval, in seconds.
+
+    jitter (float):
+        The fraction by which each interval is randomly lengthened or shortened.
+
+    history_size (int):
+        The number of completed tasks of each type that are remembered.
+    """
+
+    PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+    def __init__(self, min_interval=1.0, max_interval=30.0, jitter=0.1, history_size=20):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._durations = collections.defaultdict(
+            lambda: collections.deque(maxlen=history_size))
+        self._lock = threading.Lock()
+
+    def record(self, task_type, duration):
+        """Remembers the duration, in seconds, of a completed task."""
+        if task_type and duration is not None and duration >= 0:
+            with self._lock:
+                self._durations[task_type].append(duration)
+
+    def typical_duration(self, task_type):
+        """Returns the median duration of recent tasks of the type, or None."""
+        with self._lock:
+            durations = sorted(self._durations.get(task_type, ()))
+        if not durations:
+            return None
+        return durations[len(durations) // 2]
+
+    def next_interval(self, task_type, elapsed, progress=None, last_progress=None):
+        """Returns the number of seconds to wait before polling the task again.
+
+        # Arguments
+        task_type (str):
+            The task's `type`, e.g. "generate".
+
+        elapsed (float):
+            The number of seconds since the task was started.
+
+        progress (dict, optional):
+            The task's current `progress` item, with `phase` and `message` items.
+
+        last_progress (dict, optional):
+            The `progress` item from the previous poll.
+        """
+        remaining = None
+        percent = self._percent_done(progress)
+        if percent is not None and 0 < percent < 100:
+            remaining = elapsed * (100.0 - percent) / percent
+        else:
+            expected = self.typical_duration(task_type)
+            if expected is not None:
+                remaining = expected - elapsed
+
+        if remaining is None:
+            interval = 0.25 * elapsed
+        elif remaining > 0:
+            interval = 0.25 * remaining
+        else:
+            interval = 0.25 * -remaining
+
+        if progress is not None and last_progress is not None and progress != last_progress:
+            interval = interval / 2
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if self.jitter:
+            interval *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return max(interval, 0.0)
+
+    def _percent_done(self, progress):
+        if not progress or not progress.get('message'):
+            return None
+        match = self.PERCENT_RE.search(progress['message'])
+        if match is None:
+            return None
+        return float(match.group(1))
+
+    def stats(self):
+        """Returns a Python `dict` with the number of remembered tasks and
+        the typical duration for each task type."""
+        with self._lock:
+            task_types = list(self._durations)
+        return {task_type: {'count': len(self._durations[task_type]),
+                            'typical_duration': self.typical_duration(task_type)}
+                for task_type in task_types}
+
+
+# Raised by a `concurrent.futures.Future` that is already done (Python 3.8 and later).
+_InvalidStateError = getattr(concurrent.futures, 'InvalidStateError', RuntimeError)
+
+
+class TaskHandle(object):
+    """A handle on a task started by a `DapticsClient`. Task-starting methods
+    return a `TaskHandle` instead of the mutation data when the client's
+    `return_task_handles` option is set. The task is watched in the background
+    by the client's `task_watcher`, so one thread can start tasks in many sessions
+    and collect their results as they complete.
+
+    The result of a handle is the same `data` dict that `wait_for_current_task`
+    returns, with a `currentTask` item whose `status` is `success`, `failed`, or
+    `canceled`. If the task can no longer be found, the handle raises a
+    `NoCurrentTaskError`.
+
+    With an `AsyncDapticsClient`, a handle can also be awaited.
+
+    # Arguments
+    watcher (`TaskWatcher`):
+        The watcher that polls the task.
+
+    task (dict):
+        The task returned by the task-starting mutation.
+
+    client (`DapticsClient`, optional):
+        The client that started the task. If None, the watcher's client.
+    """
+
+    def __init__(self, watcher, task, client=None):
+        self.client = client or watcher.client
+        """The client that started the task, whose attributes are updated with the
+        task's result."""
+
+        self.task = task
+        """The most recently polled information for the task."""
+
+        self.task_id = task['taskId']
+        self.session_id = task['sessionId']
+        self.task_type = task['type']
+        self.errors = None
+        """The errors from the most recent failed poll, if any."""
+
+        self.started = time.time()
+        self._failed_polls = 0
+        self._watcher = watcher
+        self._future = concurrent.futures.Future()
+
+    def __repr__(self):
+        return '<TaskHandle {} {} {}>'.format(self.task_type, self.task_id, self.task.get('status'))
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def done(self):
+        """Returns True if the task has finished or the handle was cancelled."""
+        return self._future.done()
+
+    def cancelled(self):
+        """Returns True if the handle was cancelled."""
+        return self._future.cancelled()
+
+    def result(self, timeout=None):
+        """Waits for the task to finish, and returns its `data`.
+
+        # Arguments
+        timeout (float, optional):
+            Maximum number of seconds to wait. If None, wait forever.
+
+        # Raises
+        `concurrent.futures.TimeoutError` if the task did not finish within `timeout`
+        seconds, `concurrent.futures.CancelledError` if the handle was cancelled,
+        or the exception that stopped the task from being watched.
+        """
+        return self._future.result(timeout)
+
+    def exception(self, timeout=None):
+        """Waits for the task to finish, and returns the exception raised
+        while watching it, or None."""
+        return self._future.exception(timeout)
+
+    def add_done_callback(self, fn):
+        """Calls `fn` with this handle when the task finishes or the handle is
+        cancelled. Callbacks may run on the watcher's thread."""
+        self._future.add_done_callback(lambda _future: fn(self))
+
+    def cancel(self):
+        """Stops watching the task. The task itself continues to run on the server.
+
+        # Returns
+        True if the handle was cancelled, False if the task had already finished.
+        """
+        cancelled = self._future.cancel()
+        if cancelled:
+            self._watcher.remove(self)
+        return cancelled
+
+    def _set_result(self, data):
+        try:
+            if not self._future.done():
+                self._future.set_result(data)
+        except _InvalidStateError:
+            # The handle was cancelled by another thread.
+            pass
+
+    def _set_exception(self, exc):
+        try:
+            if not self._future.done():
+                self._future.set_exception(exc)
+        except _InvalidStateError:
+            pass
+
+
+class TaskWatcher(object):
+    """Watches the tasks of pending `TaskHandle`s, in any number of sessions.
+    Each round polls all pending tasks with one batched `currentTask` request
+    (see `QueryBatch`), and fetches the full results of the tasks that succeeded
+    with one more. The interval between rounds is the shortest one that the client's
+    `poll_scheduler` chooses for any of the tasks.
+
+    The watcher runs in a daemon thread for a `DapticsClient`, or as an `asyncio`
+    task for an `AsyncDapticsClient`, only while there are pending handles.
+    Clients created with `session_client` share their parent's watcher, so the
+    tasks of all their sessions are polled together. The result of a task updates
+    the attributes of the client that started it, if that client is still working on
+    the task's session, as `poll_for_current_task` does.
+
+    If the poll of a task returns errors and no task `MAX_FAILED_POLLS` times in a
+    row, its handle fails with a `GraphQLError` for the first error.
+
+    # Arguments
+    client (`DapticsClient`):
+        The connected client used to poll the tasks.
+    """
+
+    MAX_FAILED_POLLS = 3
+    """The number of consecutive polls of a task that may return errors and no task
+    before its handle fails."""
+
+    def __init__(self, client):
+        self.client = client
+        self._handles = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._runner = None
+
+    def watch(self, task, client=None):
+        """Returns a new `TaskHandle` for a task returned by a task-starting
+        mutation of `client` (by default, the watcher's client), and starts watching it."""
+        handle = TaskHandle(self, task, client)
+        self.add(handle)
+        return handle
+
+    def add(self, handle):
+        """Starts watching a handle's task."""
+        with self._lock:
+            self._handles[handle.task_id] = handle
+            self._start()
+        self._wakeup.set()
+
+    def remove(self, handle):
+        """Stops watching a handle's task."""
+        with self._lock:
+            if self._handles.get(handle.task_id) is handle:
+                del self._handles[handle.task_id]
+
+    def pending(self):
+        """Returns a list of the handles whose tasks have not finished."""
+        with self._lock:
+            return list(self._handles.values())
+
+    def _start(self):
+        # Called with the lock held.
+        if self._runner is not None and not self._runner_done():
+            return
+        if asyncio.iscoroutinefunction(self.client.call_api):
+            self._runner = asyncio.ensure_future(self._run_async())
+        else:
+            self._runner = threading.Thread(
+                target=self._run, name='daptics-task-watcher', daemon=True)
+            self._runner.start()
+
+    def _runner_done(self):
+        if isinstance(self._runner, threading.Thread):
+            return not self._runner.is_alive()
+        return self._runner.done()
+
+    def _should_stop(self):
+        with self._lock:
+            if not self._handles:
+                self._runner = None
+                return True
+            return False
+
+    def _run(self):
+        while not self._should_stop():
+            try:
+                interval = self.poll_once()
+            except Exception as e:
+                self._fail_all(e)
+                continue
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+    async def _run_async(self):
+        while not self._should_stop():
+            try:
+                interval = await self.poll_once_async()
+            except Exception as e:
+                self._fail_all(e)
+                continue
+            await asyncio.sleep(interval)
+
+    def poll_once(self):
+        """Polls all pending tasks once, and finishes the handles of the tasks that
+        are done. Returns the number of seconds to wait before the next poll."""
+        handles = self.pending()
+        if handles:
+            results = self._status_batch(handles).execute()
+            succeeded = self._update(handles, results)
+            if succeeded:
+                results = self._result_batch(succeeded).execute()
+                for handle, data, type_ in self._finish_succeeded(succeeded, results):
+                    try:
+                        self._after_finish(handle, data, type_)
+                    except Exception as e:
+                        handle._set_exception(e)
+                        continue
+                    handle._set_result(data)
+        return self._interval()
+
+    async def poll_once_async(self):
+        """Like `poll_once`, for use with an `AsyncDapticsClient`."""
+        handles = self.pending()
+        if handles:
+            results = await self._status_batch(handles).execute_async()
+            succeeded = self._update(handles, results)
+            if succeeded:
+                results = await self._result_batch(succeeded).execute_async()
+                for handle, data, type_ in self._finish_succeeded(succeeded, results):
+                    try:
+                        await self._after_finish_async(handle, data, type_)
+                    except Exception as e:
+                        handle._set_exception(e)
+                        continue
+                    handle._set_result(data)
+        return self._interval()
+
+    def _status_batch(self, handles):
+        batch = self.client.query_batch()
+        for handle in handles:
+            batch.add(self.client.CURRENT_TASK_STATUS_QUERY, self._task_vars(handle))
+        return batch
+
+    def _result_batch(self, handles):
+        batch = self.client.query_batch()
+        for handle in handles:
+            batch.add(self.client.CURRENT_TASK_QUERY, self._task_vars(handle))
+        return batch
+
+    def _task_vars(self, handle):
+        return {'sessionId': handle.session_id, 'taskId': handle.task_id, 'type': None}
+
+    # Update the handles from a round of status polls. Returns the handles
+    # of the tasks that succeeded, whose full results must still be fetched.
+    def _update(self, handles, results):
+        succeeded = []
+        for handle, (data, errors) in zip(handles, results):
+            if handle.done():
+                continue
+            task = data.get('currentTask') if data else None
+            if task is None:
+                if errors:
+                    self._poll_failed(handle, errors)
+                else:
+                    self.remove(handle)
+                    handle._set_exception(NoCurrentTaskError())
+                continue
+            handle.task = task
+            handle.errors = errors
+            handle._failed_polls = 0
+            if task['status'] == 'success':
+                succeeded.append(handle)
+            elif task['status'] in ('failed', 'canceled'):
+                self._finish(handle, data)
+        return succeeded
+
+    # Finish the handles of the tasks whose full results were fetched. Returns
+    # (handle, data, type) for the results that need the follow-up steps of
+    # `poll_for_current_task`, whose handles are finished by the caller.
+    def _finish_succeeded(self, handles, results):
+        follow_ups = []
+        for handle, (data, errors) in zip(handles, results):
+            if data and data.get('currentTask') is not None:
+                handle.task = data['currentTask']
+                follow_up = self._finish(handle, data)
+                if follow_up is not None:
+                    follow_ups.append(follow_up)
+            else:
+                self._poll_failed(handle, errors)
+        return follow_ups
+
+    # Try a poll that returned errors and no task again in the next round,
+    # unless it has already failed `MAX_FAILED_POLLS` times in a row.
+    def _poll_failed(self, handle, errors):
+        handle.errors = errors
+        handle._failed_polls += 1
+        if handle._failed_polls >= self.MAX_FAILED_POLLS:
+            self.remove(handle)
+            if errors:
+                handle._set_exception(GraphQLError(str(errors[0]['message'])))
+            else:
+                handle._set_exception(GraphQLError('Unknown error'))
+
+    # Apply a finished task's result to the client that started it. An error
+    # while applying it fails only this handle.
+    def _finish(self, handle, data):
+        self.remove(handle)
+        client = handle.client
+        type_ = None
+        try:
+            client._record_task_duration(data, handle.started)
+            if handle.session_id == client.session_id:
+                data, type_ = client._process_current_task(data)
+        except Exception as e:
+            handle._set_exception(e)
+            return None
+        if self._needs_follow_up(client, type_):
+            return (handle, data, type_)
+        handle._set_result(data)
+        return None
+
+    def _needs_follow_up(self, client, type_):
+        if type_ == 'update':
+            return client._should_auto_generate()
+        return type_ == 'analytics' and client._options.get('auto_export_path') is not None
+
+    # The steps that `poll_for_current_task` takes after a task succeeds: generate
+    # the next design after an "update" task if the `auto_generate_next_design`
+    # option is set, or download analytics files if `auto_export_path` is set.
+    def _after_finish(self, handle, data, type_):
+        client = handle.client
+        if type_ == 'update':
+            time.sleep(0.2)
+            data['currentTask']['autoGenerateTask'] = self._started_task(
+                client.generate_design())
+        else:
+            client.download_all_analytics_files(
+                client.analytics, client._options['auto_export_path'], True)
+
+    async def _after_finish_async(self, handle, data, type_):
+        client = handle.client
+        if type_ == 'update':
+            await asyncio.sleep(0.2)
+            data['currentTask']['autoGenerateTask'] = self._started_task(
+                await client.generate_design())
+        else:
+            await client.download_all_analytics_files(
+                client.analytics, client._options['auto_export_path'], True)
+
+    def _started_task(self, started):
+        # `generate_design` returns a handle if the `return_task_handles` option is set.
+        if isinstance(started, TaskHandle):
+            return started.task
+        return started['generateDesign']
+
+    def _interval(self):
+        client = self.client
+        handles = self.pending()
+        if not handles:
+            return 0.0
+        return min(client._poll_interval({'currentTask': handle.task}, handle.started, None, None)[0]
+                   for handle in handles)
+
+    def _fail_all(self, exc):
+        for handle in self.pending():
+            self.remove(handle)
+            handle._set_exception(exc)
+
+
+def wait_all(handles, timeout=None):
+    """Waits for the tasks of several `TaskHandle`s, which may belong to
+    different sessions and clients, to finish. The tasks are watched concurrently,
+    so the wait takes as long as the slowest task. The handles of clients created
+    with `session_client` are all polled by one `TaskWatcher`, with one batched
+    request per round.
+
+    With an `AsyncDapticsClient`, await the handles instead, for example with
+    `asyncio.gather`.
+
+    # Arguments
+    handles (list):
+        The `TaskHandle`s to wait for.
+
+    timeout (float, optional):
+        Maximum number of seconds to wait. If None, wait forever.
+
+    # Returns
+    results (list):
+        The `data` result of each handle, in the order of `handles`.
+
+    # Raises
+    `TaskTimeoutError` if any task did not finish within `timeout` seconds,
+    or the exception of the first handle, in the order of `handles`, that failed.
+    """
+    handles = list(handles)
+    _done, not_done = concurrent.futures.wait(
+        [handle._future for handle in handles], timeout=timeout)
+    if not_done:
+        raise TaskTimeoutError()
+    return [handle.result() for handle in handles]
+
+
+def as_completed(handles, timeout=None):
+    """Yields `TaskHandle`s as their tasks finish, in completion order. The handles
+    may belong to different sessions and clients.
+
+    With an `AsyncDapticsClient`, use `asyncio.as_completed` on the handles instead.
+
+    # Arguments
+    handles (list):
+        The `TaskHandle`s to wait for.
+
+    timeout (float, optional):
+        Maximum number of seconds to wait for all of the tasks. If None, wait forever.
+
+    # Raises
+    `TaskTimeoutError` if all tasks did not finish within `timeout` seconds.
+
+    # Examples
+    ```python
+    >>> for handle in as_completed(handles):
+    ...     print(handle.session_id, handle.result()['currentTask']['status'])
+    ```
+    """
+    by_future = {handle._future: handle for handle in handles}
+    try:
+        for future in concurrent.futures.as_completed(by_future, timeout=timeout):
+            yield by_future[future]
+    except concurrent.futures.TimeoutError:
+        raise TaskTimeoutError()
+
+
+class SessionState(object):
+    """The state of one daptics session, kept by a `DapticsClient` in its
+    `session_state` attribute. The attributes of the state are also available
+    as attributes of the client.
+
+    A state holds no connections, so it is cheap to create. Clients made by
+    `DapticsClient.session_client` share their connection pool, schema and access
+    token, and each has its own state, so that a pool of worker threads can work
+    on many sessions without opening more connections or logging in again.
+    A single client, and its state, should only be used by one thread at a time.
+    """
+
+    ATTRIBUTES = ('session_id', 'session_name', 'session_tag', 'task_info', 'gen',
+                  'remaining', 'completed', 'initial_params', 'validated_params',
+                  'design', 'analytics', 'experiments_history')
+    """The names of the attributes of a session state."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        """A lock held while the result of a completed task is applied to the state."""
+
+        self.init_state()
+
+    def init_state(self):
+        """Resets all attributes to the values for a client with no session."""
+        self.session_id = None
+        """The session id for a connected Daptics session, as set by the `create_session` method."""
+
+        self.session_name = None
+        """The name of the connected Daptics session, as set by the `create_session` method."""
+
+        self.session_tag = None
+        """The tag (a read-only identifier) of the connected Daptics session, as set by the `create_session` method."""
+
+        self.task_info = {}
+        """A Python `dict` that holds information about the polling status for
+        running tasks in the session.
+        """
+
+        self.gen = -1
+        """An integer storing the current design "generation number" for the session.
+        This is -1 for a new session, 0 when the session's experimental space has been
+        validated, and greater than zero when a design has been generated by the system.
+        """
+
+        self.remaining = None
+        """If not None, an integer representing the number of possible generations that
+        can be generated until the entire design space has been explored.
+        """
+
+        self.completed = False
+        """A boolean indicating whether the design space has been completely explored."""
+
+        self.initial_params = None
+        """A Python `dict` containing the experimental space parameters defaults as
+        initially returned by the `create_session` method.
+        """
+
+        self.validated_params = None
+        """A Python `dict` containing the experimental space parameters as updated
+        from the result of a "space" task.
+        """
+
+        self.design = None
+        """A Python `dict` containing the current generated design, as updated by the
+        result of a "generate" task.
+        """
+
+        self.analytics = None
+        """A Python `dict` containing information and links to available analytics files,
+        as updated by the result of a "analytics" task.
+        """
+
+        self.experiments_history = None
+        """A list of Python `dict`s containing all the experiments and responses that
+        have been simulated, as updated by the result of a "simulate" task.
+        """
+
+    def to_dict(self):
+        """Returns the attributes as a Python `dict` that can be serialized as JSON."""
+        with self.lock:
+            return {name: getattr(self, name) for name in self.ATTRIBUTES}
+
+    def update(self, values):
+        """Sets the attributes that are present in the Python `dict` `values`."""
+        with self.lock:
+            for name in self.ATTRIBUTES:
+                if name in values:
+                    setattr(self, name, values[name])
+
+
+def _session_state_property(name):
+    def fget(self):
+        return getattr(self.session_state, name)
+
+    def fset(self, value):
+        setattr(self.session_state, name, value)
+
+    return property(fget, fset, doc='See `SessionState.{}`.'.format(name))
+
+
 # The main DapticsClient class
 class DapticsClient(object):
     """A Python GraphQL client for maintaining the state of a Daptics optimization session.
@@ -330,8 +1916,34 @@ class DapticsClient(object):
 
     `run_tasks_async` - see `options` below
 
+    `return_task_handles` - see `options` below
+
+    `wait_with_subscription` - see `options` below
+
+    `validate_experiments` - see `options` below
+
+    `check_space` - see `options` below
+
+    `poll_min_interval` - see `options` below
+
+    `poll_max_interval` - see `options` below
+
+    `poll_jitter` - see `options` below
+
     `verify_ssl_certificates` - see `options` below
 
+    `http_pool_connections` - see `options` below
+
+    `http_pool_maxsize` - see `options` below
+
+    `http_pool_block` - see `options` below
+
+    `http_keep_alive` - see `options` below
+
+    `schema_cache_path` - see `options` below
+
+    `store_path` - see `options` below
+
     If `config is set to None, configuration can be read from OS environment
     variables, if they exist. The environment variable names are:
 
@@ -349,11 +1961,36 @@ class DapticsClient(object):
 
     `DAPTICS_RUN_TASKS_ASYNC` - see `options` below
 
+    `DAPTICS_RETURN_TASK_HANDLES` - see `options` below
+
+    `DAPTICS_WAIT_WITH_SUBSCRIPTION` - see `options` below
+
+    `DAPTICS_VALIDATE_EXPERIMENTS` - see `options` below
+
+    `DAPTICS_CHECK_SPACE` - see `options` below
+
+    `DAPTICS_POLL_MIN_INTERVAL` - see `options` below
+
+    `DAPTICS_POLL_MAX_INTERVAL` - see `options` below
+
+    `DAPTICS_POLL_JITTER` - see `options` below
+
     `DAPTICS_VERIFY_SSL_CERTIFICATES` - see `options` below
 
+    `DAPTICS_HTTP_POOL_CONNECTIONS` - see `options` below
+
+    `DAPTICS_HTTP_POOL_MAXSIZE` - see `options` below
+
+    `DAPTICS_HTTP_POOL_BLOCK` - see `options` below
+
+    `DAPTICS_HTTP_KEEP_ALIVE` - see `options` below
+
+    `DAPTICS_SCHEMA_CACHE_PATH` - see `options` below
+
+    `DAPTICS_STORE_PATH` - see `options` below
+
     options (dict):
-        A Python `dict` containing runtime options. As of this version, there
-        are four available options:
+        A Python `dict` containing runtime options. The available options are:
 
     `auto_export_path` - If not None, a string indicating the relative or absolute directory
     where the validated experimental space and generated design files will be saved,
@@ -377,11 +2014,73 @@ class DapticsClient(object):
     and `create_analytics`) will be run in an asynchronous event loop. Normally
     you will only set this flag if you want to receive progress information via
     a coroutine (callback) function.
+    The tasks share one websocket connection (see `TaskSocket`), which is kept
+    open until the client's `close` method is called.
+
+    `return_task_handles` - If set (True), methods that start long-running tasks
+    (`put_experimental_parameters`, `put_experiments`, `generate_design`, `start_simulation`,
+    and `generate_analytics`) return a `TaskHandle` as soon as the task has been started,
+    instead of the mutation data. The `auto_task_timeout` option is then ignored. The
+    `auto_generate_next_design` and `auto_export_path` options are applied by the
+    `task_watcher` when the task finishes, before the handle's result is set; the
+    generated design's task is returned in the `autoGenerateTask` item of the result.
+
+    `validate_experiments` - If set (True, the default), `put_experiments` and
+    `put_experiments_csv` check the experiments table against the validated experimental
+    space with an `ExperimentsValidator` before it is uploaded, and raise an
+    `InvalidExperimentsError` listing the invalid rows and columns.
+
+    `check_space` - If set (True), the `put_experimental_parameters` methods
+    check the experimental space with `check_experimental_parameters` before it is
+    submitted, and raise an `InvalidExperimentalParametersError` listing the problems.
+    Only "factorial" and "mixture" spaces are checked; other space types are left to
+    the server.
+
+    `wait_with_subscription` - If set (True), `wait_for_current_task` waits for
+    "taskUpdated" subscription messages over the client's websocket connection, instead
+    of polling the API every second. The task is polled again as soon as a message
+    reports that it has finished. If the websocket connection cannot be used, the
+    method falls back to polling.
+
+    `poll_min_interval` - The shortest number of seconds that `wait_for_current_task`
+    waits between polls of a task. Defaults to 1.0.
+
+    `poll_max_interval` - The longest number of seconds that `wait_for_current_task`
+    waits between polls of a task. Defaults to 30.0. Between these limits, the interval
+    is chosen by the client's `poll_scheduler` from the task's type, elapsed time and progress.
+    Set both options to the same value to poll at a fixed interval.
+
+    `poll_jitter` - The fraction by which poll intervals are randomly lengthened or
+    shortened. Defaults to 0.1.
 
     `verify_ssl_certificates` - If set (True), strict checking of
     the validity of the API server's SSL certificates will be done when the
     `connect` method is called. Set this to False, with extreme caution, to
     disable this check.
+
+    `http_pool_connections` - The number of per-host HTTP connection pools
+    kept by the client's `connection_pool`. Defaults to 4.
+
+    `http_pool_maxsize` - The maximum number of keep-alive connections
+    kept open to a single host. Defaults to 10.
+
+    `http_pool_block` - If set (True), requests wait for a free pooled
+    connection rather than opening more than `http_pool_maxsize` connections
+    to a single host.
+
+    `http_keep_alive` - If set (True, the default), HTTP connections are kept
+    open and re-used by later GraphQL requests and file downloads.
+
+    `schema_cache_path` - If not None, a string indicating the relative or absolute
+    directory where the introspected GraphQL schema will be cached. The cache file is
+    keyed by the `host` and by the API `version` reported by the `clientCompatibility`
+    query, so a cached schema is only re-used until the server's schema version changes.
+
+    `store_path` - If not None, the relative or absolute path of an SQLite database
+    file (see `ExperimentStore`) in which the sessions, validated experimental spaces,
+    designs and experiments received by the client are saved. The store is also read
+    by `reconnect_session`, `sync_experiments_history` and `get_generated_design`,
+    so that generations that are already saved are not downloaded again.
     """
 
     REQUIRED_SPACE_PARAMS = frozenset(
@@ -432,49 +2131,274 @@ fragment TaskFragment on Task {
                 }
             }
         }
-        ... on GenerateTaskResult {
-            type campaign {
-                gen remaining completed
-            }
-            params {
-                validated populationSize replicates designCost space {
-                    type totalUnits table {
-                        colHeaders data
-                    }
-                }
-            }
-            experiments {
-                gen validated hasResponses designRows table {
-                    colHeaders data
-                }
-            }
+        ... on GenerateTaskResult {
+            type campaign {
+                gen remaining completed
+            }
+            params {
+                validated populationSize replicates designCost space {
+                    type totalUnits table {
+                        colHeaders data
+                    }
+                }
+            }
+            experiments {
+                gen validated hasResponses designRows table {
+                    colHeaders data
+                }
+            }
+        }
+        ... on AnalyticsTaskResult {
+            type analytics {
+                gen files {
+                    title filename url
+                }
+            }
+        }
+        ... on SimulateTaskResult {
+            type campaign {
+                gen remaining completed
+            }
+            params {
+                validated populationSize replicates designCost space {
+                    type totalUnits table {
+                        colHeaders data
+                    }
+                }
+            }
+            experimentsHistory {
+                gen validated hasResponses designRows table {
+                    colHeaders data
+                }
+            }
+        }
+    }
+}
+"""
+
+    CURRENT_TASK_STATUS_QUERY = """
+query CurrentTaskStatus($sessionId:String!, $taskId:String, $type:String) {
+    currentTask(sessionId:$sessionId, taskId:$taskId, type:$type) {
+        sessionId taskId type description status gen startedAt progress {
+            phase message
+        }
+        errors {
+            message category fatalError systemError
+        }
+    }
+}
+"""
+    """The status-only query used by `poll_for_current_task` while a task
+    has not yet succeeded."""
+
+    CURRENT_TASK_QUERY = TASK_FRAGMENT + """
+query CurrentTask($sessionId:String!, $taskId:String, $type:String) {
+    currentTask(sessionId:$sessionId, taskId:$taskId, type:$type) {
+        ... TaskFragment
+    }
+}
+"""
+    """The query used by `poll_for_current_task` to fetch the result of a
+    successful task."""
+
+    TASK_UPDATED_SUBSCRIPTION = TASK_FRAGMENT + """
+subscription TaskUpdated($sessionId: String!) {
+    taskUpdated(sessionId: $sessionId) {
+        ... TaskFragment
+    }
+}
+"""
+    """The subscription used to receive task progress when the `run_tasks_async`
+    option is set."""
+
+    CLIENT_COMPATIBILITY_QUERY = """
+query ClientCompatibility($clientVersion:String!) {
+    clientCompatibility(clientVersion:$clientVersion) {
+        version minimumClientVersion compatible changes {
+            path message level safe
+        }
+    }
+}
+"""
+
+    LOGIN_MUTATION = """
+mutation Login($email:String!, $password:String!) {
+    login(email:$email, password:$password) {
+        token user {
+            userId
+        }
+    }
+}
+"""
+
+    CREATE_SESSION_MUTATION = """
+mutation CreateSession($session:NewSessionInput!) {
+    createSession(session:$session) {
+        sessionId version tag name description host active demo
+        campaign {
+            gen remaining completed
+        }
+        params {
+            validated populationSize replicates designCost space {
+                type totalUnits table {
+                    colHeaders data
+                }
+            }
+        }
+    }
+}
+"""
+
+    SESSIONS_QUERY = """
+query GetSessions($userId:String, $q:String) {
+    sessions(userId:$userId, q:$q) {
+        sessionId version tag name description host active demo
+        gen spaceType parameterCount designCost
+        totalCost designedExperimentsCount extraExperimentsCount lastStartedAt
+    }
+}
+"""
+
+    SESSION_FRESHNESS_QUERY = """
+query SessionFreshness($sessionId:String!) {
+    session(sessionId:$sessionId) {
+        sessionId campaign {
+            gen remaining completed
+        }
+    }
+}
+"""
+    """The small query used by `is_session_fresh` to compare a loaded snapshot
+    with the session on the server."""
+
+    SNAPSHOT_VERSION = 2
+    """The version of the file format written by `save`. Version 1 files,
+    which only hold the user and session ids, can still be loaded."""
+
+    SESSION_QUERY = """
+query GetSession($sessionId:String!) {
+    session(sessionId:$sessionId) {
+        sessionId version tag name description host active demo
+        campaign {
+            gen remaining completed
+        }
+        params {
+            validated populationSize replicates designCost space {
+                type totalUnits table {
+                    colHeaders data
+                }
+            }
+        }
+        spaceTemplates {
+            name template {
+                type totalUnits table {
+                    colHeaders data
+                }
+            }
+        }
+        experiments {
+            gen validated hasResponses designRows table {
+                colHeaders data
+            }
+        }
+        tasks {
+            taskId type description status startedAt
+        }
+        totalCost designedExperimentsCount extraExperimentsCount lastStartedAt
+    }
+}
+"""
+
+    HALT_SESSION_MUTATION = """
+mutation HaltSession($sessionId:String!) {
+    haltSession(sessionId:$sessionId) {
+        action status
+    }
+}
+"""
+
+    PUT_EXPERIMENTAL_PARAMETERS_MUTATION = """
+mutation PutExperimentalParameters($sessionId:String!, $params:SessionParametersInput!) {
+    putExperimentalParameters(sessionId:$sessionId, params:$params) {
+        sessionId taskId type description status startedAt
+    }
+}
+"""
+
+    SESSION_PARAMETERS_QUERY = """
+query GetSessionParameters($sessionId:String!) {
+    session(sessionId:$sessionId) {
+        sessionId params {
+            validated populationSize replicates designCost space {
+                type totalUnits table {
+                    colHeaders data
+                }
+            }
+        }
+    }
+}
+"""
+
+    EXPERIMENTS_QUERY = """
+query GetExperiments($sessionId:String!, $designOnly:Boolean!, $gen:Int){
+    experiments(sessionId:$sessionId, designOnly:$designOnly, gen:$gen) {
+        gen validated hasResponses designRows table {
+            colHeaders data
         }
-        ... on AnalyticsTaskResult {
-            type analytics {
-                gen files {
-                    title filename url
-                }
-            }
+    }
+}
+"""
+
+    EXPERIMENTS_HISTORY_QUERY = """
+query GetExperimentsHistory($sessionId:String!){
+    experimentsHistory(sessionId:$sessionId) {
+        gen validated hasResponses designRows table {
+            colHeaders data
         }
-        ... on SimulateTaskResult {
-            type campaign {
-                gen remaining completed
-            }
-            params {
-                validated populationSize replicates designCost space {
-                    type totalUnits table {
-                        colHeaders data
-                    }
-                }
-            }
-            experimentsHistory {
-                gen validated hasResponses designRows table {
-                    colHeaders data
-                }
-            }
+    }
+}
+"""
+
+    SIMULATE_RESPONSES_MUTATION = """
+mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
+    simulateResponses(sessionId:$sessionId, experiments:$experiments) {
+        gen validated hasResponses designRows table {
+            colHeaders data
         }
     }
 }
+"""
+
+    PUT_EXPERIMENTS_MUTATION = """
+mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
+    putExperiments(sessionId:$sessionId, experiments:$experiments) {
+        sessionId taskId type description status startedAt
+    }
+}
+"""
+
+    GENERATE_DESIGN_MUTATION = """
+mutation GenerateDesign($sessionId:String!, $gen:Int!) {
+    generateDesign(sessionId:$sessionId, gen:$gen) {
+        sessionId taskId type description status startedAt
+    }
+}
+"""
+
+    RUN_SIMULATION_MUTATION = """
+mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParametersInput!) {
+    runSimulation(sessionId:$sessionId, ngens:$ngens, params:$params) {
+        sessionId taskId type description status startedAt
+    }
+}
+"""
+
+    CREATE_ANALYTICS_MUTATION = """
+mutation CreateAnalytics($sessionId:String!) {
+    createAnalytics(sessionId:$sessionId) {
+        sessionId taskId type description status startedAt
+    }
+}
 """
 
     @property
@@ -485,6 +2409,19 @@ fragment TaskFragment on Task {
     def options(self, value):
         self.set_options(value)
 
+    session_id = _session_state_property('session_id')
+    session_name = _session_state_property('session_name')
+    session_tag = _session_state_property('session_tag')
+    task_info = _session_state_property('task_info')
+    gen = _session_state_property('gen')
+    remaining = _session_state_property('remaining')
+    completed = _session_state_property('completed')
+    initial_params = _session_state_property('initial_params')
+    validated_params = _session_state_property('validated_params')
+    design = _session_state_property('design')
+    analytics = _session_state_property('analytics')
+    experiments_history = _session_state_property('experiments_history')
+
     def __init__(self, host=None, config=None):
         self.client_version = '0.15.1'
         """The version number of this client.
@@ -505,9 +2442,22 @@ fragment TaskFragment on Task {
             'auto_generate_next_design': False,
             'auto_task_timeout': None,
             'run_tasks_async': False,
+            'return_task_handles': False,
+            'wait_with_subscription': False,
+            'validate_experiments': True,
+            'check_space': False,
+            'poll_min_interval': 1.0,
+            'poll_max_interval': 30.0,
+            'poll_jitter': 0.1,
             # TODO: This should default to True, but apparently ZeroSSL
             # certificates are not trusted by the Python requests module (!)
-            'verify_ssl_certificates': False
+            'verify_ssl_certificates': False,
+            'http_pool_connections': 4,
+            'http_pool_maxsize': 10,
+            'http_pool_block': False,
+            'http_keep_alive': True,
+            'schema_cache_path': None,
+            'store_path': None
         }
         """A Python `dict` containing the runtime options."""
 
@@ -562,71 +2512,64 @@ fragment TaskFragment on Task {
         self.gql = None
         """The `gql.Client` object used to make GraphQL requests to the API."""
 
-        self.gql_version = None
-        """The gql library version, as a 3-tuple, e.g. `(3, 4, 0)`."""
-
-        self.graphql_version = tuple(map(int, graphql.__version__.split('.')))
-        """The graphql library version, as a 3-tuple, e.g. `(3, 1, 5)`."""
-
-        self.auth = TokenAuth()
-        """A `requests.auth` object used to insert the required authorization
-        header in API requests. The auth object's `token` attribute is set by the `login` method.
+        self.validation_cache = DocumentValidationCache()
+        """The `DocumentValidationCache` that remembers which GraphQL documents have
+        already been validated against the current schema.
         """
 
-        self.user_id = None
-        """The user id for the authenticated user, set by the `login` method."""
-
-        self.session_id = None
-        """The session id for a connected Daptics session, as set by the `create_session` method."""
-
-        self.session_name = None
-        """The name of the connected Daptics session, as set by the `create_session` method."""
-
-        self.session_tag = None
-        """The tag (a read-only identifier) of the connected Daptics session, as set by the `create_session` method."""
+        self.poll_scheduler = PollScheduler()
+        """The `PollScheduler` that chooses the interval between polls in
+        `wait_for_current_task`, and learns typical task durations. Its interval
+        limits are set from the `poll_*` options.
+        """
 
-        self.task_info = {}
-        """A Python `dict` that holds information about the polling status for
-        running tasks in the session.
+        self.task_watcher = TaskWatcher(self)
+        """The `TaskWatcher` that watches the tasks of the `TaskHandle`s returned
+        when the `return_task_handles` option is set.
         """
 
-        self.gen = -1
-        """An integer storing the current design "generation number" for the session.
-        This is -1 for a new session, 0 when the session's experimental space has been
-        validated, and greater than zero when a design has been generated by the system.
+        self.task_socket = None
+        """The `TaskSocket` used to start tasks and receive task updates
+        when the `run_tasks_async` option is set, created when first needed.
         """
 
-        self.remaining = None
-        """If not None, an integer representing the number of possible generations that
-        can be generated until the entire design space has been explored.
+        self.connection_pool = None
+        """The `ConnectionPool` shared by GraphQL requests and file downloads,
+        created from the `http_*` options when first needed.
         """
 
-        self.completed = False
-        """A boolean indicating whether the design space has been completely explored."""
+        self._parent = None
+        # The client whose `session_client` method created this one, and which
+        # owns the shared connection pool and store.
 
-        self.initial_params = None
-        """A Python `dict` containing the experimental space parameters defaults as
-        initially returned by the `create_session` method.
+        self.store = None
+        """The `ExperimentStore` in which received tables are saved, created from
+        the `store_path` option when first needed.
         """
 
-        self.validated_params = None
-        """A Python `dict` containing the experimental space parameters as updated
-        from the result of a "space" task.
-        """
+        self._validator_cache = None
+        self._random_generator = None
+        self._mixtures_cache = None
+        self._design_space_cache = None
 
-        self.design = None
-        """A Python `dict` containing the current generated design, as updated by the
-        result of a "generate" task.
-        """
+        self.gql_version = None
+        """The gql library version, as a 3-tuple, e.g. `(3, 4, 0)`."""
 
-        self.analytics = None
-        """A Python `dict` containing information and links to available analytics files,
-        as updated by the result of a "analytics" task.
+        self.graphql_version = tuple(map(int, graphql.__version__.split('.')))
+        """The graphql library version, as a 3-tuple, e.g. `(3, 1, 5)`."""
+
+        self.auth = TokenAuth()
+        """A `requests.auth` object used to insert the required authorization
+        header in API requests. The auth object's `token` attribute is set by the `login` method.
         """
 
-        self.experiments_history = None
-        """A list of Python `dict`s containing all the experiments and responses that
-        have been simulated, as updated by the result of a "simulate" task.
+        self.user_id = None
+        """The user id for the authenticated user, set by the `login` method."""
+
+        self.session_state = SessionState()
+        """The `SessionState` holding the attributes of the connected session. These
+        attributes (`session_id`, `gen`, `design`, etc.) can also be read and set as
+        attributes of the client.
         """
 
         try:
@@ -722,9 +2665,7 @@ fragment TaskFragment on Task {
             If no data was returned by the query request, a `GraphQLError` is raised,
             containing the message for the first item in the GraphQL response's `errors` list.
         """
-        if self.gql.schema:
-            self.gql.validate(document)
-
+        # Validation is done in `call_api`.
         data, errors = self.call_api(document, vars, timeout=timeout)
         self._raise_exception_on_error(data, errors)
         return data
@@ -758,8 +2699,7 @@ fragment TaskFragment on Task {
         request are converted into an item in the `errors` list.
         """
 
-        if self.gql.schema:
-            self.gql.validate(document)
+        self._validate(document)
 
         try:
             result = self.gql._get_result(
@@ -798,19 +2738,34 @@ fragment TaskFragment on Task {
         # print('_task_updated_message_coroutine running user_coro with task')
         return await user_coro(task, **kwargs)
 
-    # Make an authenticated websocket connection, join the Absinthe channel that
-    # handles our GraphQL communications, subcribe to the "taskUpdated"
-    # GraphQL subscription, and then send the task-creating mutation.
-    # If the task was successfully created, listen for incoming messages
-    # on the subscription. Finally, unsubscribe, leave the Absinthe channel,
-    # and disconnect.
+    # Return the client's `TaskSocket`, replacing it if it was made
+    # for another event loop, endpoint or access token.
+    async def _get_task_socket(self, loop):
+        token = self.auth.token
+        task_socket = self.task_socket
+        if task_socket is not None and (task_socket.loop is not loop or
+                                        task_socket.url != self.websocket_url or
+                                        task_socket.token != token):
+            if task_socket.loop is loop:
+                await task_socket.close()
+            self.task_socket = None
+        if self.task_socket is None:
+            self.task_socket = TaskSocket(
+                self.websocket_url, token, self.TASK_UPDATED_SUBSCRIPTION, loop)
+        return self.task_socket
+
+    # Using the client's long-lived websocket connection, make sure there is
+    # a "taskUpdated" GraphQL subscription for the session, and then send the
+    # task-creating mutation over the Absinthe channel that handles our GraphQL
+    # communications. If the task was successfully created, listen for incoming
+    # messages on the subscription. The connection and subscription are kept
+    # open for the next task.
     async def _do_run_async(self, document, vars, loop, task_future):
         if self.session_id is None:
             task_future.set_result((None, [{'message': 'No session_id'}],))
             return
 
-        if self.gql.schema:
-            self.gql.validate(document)
+        self._validate(document)
 
         kwargs = self.task_updated_kwargs
         if kwargs is None:
@@ -818,45 +2773,32 @@ fragment TaskFragment on Task {
         if self.task_updated_coroutine is not None:
             kwargs['user_coro'] = self.task_updated_coroutine
 
-        subscription_vars = {
-            'sessionId': self.session_id
-        }
-
-        subscription_doc = self.TASK_FRAGMENT + """
-subscription TaskUpdated($sessionId: String!) {
-    taskUpdated(sessionId: $sessionId) {
-        ... TaskFragment
-    }
-}
-        """
-
         try:
-            async with Phoenix(self.websocket_url, params={'token': self.auth.token}, loop=loop) as socket:
-                async with Absinthe(socket) as absinthe:
-                    sub_id = await absinthe.subscribe(
-                        self._task_updated_message_coroutine,
-                        subscription_doc, variables=subscription_vars, **kwargs)
-                    mutation_doc = print_ast(document)
-                    response = await absinthe.push_doc(mutation_doc, variables=vars)
-                    if 'response' in response:
-                        response = response['response']
-                        can_set, _why_not = can_set_result(task_future)
-                        if can_set:
-                            task_future.set_result(
-                                (response.get('data'), response.get('errors'), ))
-                        else:
-                            # print('_do_run_async subscription response received ({})'.format(_why_not))
-                            pass
-                        if self._successful(response.get('data')):
-                            await absinthe.run_subscription(sub_id)
-                    else:
-                        can_set, _why_not = can_set_result(task_future)
-                        if can_set:
-                            task_future.set_result(
-                                (None, [{'message': 'No response'}],))
-                        else:
-                            # print('_do_run_async no subscrip[tion response ({})'.format(_why_not))
-                            pass
+            task_socket = await self._get_task_socket(loop)
+            sub_id = await task_socket.subscribe(
+                self.session_id, self._task_updated_message_coroutine, **kwargs)
+            mutation_doc = cached_print_ast(document)
+            response = await task_socket.push_doc(
+                mutation_doc, variables=decode_encoded_tables(vars))
+            if 'response' in response:
+                response = response['response']
+                can_set, _why_not = can_set_result(task_future)
+                if can_set:
+                    task_future.set_result(
+                        (response.get('data'), response.get('errors'), ))
+                else:
+                    # print('_do_run_async subscription response received ({})'.format(_why_not))
+                    pass
+                if self._successful(response.get('data')):
+                    await task_socket.run(sub_id)
+            else:
+                can_set, _why_not = can_set_result(task_future)
+                if can_set:
+                    task_future.set_result(
+                        (None, [{'message': 'No response'}],))
+                else:
+                    # print('_do_run_async no subscrip[tion response ({})'.format(_why_not))
+                    pass
 
         except asyncio.TimeoutError:
             can_set, _why_not = can_set_result(task_future)
@@ -867,6 +2809,9 @@ subscription TaskUpdated($sessionId: String!) {
                 pass
 
         except Exception as e:
+            # The connection may be unusable; make a new one for the next task.
+            if self.task_socket is not None:
+                await self.task_socket.close()
             can_set, _why_not = can_set_result(task_future)
             if can_set:
                 task_future.set_result((None, [{'message': str(e)}],))
@@ -874,6 +2819,20 @@ subscription TaskUpdated($sessionId: String!) {
                 # print('_do_run_async Exception {} ({})'.format(e, _why_not))
                 pass
 
+    def _validate(self, document):
+        if self.gql.schema:
+            self.validation_cache.validate(self.gql, document)
+
+    def validation_cache_stats(self):
+        """Returns the counters for the client's `validation_cache`.
+
+        # Returns
+        stats (dict):
+            A Python `dict` with `hits`, `misses`, `size` and `maxsize` items.
+            Each miss is a full validation of a GraphQL document against the schema.
+        """
+        return self.validation_cache.stats()
+
     def _successful(self, data):
         if data is None:
             return False
@@ -917,7 +2876,10 @@ subscription TaskUpdated($sessionId: String!) {
         return messages
 
     def save(self, fname):
-        """Saves the user and session id to a JSON file.
+        """Saves a snapshot of the client's user, access token, and all of its
+        session state (`session_state`), including the validated experimental space,
+        the current design, the experiments history and analytics, to a file.
+        The snapshot is compact JSON, compressed with gzip if `fname` ends with ".gz".
 
         # Arguments
         fname (str):
@@ -926,50 +2888,90 @@ subscription TaskUpdated($sessionId: String!) {
         # Notes
         There is nothing returned by this method.
         """
-        with open(fname, 'w') as outfile:
-            data = {
-                'user_id': self.user_id,
-                'token': self.auth.token,
-                'session_id': self.session_id,
-                'session_name': self.session_name,
-                'session_tag': self.session_tag
-            }
-            json.dump(data, outfile, ensure_ascii=False, indent=4)
+        data = {
+            'version': self.SNAPSHOT_VERSION,
+            'client_version': self.client_version,
+            'host': self.host,
+            'saved_at': time.time(),
+            'user_id': self.user_id,
+            'token': self.auth.token,
+            'session': self.session_state.to_dict()
+        }
+        with self._open_snapshot(fname, 'wt') as outfile:
+            json.dump(data, outfile, ensure_ascii=False, separators=(',', ':'))
 
     def load(self, fname):
-        """Restores a previously saved client from a JSON file.
+        """Restores a client from a snapshot saved by `save`, without making any
+        requests to the API. Use `is_session_fresh` to check whether the session
+        has changed on the server since the snapshot was saved.
 
         # Arguments
         fname (str):
             The file path to restore the client state from.
 
+        # Raises
+        `InvalidSnapshotError` if the file cannot be read, or was saved by a newer client.
+
         # Notes
         There is nothing returned by this method.
         """
-        self.auth = TokenAuth()
+        try:
+            with self._open_snapshot(fname, 'rt') as infile:
+                data = json.load(infile)
+        except (OSError, ValueError) as e:
+            raise InvalidSnapshotError(fname, e)
+        if not isinstance(data, dict):
+            raise InvalidSnapshotError(fname, 'not a JSON object')
+        version = data.get('version', 1)
+        if version > self.SNAPSHOT_VERSION:
+            raise InvalidSnapshotError(fname, 'unsupported version {}'.format(version))
+
+        # Keep the same auth object, which the GraphQL transport may share.
+        self.auth.token = None
         self.user_id = None
-        self.session_id = None
-        self.session_name = None
-        self.session_tag = None
-        self.task_info = {}
-        self.gen = -1
-        self.remaining = None
-        self.completed = False
-        self.initial_params = None
-        self.validated_params = None
-        self.design = None
-        with open(fname, 'r') as infile:
-            data = json.load(infile)
-            if 'user_id' in data and data['user_id'] is not None:
-                self.user_id = data['user_id']
-                if 'token' in data and data['token'] is not None:
-                    self.auth.token = data['token']
-                if 'session_id' in data and data['session_id'] is not None:
-                    self.session_id = data['session_id']
-                if 'session_name' in data and data['session_name'] is not None:
-                    self.session_name = data['session_name']
-                if 'session_tag' in data and data['session_tag'] is not None:
-                    self.session_name = data['session_tag']
+        self.session_state.init_state()
+        if data.get('user_id') is None:
+            return
+        self.user_id = data['user_id']
+        self.auth.token = data.get('token')
+        if version == 1:
+            self.session_state.update({
+                name: data[name] for name in ('session_id', 'session_name', 'session_tag')
+                if data.get(name) is not None})
+        else:
+            self.session_state.update(data.get('session') or {})
+
+    def _open_snapshot(self, fname, mode):
+        if fname.endswith('.gz'):
+            return gzip.open(fname, mode, encoding='utf-8')
+        return open(fname, mode, encoding='utf-8')
+
+    def is_session_fresh(self):
+        """Checks whether the session state restored by `load` is up to date,
+        by comparing the campaign generation, remaining generations and
+        completion status with the server's. Only a few fields are requested.
+
+        # Returns
+        fresh (bool):
+            True if the session state matches the server. If False, call `reconnect_session`
+            (and `get_experiments_history` if needed) to refresh it.
+        """
+        if self.session_id is None:
+            return False
+        vars = {
+            'sessionId': self.session_id
+        }
+        data = self.execute_query(cached_gql(self.SESSION_FRESHNESS_QUERY), vars)
+        return self._session_matches(data)
+
+    def _session_matches(self, data):
+        session = data.get('session') if data else None
+        if session is None or session.get('campaign') is None:
+            return False
+        campaign = session['campaign']
+        return (campaign.get('gen') == self.gen and
+                campaign.get('remaining') == self.remaining and
+                bool(campaign.get('completed')) == bool(self.completed))
 
     def init_config(self):
         """Reads and processes the client configuration from either a configuration
@@ -1032,8 +3034,40 @@ subscription TaskUpdated($sessionId: String!) {
             'DAPTICS_AUTO_TASK_TIMEOUT', self._options['auto_task_timeout'])
         self._options['run_tasks_async'] = self._boolean_env_var(
             'DAPTICS_RUN_TASKS_ASYNC', self._options['run_tasks_async'])
+        self._options['return_task_handles'] = self._boolean_env_var(
+            'DAPTICS_RETURN_TASK_HANDLES', self._options['return_task_handles'])
+        self._options['wait_with_subscription'] = self._boolean_env_var(
+            'DAPTICS_WAIT_WITH_SUBSCRIPTION', self._options['wait_with_subscription'])
+        self._options['validate_experiments'] = self._boolean_env_var(
+            'DAPTICS_VALIDATE_EXPERIMENTS', self._options['validate_experiments'])
+        self._options['check_space'] = self._boolean_env_var(
+            'DAPTICS_CHECK_SPACE', self._options['check_space'])
+        self._options['poll_min_interval'] = self._float_env_var(
+            'DAPTICS_POLL_MIN_INTERVAL', self._options['poll_min_interval'])
+        self._options['poll_max_interval'] = self._float_env_var(
+            'DAPTICS_POLL_MAX_INTERVAL', self._options['poll_max_interval'])
+        self._options['poll_jitter'] = self._float_env_var(
+            'DAPTICS_POLL_JITTER', self._options['poll_jitter'])
         self._options['verify_ssl_certificates'] = self._boolean_env_var(
             'DAPTICS_VERIFY_SSL_CERTIFICATES', self._options['verify_ssl_certificates'])
+        self._options['http_pool_connections'] = self._int_env_var(
+            'DAPTICS_HTTP_POOL_CONNECTIONS', self._options['http_pool_connections'])
+        self._options['http_pool_maxsize'] = self._int_env_var(
+            'DAPTICS_HTTP_POOL_MAXSIZE', self._options['http_pool_maxsize'])
+        self._options['http_pool_block'] = self._boolean_env_var(
+            'DAPTICS_HTTP_POOL_BLOCK', self._options['http_pool_block'])
+        self._options['http_keep_alive'] = self._boolean_env_var(
+            'DAPTICS_HTTP_KEEP_ALIVE', self._options['http_keep_alive'])
+        self._options['schema_cache_path'] = os.getenv(
+            'DAPTICS_SCHEMA_CACHE_PATH', default=self._options['schema_cache_path'])
+        self._options['store_path'] = os.getenv(
+            'DAPTICS_STORE_PATH', default=self._options['store_path'])
+
+    def _int_env_var(self, varname, default):
+        value = os.getenv(varname)
+        if value is None:
+            return default
+        return int(value)
 
     def _float_env_var(self, varname, default):
         value = os.getenv(varname)
@@ -1082,8 +3116,10 @@ subscription TaskUpdated($sessionId: String!) {
     def connect(self):
         """Reads and processes client configuration, and instantiates the client if it has not
         been done before. Creates an HTTP transport instance from the client's
-        `api_url` attribute, and attempts to connect to the introspection interface.
-        The `gql.Client` value is stored in the client's `gql` attribute.
+        `api_url` attribute, checks the compatibility of the API, and then loads
+        the GraphQL schema, either from the `schema_cache_path` directory or from the
+        introspection interface. The `gql.Client` value is stored in the client's
+        `gql` attribute.
 
         # Returns
         Nothing
@@ -1095,36 +3131,174 @@ subscription TaskUpdated($sessionId: String!) {
         MissingConfigError
             If the config file specified does not exist.
 
-        InvalidConfigError
-            If the config file specified cannot be parsed, or does not have a 'host'
-            value.
+        InvalidConfigError
+            If the config file specified cannot be parsed, or does not have a 'host'
+            value.
+
+        NoHostError
+            If there is no config file specifed and no host has been set.
+
+        requests.exceptions.ConnectionError
+            If the connection cannot be made.
+        """
+        if self.gql is None:
+            self.init_config()
+            if self.host is None:
+                raise NoHostError()
+
+            ws_host = re.sub(r'^http', 'ws', self.host)
+            self.api_url = '{0}/api'.format(self.host)
+            self.websocket_url = '{0}/socket/websocket'.format(ws_host)
+
+            http = CachedPrintHTTPTransport(
+                self.api_url,
+                session=self.get_connection_pool().session,
+                auth=self.auth,
+                use_json=True,
+                verify=self._options['verify_ssl_certificates'])
+            self.gql = gql.Client(transport=http)
+
+        compat = self.check_api_compatibility()
+        if compat['compatible'] is not None and not compat['compatible']:
+            raise IncompatibleApiError(self.host, compat['minimumClientVersion'])
+
+        if self.gql.schema is None:
+            self._load_schema(compat.get('version'))
+
+    def schema_cache_file(self, version):
+        """Returns the location of the cached GraphQL schema for the client's
+        `host` and the given API version.
+
+        # Arguments
+        version (str):
+            The API version, as returned by the `clientCompatibility` query.
+
+        # Returns
+        fname (str):
+            The file path of the cached introspection result, or None if the
+            `schema_cache_path` option is not set or the version is not known.
+        """
+        cache_path = self._options.get('schema_cache_path')
+        if cache_path is None or version is None or self.host is None:
+            return None
+        key = re.sub(r'[^A-Za-z0-9.-]+', '_', '{}-{}'.format(self.host, version))
+        return os.path.join(os.path.abspath(cache_path), 'schema-{}.json'.format(key))
+
+    def _load_schema(self, version):
+        fname = self.schema_cache_file(version)
+        introspection = self._read_cached_schema(fname)
+        if introspection is None:
+            result = self.gql.transport.execute(cached_gql(graphql.introspection_query))
+            self._raise_exception_on_error(result.data, result.errors)
+            introspection = result.data
+            self._write_cached_schema(fname, introspection)
+
+        self.gql = gql.Client(transport=self.gql.transport, introspection=introspection)
+
+    def _read_cached_schema(self, fname):
+        if fname is not None and os.path.exists(fname):
+            try:
+                with open(fname, 'r') as infile:
+                    return json.load(infile)
+            except (OSError, ValueError):
+                pass
+        return None
+
+    def _write_cached_schema(self, fname, introspection):
+        if fname is not None:
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            tmp_fname = '{}.{}.tmp'.format(fname, os.getpid())
+            with open(tmp_fname, 'w') as outfile:
+                json.dump(introspection, outfile)
+            os.replace(tmp_fname, fname)
+
+    def get_connection_pool(self):
+        """Returns the client's `ConnectionPool`, creating it from the
+        `http_pool_connections`, `http_pool_maxsize`, `http_pool_block` and
+        `http_keep_alive` options if it does not exist yet.
+
+        # Returns
+        pool (`ConnectionPool`):
+            The pool shared by GraphQL requests and file downloads.
+        """
+        if self.connection_pool is None:
+            self.connection_pool = ConnectionPool(
+                pool_connections=self._options['http_pool_connections'],
+                pool_maxsize=self._options['http_pool_maxsize'],
+                pool_block=self._options['http_pool_block'],
+                keep_alive=self._options['http_keep_alive'])
+        return self.connection_pool
+
+    def connection_pool_stats(self):
+        """Returns the connection re-use counters for the client's `ConnectionPool`.
+
+        # Returns
+        stats (dict):
+            A Python `dict` with `requests`, `hits` and `misses` items. `misses` is
+            the number of new connections (TCP and TLS handshakes) that were opened.
+        """
+        return self.get_connection_pool().stats.as_dict()
 
-        NoHostError
-            If there is no config file specifed and no host has been set.
+    def get_store(self):
+        """Returns the client's `ExperimentStore`, opening it if it does not exist yet.
 
-        requests.exceptions.ConnectionError
-            If the connection cannot be made.
+        # Returns
+        store (`ExperimentStore`):
+            The store, or None if the `store_path` option is not set.
         """
-        if self.gql is None:
-            self.init_config()
-            if self.host is None:
-                raise NoHostError()
+        if self.store is None and self._options.get('store_path'):
+            self.store = ExperimentStore(self._options['store_path'])
+        return self.store
 
-            ws_host = re.sub(r'^http', 'ws', self.host)
-            self.api_url = '{0}/api'.format(self.host)
-            self.websocket_url = '{0}/socket/websocket'.format(ws_host)
+    def close(self):
+        """Closes all pooled HTTP connections, the task websocket connection
+        and the experiment store. The client can be used again after calling `connect`.
 
-            http = gql.transport.requests.RequestsHTTPTransport(
-                self.api_url,
-                auth=self.auth,
-                use_json=True,
-                verify=self._options['verify_ssl_certificates'])
-            self.gql = gql.Client(
-                transport=http, fetch_schema_from_transport=True)
+        A client created by `session_client` only closes its own task websocket
+        connection, and any connection pool or store that it created itself; the
+        ones it shares are left open for the client that created them.
 
-        compat = self.check_api_compatibility()
-        if compat['compatible'] is not None and not compat['compatible']:
-            raise IncompatibleApiError(self.host, compat['minimumClientVersion'])
+        # Returns
+        Nothing
+        """
+        parent = self._parent
+        if self.connection_pool is not None:
+            if parent is None or self.connection_pool is not parent.connection_pool:
+                self.connection_pool.close()
+            self.connection_pool = None
+        if self.task_socket is not None:
+            loop = self.task_socket.loop
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(self.task_socket.close())
+            self.task_socket = None
+        if self.store is not None:
+            if parent is None or self.store is not parent.store:
+                self.store.close()
+            self.store = None
+        self.gql = None
+
+    def session_client(self):
+        """Creates a client for working on another session, that shares this
+        client's connection pool, GraphQL client and schema, validation cache,
+        poll scheduler, task watcher, experiment store and access token, so that no
+        additional connection, schema fetch or login is needed. The new client has a
+        copy of this client's options, and a new, empty `session_state`. Each client can then be used by a different
+        thread. Closing the new client does not close the shared connection pool or
+        store; close this client for that.
+
+        # Returns
+        client (`DapticsClient`):
+            A client of the same class as this one.
+        """
+        self.get_store()
+        client = copy.copy(self)
+        client._options = dict(self._options)
+        if self.task_updated_kwargs is not None:
+            client.task_updated_kwargs = dict(self.task_updated_kwargs)
+        client.task_socket = None
+        client.session_state = SessionState()
+        client._parent = self
+        return client
 
     def check_api_compatibility(self):
         """Checks the version of this client against the requirements of
@@ -1141,15 +3315,7 @@ subscription TaskUpdated($sessionId: String!) {
         vars = {
             'clientVersion': self.client_version
         }
-        doc = gql.gql("""
-        query ClientCompatibility($clientVersion:String!) {
-            clientCompatibility(clientVersion:$clientVersion) {
-                version minimumClientVersion compatible changes {
-                    path message level safe
-                }
-            }
-        }
-        """)
+        doc = cached_gql(self.CLIENT_COMPATIBILITY_QUERY)
         data = self.execute_query(doc, vars)
         return data['clientCompatibility']
 
@@ -1189,34 +3355,32 @@ subscription TaskUpdated($sessionId: String!) {
         are stored in the client's `user_id` and `auth` attributes.
         """
 
+        vars = self._login_vars(email, password)
+        # print('Login on {} for user {}'.format(self.host, email), file=sys.stderr)
+
+        # The 'login' mutation authenticates a user's email and password and returns
+        # an access token that self.auth will then use to add an "Authorization"
+        # header, required for session queries and mutations.
+        doc = cached_gql(self.LOGIN_MUTATION)
+        data = self.execute_query(doc, vars)
+        self._set_login(data)
+        return data
+
+    def _login_vars(self, email, password):
         if email is None or password is None:
             try:
                 email, password = self.credentials
             except:
                 raise NoCredentialsError()
-        vars = {
+        return {
             'email': email,
             'password': password
         }
-        # print('Login on {} for user {}'.format(self.host, email), file=sys.stderr)
 
-        # The 'login' mutation authenticates a user's email and password and returns
-        # an access token that self.auth will then use to add an "Authorization"
-        # header, required for session queries and mutations.
-        doc = gql.gql("""
-mutation Login($email:String!, $password:String!) {
-    login(email:$email, password:$password) {
-        token user {
-            userId
-        }
-    }
-}
-        """)
-        data = self.execute_query(doc, vars)
+    def _set_login(self, data):
         if 'login' in data and data['login'] is not None:
             self.auth.token = data['login']['token']
             self.user_id = data['login']['user']['userId']
-        return data
 
     def create_session(self, name, description):
         """Creates a new daptics session.
@@ -1249,38 +3413,14 @@ mutation Login($email:String!, $password:String!) {
         # The 'createSession' mutation will add a new session to the backend's database,
         # copy runtime files to a fresh Rserve session directory on the Rserve filesystem,
         # start the session and return initial session information.
-        doc = gql.gql("""
-mutation CreateSession($session:NewSessionInput!) {
-    createSession(session:$session) {
-        sessionId version tag name description host active demo
-        campaign {
-            gen remaining completed
-        }
-        params {
-            validated populationSize replicates designCost space {
-                type totalUnits table {
-                    colHeaders data
-                }
-            }
-        }
-    }
-}
-        """)
+        doc = cached_gql(self.CREATE_SESSION_MUTATION)
 
         data, errors = self.call_api(doc, vars)
+        return self._set_created_session(data, errors)
+
+    def _set_created_session(self, data, errors):
         if data and 'createSession' in data and data['createSession'] is not None:
-            session = data['createSession']
-            self.session_id = session['sessionId']
-            self.session_name = session['name']
-            self.session_tag = session['tag']
-            self.gen = session['campaign']['gen']
-            self.remaining = session['campaign']['remaining']
-            self.completed = session['campaign']['completed']
-            self.initial_params = session['params']
-            if self.gen >= 0:
-                self.validated_params = session['params']
-            else:
-                self.validated_params = None
+            self._set_session(data['createSession'])
             self.task_info = {}
             self.design = None
         else:
@@ -1292,6 +3432,23 @@ mutation CreateSession($session:NewSessionInput!) {
 
         return data
 
+    def _set_session(self, session):
+        if session['sessionId'] != self.session_id:
+            # The design, analytics and experiments history belong to the
+            # previous session.
+            self.session_state.init_state()
+        self.session_id = session['sessionId']
+        self.session_name = session['name']
+        self.session_tag = session['tag']
+        self.gen = session['campaign']['gen']
+        self.remaining = session['campaign']['remaining']
+        self.completed = session['campaign']['completed']
+        self.initial_params = session['params']
+        if self.gen >= 0:
+            self.validated_params = session['params']
+        else:
+            self.validated_params = None
+
     def list_sessions(self, user_id=None, name=None):
         """Returns a list of all the user's sessions.
 
@@ -1322,15 +3479,7 @@ mutation CreateSession($session:NewSessionInput!) {
         }
 
         # The 'sessions' query will return a list of sessions.
-        doc = gql.gql("""
-query GetSessions($userId:String, $q:String) {
-    sessions(userId:$userId, q:$q) {
-        sessionId version tag name description host active demo
-        gen spaceType parameterCount designCost
-        totalCost designedExperimentsCount extraExperimentsCount lastStartedAt
-    }
-}
-        """)
+        doc = cached_gql(self.SESSIONS_QUERY)
         return self.execute_query(doc, vars)
 
     def reconnect_session(self, session_id):
@@ -1360,55 +3509,20 @@ query GetSessions($userId:String, $q:String) {
         }
 
         # The 'session' query will return the state of the session.
-        doc = gql.gql("""
-query GetSession($sessionId:String!) {
-    session(sessionId:$sessionId) {
-        sessionId version tag name description host active demo
-        campaign {
-            gen remaining completed
-        }
-        params {
-            validated populationSize replicates designCost space {
-                type totalUnits table {
-                    colHeaders data
-                }
-            }
-        }
-        spaceTemplates {
-            name template {
-                type totalUnits table {
-                    colHeaders data
-                }
-            }
-        }
-        experiments {
-            gen validated hasResponses designRows table {
-                colHeaders data
-            }
-        }
-        tasks {
-            taskId type description status startedAt
-        }
-        totalCost designedExperimentsCount extraExperimentsCount lastStartedAt
-    }
-}
-        """)
+        doc = cached_gql(self.SESSION_QUERY)
         data = self.execute_query(doc, vars)
+        self._set_reconnected_session(data)
+        return data
+
+    def _set_reconnected_session(self, data):
         if 'session' in data and data['session'] is not None:
             session = data['session']
-            self.session_id = session['sessionId']
-            self.session_name = session['name']
-            self.session_tag = session['tag']
-            self.gen = session['campaign']['gen']
-            self.remaining = session['campaign']['remaining']
-            self.completed = session['campaign']['completed']
-            self.initial_params = session['params']
-            if self.gen >= 0:
-                self.validated_params = session['params']
-            else:
-                self.validated_params = None
+            self._set_session(session)
             self.design = session['experiments']
-        return data
+            store = self.get_store()
+            if store is not None:
+                store.put_session(session)
+                store.put_generation(self.session_id, self.design, store.DESIGN)
 
     def halt_session(self, session_id):
         """Closes an connected session, to release all resources.
@@ -1441,13 +3555,7 @@ query GetSession($sessionId:String!) {
             'sessionId': session_id
         }
 
-        doc = gql.gql("""
-mutation HaltSession($sessionId:String!) {
-    haltSession(sessionId:$sessionId) {
-        action status
-    }
-}
-        """)
+        doc = cached_gql(self.HALT_SESSION_MUTATION)
         return self.execute_query(doc, vars)
 
     def put_experimental_parameters(self, params):
@@ -1473,6 +3581,10 @@ mutation HaltSession($sessionId:String!) {
             If no data was returned by the query request, a `GraphQLError` is raised,
             containing the message for the first item in the GraphQL response's `errors` list.
 
+        InvalidExperimentalParametersError
+            If the `check_space` option is set, and `check_experimental_parameters`
+            finds problems with the space.
+
         # Notes
         If the task was successfully started, the task information is stored in the client's
         `task_info` attribute.
@@ -1581,6 +3693,11 @@ mutation HaltSession($sessionId:String!) {
         ```
         """
 
+        if self._options.get('check_space', False):
+            problems = self.check_experimental_parameters(params)
+            if len(problems) > 0:
+                raise InvalidExperimentalParametersError(problems)
+
         col_headers = self.space_table_column_names(params['space'])
         params['space']['table']['colHeaders'] = col_headers
 
@@ -1601,26 +3718,85 @@ mutation HaltSession($sessionId:String!) {
         # parameters or space are not valid (don't generate enough complexity, etc.).
         # If the parameters are valid, information about the long running 'space'
         # task is returned, and the user should poll until the task has completed.
-        doc = gql.gql("""
-mutation PutExperimentalParameters($sessionId:String!, $params:SessionParametersInput!) {
-    putExperimentalParameters(sessionId:$sessionId, params:$params) {
-        sessionId taskId type description status startedAt
-    }
-}
-        """)
-        if self._options.get('run_tasks_async', False):
-            data, errors = self.run_task_async(doc, vars)
-        else:
-            data, errors = self.call_api(doc, vars)
-        self._raise_exception_on_error(data, errors)
+        doc = cached_gql(self.PUT_EXPERIMENTAL_PARAMETERS_MUTATION)
+        return self._start_task('putExperimentalParameters', doc, vars)
 
-        if 'putExperimentalParameters' in data and data['putExperimentalParameters'] is not None:
-            task_id = data['putExperimentalParameters']['taskId']
-            self.task_info[task_id] = data['putExperimentalParameters']
-            auto_task = self._auto_task()
-            if auto_task is not None:
-                return {'putExperimentalParameters': auto_task}
-        return data
+    def check_experimental_parameters(self, params):
+        """Checks the experimental space in the experimental parameters locally, without
+        contacting the API. Each parameter's type and values are checked, and the exact
+        number of experiments in the space is counted; it must be at least the
+        `populationSize`. Spaces whose type is not "factorial" or "mixture", such as
+        "sparsefactorial" spaces, are not checked.
+
+        # Arguments
+        params (dict):
+            A Python `dict` with `space` and (optionally) `populationSize` items, as
+            for `put_experimental_parameters`.
+
+        # Returns
+        problems (list):
+            A list of strings describing the problems found, empty if there are none.
+        """
+        from .design_space import check_space
+
+        return check_space(params['space'], params.get('populationSize'))
+
+    def design_space(self, space=None):
+        """Returns a `DesignSpace` for an experimental space, which counts, ranks and
+        enumerates the experiments in the space locally. The `DesignSpace` is re-used
+        by later calls for the same space.
+
+        # Arguments
+        space (dict, optional):
+            A Python `dict` that defines the experimental space. If None, the validated
+            experimental space is used.
+
+        # Returns
+        design_space (`DesignSpace`):
+            None if no space was given and the space has not been validated.
+
+        # Raises
+        UnsupportedSpaceTypeError
+            If the type of the space is not "factorial" or "mixture".
+
+        # Examples
+        ```python
+        >>> daptics.design_space().size
+        >>> daptics.design_space().rank(['0', '4', '1', '1'])
+        ```
+        """
+        from .design_space import DesignSpace
+
+        if space is None:
+            space = self.get_experimental_space()
+            if space is None:
+                return None
+        cached = self._design_space_cache
+        if cached is None or cached.space is not space:
+            cached = DesignSpace(space)
+            self._design_space_cache = cached
+        return cached
+
+    def experimental_space_size(self, space=None):
+        """Returns the exact number of distinct experiments in an experimental space.
+
+        # Arguments
+        space (dict, optional):
+            A Python `dict` that defines the experimental space. If None, the validated
+            experimental space is used.
+
+        # Returns
+        size (int):
+            The number of experiments, or None if no space was given and the space has
+            not been validated. For a "mixture" space, only the mixtures whose
+            units add up to `totalUnits` are counted.
+
+        # Raises
+        UnsupportedSpaceTypeError
+            If the type of the space is not "factorial" or "mixture".
+        """
+        design_space = self.design_space(space)
+        return None if design_space is None else design_space.size
 
     def put_experimental_parameters_csv(self, fname, params):
         """Validates the experimental parameters at the beginning of a session,
@@ -1631,7 +3807,7 @@ mutation PutExperimentalParameters($sessionId:String!, $params:SessionParameters
         fname (str):
             The location on the filesystem for a CSV file that will define
             the experimental space definition. See the Examples section
-            below for an example.
+            below for an example. The file may be gzip-compressed.
 
         params (dict):
             A Python `dict` containing the experimental parameters to be
@@ -1722,11 +3898,7 @@ mutation PutExperimentalParameters($sessionId:String!, $params:SessionParameters
         rows.
         """
 
-        param_rows = []
-        with open(fname, newline='') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',')
-            param_rows = [r for r in reader]
-        params['space']['table'] = {'data': param_rows}
+        params['space']['table'] = {'data': read_csv_rows(fname)}
         return self.put_experimental_parameters(params)
 
     def get_experiments(self, design_only=False, gen=None):
@@ -1777,15 +3949,7 @@ mutation PutExperimentalParameters($sessionId:String!, $params:SessionParameters
             if design_only:
                 vars['designOnly'] = True
 
-        doc = gql.gql("""
-query GetExperiments($sessionId:String!, $designOnly:Boolean!, $gen:Int){
-    experiments(sessionId:$sessionId, designOnly:$designOnly, gen:$gen) {
-        gen validated hasResponses designRows table {
-            colHeaders data
-        }
-    }
-}
-        """)
+        doc = cached_gql(self.EXPERIMENTS_QUERY)
         return self.execute_query(doc, vars)
 
     def get_experiments_history(self):
@@ -1827,25 +3991,143 @@ query GetExperiments($sessionId:String!, $designOnly:Boolean!, $gen:Int){
             experiments submitted or designed for the generation.
 
         This method also updates the client's `experiments_history` attribute.
+        To avoid downloading every generation again in a long campaign, use
+        `sync_experiments_history` instead.
         """
 
         vars = {
             'sessionId': self.session_id
         }
-        doc = gql.gql("""
-query GetExperimentsHistory($sessionId:String!){
-    experimentsHistory(sessionId:$sessionId) {
-        gen validated hasResponses designRows table {
-            colHeaders data
-        }
-    }
-}
-        """)
+        doc = cached_gql(self.EXPERIMENTS_HISTORY_QUERY)
         data = self.execute_query(doc, vars)
+        self._set_experiments_history(data)
+        return data
 
+    def _set_experiments_history(self, data):
         if 'experimentsHistory' in data:
             self.experiments_history = data['experimentsHistory']
-        return data
+            self._store_history(self.experiments_history)
+
+    def _store_history(self, history):
+        store = self.get_store()
+        if store is not None and self.session_id is not None:
+            store.put_history(self.session_id, history)
+
+    def _stored_history(self):
+        store = self.get_store()
+        if store is not None and self.session_id is not None:
+            self.experiments_history = store.get_history(self.session_id)
+        return self.experiments_history
+
+    def sync_experiments_history(self):
+        """Brings the client's `experiments_history` attribute up to date, fetching
+        only the generations that may have changed since it was last retrieved.
+
+        # Returns
+        experiments_history (list): or None
+            The updated value of the client's `experiments_history` attribute.
+            See the documentation for the `get_experiments_history` method for a description
+            of this value.
+
+        # Raises
+        GraphQLError
+            If the session or one of the generations could not be queried, a `GraphQLError`
+            is raised, containing the message for the first item in the GraphQL response's
+            `errors` list. The `experiments_history` attribute is then left unchanged.
+
+        # Notes
+        If the history has not been retrieved yet, it is read from the client's `store`,
+        if there is one, or else retrieved with `get_experiments_history`. Otherwise the generations already known locally are
+        kept, and the last known generation (which may have received responses since)
+        and any generations designed after it are fetched with `experiments` queries.
+        In the common case, where at most one new generation has been designed,
+        this takes a single request, whatever the length of the campaign.
+        """
+
+        if self.experiments_history is None and self._stored_history() is None:
+            self.get_experiments_history()
+            return self.experiments_history
+
+        gens = self._history_sync_gens()
+        results = self._history_sync_batch(gens, True).execute()
+        server_gen = self._history_server_gen(results.pop(0))
+        more = list(range(gens[-1] + 1, server_gen + 1))
+        if len(more) > 0:
+            gens += more
+            results += self._history_sync_batch(more, False).execute()
+        self._merge_experiments_history(server_gen, gens, results)
+        return self.experiments_history
+
+    def get_experiments_history_since(self, gen):
+        """Synchronizes the experiments history with `sync_experiments_history`,
+        and returns the generations starting with generation `gen`.
+
+        # Arguments
+        gen (int):
+            The first generation to return. Use 0 to include the initial experiments.
+
+        # Returns
+        experiments (list):
+            A list of the `dict`s for generations `gen` and later, in generation order.
+            Generations that have no experiments are omitted. See the documentation
+            for the `get_experiments_history` method for a description of each item.
+
+        # Examples
+        ```python
+        >>> seen = 0
+        >>> for exp in daptics.get_experiments_history_since(seen):
+        ...     process(exp['gen'], exp['table'])
+        ...     seen = exp['gen']
+        ```
+        """
+
+        history = self.sync_experiments_history()
+        return self._history_since(history, gen)
+
+    def _history_sync_gens(self):
+        # The last known generation is fetched again, with the next one, in the
+        # same request as the campaign status.
+        last = max(len(self.experiments_history) - 1, 0)
+        return [last, last + 1]
+
+    def _history_sync_batch(self, gens, campaign):
+        batch = self.query_batch()
+        if campaign:
+            batch.add(self.SESSION_FRESHNESS_QUERY, {'sessionId': self.session_id})
+        for gen in gens:
+            batch.experiments(self.session_id, gen)
+        return batch
+
+    def _history_server_gen(self, result):
+        data, errors = result
+        self._raise_exception_on_error(data, errors)
+        campaign = data['session']['campaign']
+        return -1 if campaign is None else campaign['gen']
+
+    def _merge_experiments_history(self, server_gen, gens, results):
+        # A failed query leaves the history unchanged, rather than erasing a
+        # known generation.
+        for gen, (data, errors) in zip(gens, results):
+            if gen <= server_gen and errors:
+                self._raise_exception_on_error(None, errors)
+        with self.session_state.lock:
+            history = list(self.experiments_history or [])
+            fetched = []
+            for gen, (data, _errors) in zip(gens, results):
+                # Generations that have not been designed yet are ignored.
+                if gen > server_gen:
+                    continue
+                while len(history) <= gen:
+                    history.append(None)
+                history[gen] = data.get('experiments') if data else None
+                fetched.append(history[gen])
+            self.experiments_history = history
+        self._store_history(fetched)
+
+    def _history_since(self, history, gen):
+        if history is None:
+            return []
+        return [exp for exp in history[max(gen, 0):] if exp is not None]
 
     def get_generated_design(self, gen=None):
         """Gets a design generation from the session.
@@ -1873,10 +4155,29 @@ query GetExperimentsHistory($sessionId:String!){
         table (dict):
             A Python `dict` with `colHeaders` and `data` values, representing the
             experiments submitted or designed for the generation.
+
+        # Notes
+        If the client has a `store`, a design that has been saved there is returned
+        without contacting the API, unless `gen` is None.
         """
 
-        data = self.get_experiments(design_only=True, gen=gen)
-        return data['experiments']
+        design = self._stored_design(gen)
+        if design is None:
+            data = self.get_experiments(design_only=True, gen=gen)
+            design = data['experiments']
+            self._store_design(design)
+        return design
+
+    def _stored_design(self, gen):
+        store = self.get_store()
+        if store is None or gen is None or self.session_id is None:
+            return None
+        return store.get_generation(self.session_id, gen, store.DESIGN)
+
+    def _store_design(self, design):
+        store = self.get_store()
+        if store is not None and self.session_id is not None:
+            store.put_generation(self.session_id, design, store.DESIGN)
 
     def simulate_experiment_responses(self, experiments=None):
         """Generates values for the "Response" column.  The values are a
@@ -1922,15 +4223,7 @@ query GetExperimentsHistory($sessionId:String!){
             vars['experiments'] = experiments
 
         # A 'simulateResponses' mutation may supply an `experiments` table.
-        doc = gql.gql("""
-mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
-    simulateResponses(sessionId:$sessionId, experiments:$experiments) {
-        gen validated hasResponses designRows table {
-            colHeaders data
-        }
-    }
-}
-        """)
+        doc = cached_gql(self.SIMULATE_RESPONSES_MUTATION)
         return self.execute_query(doc, vars)
 
     def simulate_experiment_responses_csv(self, fname):
@@ -1947,26 +4240,27 @@ mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
         # Arguments
         fname (str):
             The location on the filesystem for a CSV file that will define
-            the parameters for designed and any extra experiments.
+            the parameters for designed and any extra experiments. The file may
+            be gzip-compressed.
 
         # Returns
         data (dict):
             The JSON response from the GraphQL request, a Python `dict` with a
             `simulateExperiments` item.
+
+        # Raises
+        CsvNoDataRowsError
+            If the file does not have a header row and at least one data row.
+
+        CsvRowLengthError
+            If a data row does not have the same number of columns as the header row.
+
+        # Notes
+        The file is read with `EncodedTable.from_csv`, which serializes the rows as they
+        are read, so that large files are not held in memory as lists of strings.
         """
 
-        experiments = None
-        header_and_experiments = []
-        with open(fname, newline='') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',')
-            header_and_experiments = [r for r in reader]
-        if len(header_and_experiments) > 1:
-            experiments = {
-                'colHeaders': header_and_experiments[0],
-                'data': header_and_experiments[1:]
-            }
-        else:
-            raise CsvNoDataRowsError(fname)
+        experiments = EncodedTable.from_csv(fname)
         return self.simulate_experiment_responses(experiments)
 
     def put_experiments(self, experiments_type, experiments):
@@ -2018,6 +4312,10 @@ mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
             `poll_for_current_task` method.
 
         # Raises
+        InvalidExperimentsError
+            If the `validate_experiments` option is set, and the table does not match
+            the validated experimental space. Nothing is uploaded.
+
         GraphQLError
             If no data was returned by the query request, a `GraphQLError` is raised,
             containing the message for the first item in the GraphQL response's `errors` list.
@@ -2066,6 +4364,7 @@ mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
 
         if type(experiments_type) != DapticsExperimentsType:
             raise InvalidExperimentsTypeError(experiments_type)
+        self._check_experiments(experiments)
 
         vars = {
             'sessionId': self.session_id,
@@ -2082,26 +4381,63 @@ mutation SimulateResponses($sessionId:String!, $experiments:DataFrameInput) {
         # If the generation number and saved responses are valid, information
         # about the long running 'update' task is returned, and the user should
         # poll until the task has completed.
-        doc = gql.gql("""
-mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
-    putExperiments(sessionId:$sessionId, experiments:$experiments) {
-        sessionId taskId type description status startedAt
-    }
-}
-        """)
-        if self._options.get('run_tasks_async', False):
-            data, errors = self.run_task_async(doc, vars)
-        else:
-            data, errors = self.call_api(doc, vars)
-        self._raise_exception_on_error(data, errors)
+        doc = cached_gql(self.PUT_EXPERIMENTS_MUTATION)
+        return self._start_task('putExperiments', doc, vars)
+
+    def experiments_validator(self):
+        """Returns an `ExperimentsValidator` for the validated experimental space.
+        The validator is re-used until the `validated_params` attribute changes.
+
+        # Returns
+        validator (`ExperimentsValidator`):
+            None if the experimental space has not been validated.
+        """
+        space = self.get_experimental_space()
+        if space is None:
+            return None
+        cached = self._validator_cache
+        if cached is None or cached.space is not space:
+            cached = ExperimentsValidator(space)
+            self._validator_cache = cached
+        return cached
+
+    def validate_experiments(self, experiments, require_responses=False):
+        """Checks an experiments table against the validated experimental space,
+        without uploading it.
+
+        # Arguments
+        experiments (dict):
+            A Python `dict` with `colHeaders` and `data` items.
+
+        require_responses (bool, optional):
+            If True, empty responses are reported as errors.
 
-        if 'putExperiments' in data and data['putExperiments'] is not None:
-            task_id = data['putExperiments']['taskId']
-            self.task_info[task_id] = data['putExperiments']
-            auto_task = self._auto_task()
-            if auto_task is not None:
-                return {'putExperiments': auto_task}
-        return data
+        # Returns
+        report (`ValidationReport`):
+            The errors found, with their row numbers and column names.
+
+        # Raises
+        SessionParametersNotValidatedError
+            If the experimental space has not been validated.
+        """
+        validator = self.experiments_validator()
+        if validator is None:
+            raise SessionParametersNotValidatedError()
+        return validator.validate(experiments, require_responses)
+
+    def _experiments_validator_option(self):
+        if not self._options.get('validate_experiments', False):
+            return None
+        return self.experiments_validator()
+
+    def _check_experiments(self, experiments):
+        if isinstance(experiments, EncodedTable):
+            report = experiments.report
+        else:
+            validator = self._experiments_validator_option()
+            report = None if validator is None else validator.validate(experiments)
+        if report is not None and not report.valid:
+            raise InvalidExperimentsError(report)
 
     def put_experiments_csv(self, experiments_type, fname):
         """Validate the responses for designed experiments, and any extra experiments
@@ -2128,7 +4464,7 @@ mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
         fname (str):
             The location on the filesystem for a CSV file that will define
             the results of the designed and any extra experiments. See the Examples section
-            below for an example.
+            below for an example. The file may be gzip-compressed.
 
         # Returns
         data (dict):
@@ -2137,7 +4473,22 @@ mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
             "update" task that was started, as described in the return value for the
             `poll_for_current_task` method.
 
+        # Raises
+        CsvNoDataRowsError
+            If the file does not have a header row and at least one data row.
+
+        CsvRowLengthError
+            If a data row does not have the same number of columns as the header row.
+
+        InvalidExperimentsError
+            If the `validate_experiments` option is set, and the file does not match
+            the validated experimental space. Nothing is uploaded.
+
         # Notes
+        The file is read with `EncodedTable.from_csv`, which serializes the rows as they
+        are read, so that large files are not held in memory as lists of strings.
+        The rows are checked against the validated space as they are read.
+
         If the experiments were successfully validated, the following actions may be
         automatically performed:
 
@@ -2178,16 +4529,7 @@ mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
         for these rows must match the design exactly. Additional "extra" experiment
         rows can also be provided.
         """
-        experiments = {'colHeaders': '', 'data': []}
-        header_and_experiments = []
-        with open(fname, newline='') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',')
-            header_and_experiments = [r for r in reader]
-        if len(header_and_experiments) > 1:
-            experiments['colHeaders'] = header_and_experiments[0]
-            experiments['data'] = header_and_experiments[1:]
-        else:
-            raise CsvNoDataRowsError(fname)
+        experiments = EncodedTable.from_csv(fname, self._experiments_validator_option())
         return self.put_experiments(experiments_type, experiments)
 
     def generate_design(self, gen=None):
@@ -2237,26 +4579,8 @@ mutation PutExperiments($sessionId:String!, $experiments:ExperimentsInput!) {
         # If the generation number and saved responses are valid, information
         # about the long running 'generate' task is returned, and the user should
         # poll until the task has completed.
-        doc = gql.gql("""
-mutation GenerateDesign($sessionId:String!, $gen:Int!) {
-    generateDesign(sessionId:$sessionId, gen:$gen) {
-        sessionId taskId type description status startedAt
-    }
-}
-        """)
-        if self._options.get('run_tasks_async', False):
-            data, errors = self.run_task_async(doc, vars)
-        else:
-            data, errors = self.call_api(doc, vars)
-        self._raise_exception_on_error(data, errors)
-
-        if 'generateDesign' in data and data['generateDesign'] is not None:
-            task_id = data['generateDesign']['taskId']
-            self.task_info[task_id] = data['generateDesign']
-            auto_task = self._auto_task()
-            if auto_task is not None:
-                return {'generateDesign': auto_task}
-        return data
+        doc = cached_gql(self.GENERATE_DESIGN_MUTATION)
+        return self._start_task('generateDesign', doc, vars)
 
     def start_simulation(self, ngens, params):
         """Starts a simulation task for several design generations, specifying the
@@ -2331,26 +4655,8 @@ mutation GenerateDesign($sessionId:String!, $gen:Int!) {
             'params': params
         }
 
-        doc = gql.gql("""
-mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParametersInput!) {
-    runSimulation(sessionId:$sessionId, ngens:$ngens, params:$params) {
-        sessionId taskId type description status startedAt
-    }
-}
-        """)
-        if self._options.get('run_tasks_async', False):
-            data, errors = self.run_task_async(doc, vars)
-        else:
-            data, errors = self.call_api(doc, vars)
-        self._raise_exception_on_error(data, errors)
-
-        if 'runSimulation' in data and data['runSimulation'] is not None:
-            task_id = data['runSimulation']['taskId']
-            self.task_info[task_id] = data['runSimulation']
-            auto_task = self._auto_task()
-            if auto_task is not None:
-                return {'runSimulation': auto_task}
-        return data
+        doc = cached_gql(self.RUN_SIMULATION_MUTATION)
+        return self._start_task('runSimulation', doc, vars)
 
     def start_simulation_csv(self, ngens, fname, params):
         """Run a simulation for several design generations, specifying the
@@ -2367,7 +4673,7 @@ mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParameter
         fname (str):
             The location on the filesystem for a CSV file that will define
             the experimental space definition. See the Examples section
-            below for an example.
+            below for an example. The file may be gzip-compressed.
 
         params (dict):
             A Python `dict` containing the experimental parameters to be
@@ -2422,11 +4728,7 @@ mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParameter
         see the documentation for the `put_experimental_parameters` method.
         """
 
-        param_rows = []
-        with open(fname, newline='') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',')
-            param_rows = [r for r in reader]
-        params['space']['table'] = {'data': param_rows}
+        params['space']['table'] = {'data': read_csv_rows(fname)}
         return self.start_simulation(ngens, params)
 
     def poll_for_current_task(self, task_type=None):
@@ -2450,6 +4752,12 @@ mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParameter
         # Notes
         Either `data` or `errors` may be None.
 
+        The session is first polled with a small status-only query. The full
+        task, including its (possibly large) result, is only requested once
+        the status of the task is `success`. If that request fails, the errors
+        from it are returned, with `data` None, and the client's attributes are not
+        updated, rather than reporting the task as completed without its result.
+
         The `currentTask` value returned is a Python `dict` containing information
         on the task (if found). The items in the `dict` are as follows:
 
@@ -2616,16 +4924,7 @@ mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParameter
         prefix `auto_genN_` where `N` is the generation number.
         """
 
-        vars = {
-            'sessionId': self.session_id,
-            'taskId': None,
-            'type': None
-        }
-        if task_type is not None:
-            if type(task_type) == DapticsTaskType:
-                vars['type'] = task_type.value
-            else:
-                raise InvalidTaskTypeError(task_type)
+        vars = self._current_task_vars(task_type)
 
         # Saving the experimental and space parameters will start a long running
         # 'space' task. Saving experimental responses will start a long running
@@ -2635,83 +4934,148 @@ mutation RunSimulation($sessionId:String!, $ngens:Int!, $params:SessionParameter
         # an error. If the task has completed, we update self.gen
         # for 'space' and 'generate' task results, and save self.design
         # from a 'generate' task result.
-        doc = gql.gql(self.TASK_FRAGMENT + """
-query CurrentTask($sessionId:String!, $taskId:String, $type:String) {
-    currentTask(sessionId:$sessionId, taskId:$taskId, type:$type) {
-        ... TaskFragment
-    }
-}
-        """)
+        doc = cached_gql(self.CURRENT_TASK_STATUS_QUERY)
 
         data, errors = self.call_api(doc, vars)
-        if data and 'currentTask' in data and data['currentTask'] is not None:
-            if 'status' in data['currentTask'] and 'type' in data['currentTask']:
-                task_id = data['currentTask']['taskId']
-                self.task_info[task_id] = data['currentTask']
-                status = data['currentTask']['status']
-
-                # A task's status can be 'new', 'running', 'success', 'failed', or 'canceled'.
-                # Process result on 'success', otherwise just return.
-                if status == 'success' and 'result' in data['currentTask'] and data['currentTask']['result'] is not None:
-                    result = data['currentTask']['result']
-                    auto_export_path = self._options.get('auto_export_path')
-                    type_ = data['currentTask']['type']
-                    if type_ == 'space':
-                        self.gen = result['campaign']['gen']
-                        self.remaining = result['campaign']['remaining']
-                        self.completed = result['campaign']['completed']
-                        self.validated_params = result['params']
-                        if auto_export_path is not None:
-                            fname = os.path.join(
-                                auto_export_path, 'auto_validated_space.csv')
-                            self.export_csv(
-                                fname, self.validated_params['space']['table'], False)
-                    elif type_ == 'update':
-                        self.gen = result['campaign']['gen']
-                        self.remaining = result['campaign']['remaining']
-                        self.completed = result['campaign']['completed']
-                        self.design = result['experiments']
-                        if auto_export_path is not None and self.design is not None:
-                            fname = os.path.join(
-                                auto_export_path, 'auto_gen{0}_experiments.csv'.format(self.gen))
-                            self.export_csv(
-                                fname, self.design['table'], True)
-                        if self._options.get('auto_generate_next_design'):
-                            if self.remaining is None or self.remaining > 0:
-                                # FIXME: Possible race condition while 'update' task is still active?
-                                # Generate task may fail, when it finds that the 'update' task is not archived.
-                                time.sleep(0.2)
-                                task_data = self.generate_design()
-                                data['currentTask']['autoGenerateTask'] = task_data['generateDesign']
-                    elif type_ == 'generate':
-                        self.gen = result['campaign']['gen']
-                        self.remaining = result['campaign']['remaining']
-                        self.completed = result['campaign']['completed']
-                        self.design = result['experiments']
-                        if auto_export_path is not None and self.design is not None:
-                            fname = os.path.join(
-                                auto_export_path, 'auto_gen{0}_design.csv'.format(self.gen))
-                            self.export_csv(
-                                fname, self.design['table'], True)
-                    elif type_ == 'simulate':
-                        self.gen = result['campaign']['gen']
-                        self.remaining = result['campaign']['remaining']
-                        self.completed = result['campaign']['completed']
-                        self.validated_params = result['params']
-                        self.experiments_history = result['experimentsHistory']
-                        if auto_export_path is not None:
-                            fname = os.path.join(
-                                auto_export_path, 'auto_history.csv')
-                            self.export_experiments_history_csv(fname)
-                    elif type_ == 'analytics':
-                        self.analytics = result['analytics']
-                        if auto_export_path is not None:
-                            self.download_all_analytics_files(
-                                self.analytics, auto_export_path, True)
-        else:
-            data = {'currentTask': None}
+        if self._task_succeeded(data):
+            vars['taskId'] = data['currentTask']['taskId']
+            full_data, full_errors = self.call_api(
+                cached_gql(self.CURRENT_TASK_QUERY), vars)
+            if not full_data or full_data.get('currentTask') is None:
+                return self._task_result_failed(full_errors)
+            data, errors = full_data, full_errors
+
+        data, type_ = self._process_current_task(data)
+        if type_ == 'update' and self._should_auto_generate():
+            # FIXME: Possible race condition while 'update' task is still active?
+            # Generate task may fail, when it finds that the 'update' task is not archived.
+            time.sleep(0.2)
+            task_data = self.generate_design()
+            data['currentTask']['autoGenerateTask'] = task_data['generateDesign']
+        elif type_ == 'analytics':
+            auto_export_path = self._options.get('auto_export_path')
+            if auto_export_path is not None:
+                self.download_all_analytics_files(
+                    self.analytics, auto_export_path, True)
         return (data, errors)
 
+    def _task_result_failed(self, errors):
+        if not errors:
+            errors = [{'message': 'The result of the completed task could not be retrieved.'}]
+        return (None, errors)
+
+    def _current_task_vars(self, task_type):
+        vars = {
+            'sessionId': self.session_id,
+            'taskId': None,
+            'type': None
+        }
+        if task_type is not None:
+            if type(task_type) == DapticsTaskType:
+                vars['type'] = task_type.value
+            else:
+                raise InvalidTaskTypeError(task_type)
+        return vars
+
+    def _task_succeeded(self, data):
+        return bool(data) and data.get('currentTask') is not None and \
+            data['currentTask'].get('status') == 'success'
+
+    def _should_auto_generate(self):
+        return bool(self._options.get('auto_generate_next_design')) and \
+            (self.remaining is None or self.remaining > 0)
+
+    # Update the client's attributes from the `currentTask` item of a
+    # response. Returns the (normalized) data and the type of the task
+    # if a successful result was processed, otherwise None.
+    def _process_current_task(self, data):
+        with self.session_state.lock:
+            return self._apply_current_task(data)
+
+    def _apply_current_task(self, data):
+        if not data or data.get('currentTask') is None:
+            return ({'currentTask': None}, None)
+
+        task = data['currentTask']
+        task.setdefault('result', None)
+        if 'status' not in task or 'type' not in task:
+            return (data, None)
+
+        task_id = task['taskId']
+        self.task_info[task_id] = task
+        status = task['status']
+
+        # A task's status can be 'new', 'running', 'success', 'failed', or 'canceled'.
+        # Process result on 'success', otherwise just return.
+        if status != 'success' or task['result'] is None:
+            return (data, None)
+
+        result = task['result']
+        auto_export_path = self._options.get('auto_export_path')
+        type_ = task['type']
+        if type_ == 'space':
+            self.gen = result['campaign']['gen']
+            self.remaining = result['campaign']['remaining']
+            self.completed = result['campaign']['completed']
+            self.validated_params = result['params']
+            if auto_export_path is not None:
+                fname = os.path.join(
+                    auto_export_path, 'auto_validated_space.csv')
+                self.export_csv(
+                    fname, self.validated_params['space']['table'], False)
+        elif type_ == 'update':
+            self.gen = result['campaign']['gen']
+            self.remaining = result['campaign']['remaining']
+            self.completed = result['campaign']['completed']
+            self.design = result['experiments']
+            if auto_export_path is not None and self.design is not None:
+                fname = os.path.join(
+                    auto_export_path, 'auto_gen{0}_experiments.csv'.format(self.gen))
+                self.export_csv(
+                    fname, self.design['table'], True)
+        elif type_ == 'generate':
+            self.gen = result['campaign']['gen']
+            self.remaining = result['campaign']['remaining']
+            self.completed = result['campaign']['completed']
+            self.design = result['experiments']
+            if auto_export_path is not None and self.design is not None:
+                fname = os.path.join(
+                    auto_export_path, 'auto_gen{0}_design.csv'.format(self.gen))
+                self.export_csv(
+                    fname, self.design['table'], True)
+        elif type_ == 'simulate':
+            self.gen = result['campaign']['gen']
+            self.remaining = result['campaign']['remaining']
+            self.completed = result['campaign']['completed']
+            self.validated_params = result['params']
+            self.experiments_history = result['experimentsHistory']
+            if auto_export_path is not None:
+                fname = os.path.join(
+                    auto_export_path, 'auto_history.csv')
+                self._write_experiments_history_csv(fname, self.experiments_history)
+        elif type_ == 'analytics':
+            self.analytics = result['analytics']
+        self._store_task_result(type_, result)
+        return (data, type_)
+
+    def _store_task_result(self, type_, result):
+        store = self.get_store()
+        if store is None or self.session_id is None or type_ == 'analytics':
+            return
+        store.put_session({
+            'sessionId': self.session_id,
+            'name': self.session_name,
+            'tag': self.session_tag,
+            'campaign': result.get('campaign'),
+            'params': result.get('params')
+        })
+        if type_ == 'update':
+            store.put_generation(self.session_id, result['experiments'], store.HISTORY)
+        elif type_ == 'generate':
+            store.put_generation(self.session_id, result['experiments'], store.DESIGN)
+        elif type_ == 'simulate':
+            store.put_history(self.session_id, result['experimentsHistory'])
+
     def wait_for_current_task(self, task_type=None, timeout=None):
         """Wraps poll_for_current_task in a loop. Repeat until task disappears,
         when `status` is `success`, `failed`, or `canceled`.
@@ -2740,57 +5104,187 @@ query CurrentTask($sessionId:String!, $taskId:String, $type:String) {
         about the `data` item returned for different types of tasks,
         and for how task completion affects attributes of the client instance.
         """
-        max_time = None
-        if timeout is not None and timeout >= 0:
-            if timeout == 0:
-                timeout = -1.0
-            max_time = time.time() + timeout
-
+        max_time = self._wait_max_time(timeout)
+
+        # Instead of sleeping between polls, wait for a subscription message
+        # that reports that the task has finished.
+        loop = None
+        sub_id = None
+        if self._options.get('wait_with_subscription', False):
+            loop = asyncio.get_event_loop()
+            sub_id = loop.run_until_complete(self._subscribe_task_updates(loop, task_type))
+
+        wait_started = time.time()
+        last_progress = None
         retry = 0
         while True:
             data, errors = self.poll_for_current_task(task_type)
-            if data and 'currentTask' in data and data['currentTask'] is not None:
-                status = data['currentTask']['status']
-                if status == 'canceled':
-                    if retry > 0:
-                        sys.stdout.write('\n')
-                    print('Task was canceled!  Messages are:')
-                    for i, error in enumerate(data['currentTask']['errors']):
-                        for ee in error:
-                            print('[{}] {}:\t{}'.format(i, ee, error[ee]))
-                    return (data, errors)
-                elif status == 'failed':
-                    if retry > 0:
-                        sys.stdout.write('\n')
-                    print('Task failed with error(s)!  Messages are:')
-                    for i, error in enumerate(data['currentTask']['errors']):
-                        for ee in error:
-                            print('[{}] {}:\t{}'.format(i, ee, error[ee]))
-                    return (data, errors)
-                elif status == 'success':
-                    if retry > 0:
-                        sys.stdout.write('\n')
-                    print('Task completed!')
-                    return (data, errors)
-
-                # status == 'new' or status == 'running'
-                retry += 1
-                mystr = '\rTask status = {} after {} retries...'.format(
-                    status, retry)
-                sys.stdout.write(mystr)
-                if max_time is not None and max_time <= time.time():
-                    sys.stdout.write('\nTimed out.')
-                    if errors is None:
-                        errors = []
-                    errors.append({'message': 'timeout exceeded'})
-                    return (data, errors)
-
-                # We will try again
-                time.sleep(1.0)
-            else:
-                sys.stdout.write('\nNo current task was found!')
+            done, errors = self._check_task_wait(data, errors, retry, max_time)
+            if done:
+                self._record_task_duration(data, wait_started)
                 return (data, errors)
 
+            # We will try again
+            retry += 1
+            if sub_id is not None:
+                if loop.run_until_complete(self._wait_for_task_update(sub_id, max_time)):
+                    continue
+                sub_id = None
+            interval, last_progress = self._poll_interval(data, wait_started, last_progress, max_time)
+            time.sleep(interval)
+
+    # Ask the poll scheduler how long to wait before the next poll. Returns
+    # the interval and the task's progress.
+    def _poll_interval(self, data, wait_started, last_progress, max_time):
+        scheduler = self.poll_scheduler
+        scheduler.min_interval = self._options.get('poll_min_interval', 1.0)
+        scheduler.max_interval = self._options.get('poll_max_interval', 30.0)
+        scheduler.jitter = self._options.get('poll_jitter', 0.1)
+
+        task = data.get('currentTask') if data else None
+        if task is None:
+            return (scheduler.min_interval, last_progress)
+        now = time.time()
+        started = _started_at_time(task)
+        if started is None or started > now:
+            started = wait_started
+        progress = task.get('progress')
+        interval = scheduler.next_interval(task.get('type'), now - started, progress, last_progress)
+        if max_time is not None:
+            interval = max(0.0, min(interval, max_time - now))
+        return (interval, progress)
+
+    # Teach the poll scheduler how long a successful task took.
+    def _record_task_duration(self, data, wait_started):
+        task = data.get('currentTask') if data else None
+        if task is None or task.get('status') != 'success':
+            return
+        now = time.time()
+        started = _started_at_time(task)
+        if started is None or started > now:
+            started = wait_started
+        self.poll_scheduler.record(task.get('type'), now - started)
+
+    SUBSCRIPTION_WAIT_INTERVAL = 30.0
+    """When waiting for a task with the `wait_with_subscription` option set,
+    the maximum number of seconds to wait for a subscription message before
+    polling the task again."""
+
+    # Subscribe to "taskUpdated" messages for the session, if possible.
+    # Returns the subscription id, or None if the websocket cannot be used.
+    async def _subscribe_task_updates(self, loop, task_type):
+        if self.session_id is None or self.websocket_url is None or self.auth.token is None:
+            return None
+        try:
+            task_socket = await self._get_task_socket(loop)
+            return await task_socket.subscribe(
+                self.session_id, self._task_finished_coroutine, task_type=task_type)
+        except Exception:
+            return None
+
+    # Stop running the subscription when a task (of the type being waited for)
+    # has finished.
+    async def _task_finished_coroutine(self, message, **kwargs):
+        task = message.payload['result']['data']['taskUpdated']
+        if task is None:
+            return True
+        task_type = kwargs.get('task_type')
+        if task_type is not None and task.get('type') != task_type.value:
+            return True
+        return task.get('status') not in ('success', 'failed', 'canceled')
+
+    # Wait until the subscription reports a finished task, or until
+    # SUBSCRIPTION_WAIT_INTERVAL seconds or `max_time` has passed. Returns
+    # False if the websocket connection failed.
+    async def _wait_for_task_update(self, sub_id, max_time):
+        wait_time = self.SUBSCRIPTION_WAIT_INTERVAL
+        if max_time is not None:
+            wait_time = max(0.0, min(wait_time, max_time - time.time()))
+        try:
+            await asyncio.wait_for(self.task_socket.run(sub_id, timeout=wait_time), wait_time)
+        except asyncio.TimeoutError:
+            pass
+        except Exception:
+            await self.task_socket.close()
+            return False
+        return True
+
+    def _wait_max_time(self, timeout):
+        if timeout is not None and timeout >= 0:
+            if timeout == 0:
+                timeout = -1.0
+            return time.time() + timeout
+        return None
+
+    # Report the status of a polled task. Returns a tuple (done, errors),
+    # where `done` is True if the task has finished, could not be found,
+    # or the wait has timed out.
+    def _check_task_wait(self, data, errors, retry, max_time):
+        if data and 'currentTask' in data and data['currentTask'] is not None:
+            status = data['currentTask']['status']
+            if status == 'canceled':
+                if retry > 0:
+                    sys.stdout.write('\n')
+                print('Task was canceled!  Messages are:')
+                for i, error in enumerate(data['currentTask']['errors']):
+                    for ee in error:
+                        print('[{}] {}:\t{}'.format(i, ee, error[ee]))
+                return (True, errors)
+            elif status == 'failed':
+                if retry > 0:
+                    sys.stdout.write('\n')
+                print('Task failed with error(s)!  Messages are:')
+                for i, error in enumerate(data['currentTask']['errors']):
+                    for ee in error:
+                        print('[{}] {}:\t{}'.format(i, ee, error[ee]))
+                return (True, errors)
+            elif status == 'success':
+                if retry > 0:
+                    sys.stdout.write('\n')
+                print('Task completed!')
+                return (True, errors)
+
+            # status == 'new' or status == 'running'
+            mystr = '\rTask status = {} after {} retries...'.format(
+                status, retry + 1)
+            sys.stdout.write(mystr)
+            if max_time is not None and max_time <= time.time():
+                sys.stdout.write('\nTimed out.')
+                if errors is None:
+                    errors = []
+                errors.append({'message': 'timeout exceeded'})
+                return (True, errors)
+            return (False, errors)
+
+        sys.stdout.write('\nNo current task was found!')
+        return (True, errors)
+
+    # Send a task-creating mutation, either over HTTP or, if the
+    # "run_tasks_async" option is set, over the websocket. If the task
+    # was started, record it in `task_info` and wait for it if the
+    # "auto_task_timeout" option is set.
+    def _start_task(self, key, doc, vars):
+        if self._options.get('run_tasks_async', False):
+            data, errors = self.run_task_async(doc, vars)
+        else:
+            data, errors = self.call_api(doc, vars)
+        self._raise_exception_on_error(data, errors)
+
+        if self._task_started(key, data):
+            if self._options.get('return_task_handles', False):
+                return self.task_watcher.watch(data[key], self)
+            auto_task = self._auto_task()
+            if auto_task is not None:
+                return {key: auto_task}
+        return data
+
+    def _task_started(self, key, data):
+        if key in data and data[key] is not None:
+            task_id = data[key]['taskId']
+            self.task_info[task_id] = data[key]
+            return True
+        return False
+
     def _auto_task(self, timeout_override=None):
         timeout = timeout_override
         if timeout is None:
@@ -2804,6 +5298,20 @@ query CurrentTask($sessionId:String!, $taskId:String, $type:String) {
 
         return data['currentTask']
 
+    def query_batch(self, batch_size=50):
+        """Creates a `QueryBatch` that sends several read queries, for this or
+        other sessions, in a single request.
+
+        # Arguments
+        batch_size (int, optional):
+            The maximum number of queries to send in one request.
+
+        # Returns
+        batch (`QueryBatch`):
+            An empty batch that uses this client to send its requests.
+        """
+        return QueryBatch(self, batch_size=batch_size)
+
     def get_experimental_space(self):
         """Utility method to retrieve the validated experimental space from
         the session. If the session was restarted and the experimental space
@@ -2858,26 +5366,8 @@ query CurrentTask($sessionId:String!, $taskId:String, $type:String) {
 
         # The 'analytics' task generates PDF files on the
         # server, and returns the titles and file names for these PDF files.
-        doc = gql.gql("""
-mutation CreateAnalytics($sessionId:String!) {
-    createAnalytics(sessionId:$sessionId) {
-        sessionId taskId type description status startedAt
-    }
-}
-        """)
-        if self._options.get('run_tasks_async', False):
-            data, errors = self.run_task_async(doc, vars)
-        else:
-            data, errors = self.call_api(doc, vars)
-        self._raise_exception_on_error(data, errors)
-
-        if 'createAnalytics' in data and data['createAnalytics'] is not None:
-            task_id = data['createAnalytics']['taskId']
-            self.task_info[task_id] = data['createAnalytics']
-            auto_task = self._auto_task()
-            if auto_task is not None:
-                return {'createAnalytics': auto_task}
-        return data
+        doc = cached_gql(self.CREATE_ANALYTICS_MUTATION)
+        return self._start_task('createAnalytics', doc, vars)
 
     def download_all_analytics_files(self, analytics, directory=".", name_by_gen=False):
         """Processes the result of an "analytics" task for all the available analytics
@@ -2916,7 +5406,7 @@ mutation CreateAnalytics($sessionId:String!) {
             for file in analytics['files']:
                 if 'url' in file and 'filename' in file:
                     url, params = self.download_url_and_params(file['url'])
-                    response = requests.get(url, params=params)
+                    response = self.get_connection_pool().session.get(url, params=params)
                     if response.status_code == requests.codes.ok and response.content is not None:
                         if file_count == 0:
                             os.makedirs(path, exist_ok=True)
@@ -2957,7 +5447,7 @@ mutation CreateAnalytics($sessionId:String!) {
         """
 
         url, params = self.download_url_and_params(file_url)
-        response = requests.get(url, params=params)
+        response = self.get_connection_pool().session.get(url, params=params)
         if response.status_code == requests.codes.ok and response.content is not None:
             with open(fname, "wb") as pdf_file:
                 pdf_file.write(response.content)
@@ -3107,31 +5597,220 @@ mutation CreateAnalytics($sessionId:String!) {
         generation number for the experiment, and "Designed_" will be "Y" if the experiment
         was designed by the daptics process, or "N" if the experiment was an initial or extra
         experiment submitted by the user.
+
+        If the client has a `store`, the history is brought up to date with
+        `sync_experiments_history` before it is written.
         """
 
-        if self.experiments_history is None:
+        self._update_history_for_export()
+        return self._write_experiments_history_csv(fname, self.experiments_history)
+
+    def _update_history_for_export(self):
+        # With a store, the stored history may be out of date, so it is synchronized
+        # with the server, fetching only the generations that may have changed.
+        if self.get_store() is not None:
+            self.sync_experiments_history()
+        elif self.experiments_history is None:
             self.get_experiments_history()
-        history = self.experiments_history
-        if history is not None and len(history) > 0:
-            with open(fname, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile, delimiter=',',
-                                    quoting=csv.QUOTE_NONE)
-                seq = 0
-                header_written = False
-                for gen, exp in enumerate(history):
-                    if exp is not None and 'table' in exp and exp['table'] is not None:
-                        if not header_written:
-                            writer.writerow(
-                                ['Seq_', 'Gen_', 'Designed_'] + exp['table']['colHeaders'])
-                            header_written = True
-                        drows = exp['designRows']
-                        for i, row in enumerate(exp['table']['data']):
-                            seq += 1
-                            designed = 'Y' if i < drows else 'N'
-                            writer.writerow([seq, gen, designed] + row)
 
+    def export_experimental_space_arrow(self, fname, file_format=None):
+        """Writes the validated experimental space table to a Parquet file or an
+        Arrow IPC file or stream. Requires the pyarrow package.
+
+        # Arguments
+        fname (str):
+            The filesystem path where the file will be written.
+
+        file_format (str, optional):
+            "parquet", "ipc" or "stream". If None, the format is chosen from the
+            extension of `fname`: ".parquet" or ".pq" for Parquet, ".arrows" for an
+            Arrow IPC stream, and an Arrow IPC file otherwise.
+
+        # Returns
+        space (dict):
+            A Python `dict` representing the validated experimental space.
+
+        # Notes
+        The space's `type` and `totalUnits` are saved in the file's metadata, so that
+        `import_arrow` can restore the space.
+        """
+
+        space = self.get_experimental_space()
+        if space is None:
+            raise SessionParametersNotValidatedError()
+
+        wire = dict(space['table'])
+        if not wire.get('colHeaders'):
+            wire['colHeaders'] = self.space_table_column_names(space)
+        table = Table.from_wire(wire)
+        table.metadata = {
+            'kind': 'space',
+            'sessionId': self.session_id,
+            'type': space['type'],
+            'totalUnits': space.get('totalUnits')
+        }
+        table.write(fname, file_format)
+        return space
+
+    def export_generated_design_arrow(self, fname, gen=None, file_format=None):
+        """Gets a design generation from the session, and writes the table
+        (with empty responses) to a Parquet file or an Arrow IPC file or stream.
+        Requires the pyarrow package.
+
+        # Arguments
+        fname (str):
+            The filesystem path where the file will be written.
+
+        gen (int, optional):
+            The generation number for the design to be retrieved.
+            If None, retreive the design for the current generation.
+
+        file_format (str, optional):
+            "parquet", "ipc" or "stream". See `export_experimental_space_arrow`.
+
+        # Returns
+        design (dict):
+            The generated design, as returned by `get_generated_design`.
+        """
+
+        design = self.get_generated_design(gen=gen)
+        self._write_design_arrow(fname, design, file_format)
+        return design
+
+    def _write_design_arrow(self, fname, design, file_format):
+        table = Table.from_wire(design['table'])
+        table.metadata = {'kind': 'design', 'sessionId': self.session_id}
+        table.metadata.update(
+            {key: design.get(key) for key in ('gen', 'validated', 'hasResponses', 'designRows')})
+        table.write(fname, file_format)
+
+    def export_experiments_history_arrow(self, fname, file_format=None):
+        """Gets and returns the experiments and responses for all generations in the session,
+        and writes them to a Parquet file or an Arrow IPC file or stream, with the
+        same columns as `export_experiments_history_csv`. Also updates the
+        `experiments_history` attribute in the client. Requires the pyarrow package.
+
+        # Arguments
+        fname (str):
+            The filesystem path where the file will be written.
+
+        file_format (str, optional):
+            "parquet", "ipc" or "stream". See `export_experimental_space_arrow`.
+
+        # Returns
+        experiments_history (list): or None
+            The value of the client's `experiments_history` attribute.
+
+        # Notes
+        The "Seq_" and "Gen_" columns are written as 64-bit integers, and "Designed_"
+        as a dictionary-encoded "Y" or "N". Parameter and "Response" columns whose
+        values are all numbers are written as 64-bit integers or doubles, with nulls
+        for empty values, and other columns are dictionary-encoded. Nothing is written
+        if there are no experiments. If the client has a `store`, the history is
+        brought up to date with `sync_experiments_history` before it is written.
+        """
+
+        self._update_history_for_export()
+        return self._write_experiments_history_arrow(fname, self.experiments_history, file_format)
+
+    def _write_experiments_history_arrow(self, fname, history, file_format):
+        table = Table.from_history(history)
+        if table is not None:
+            table.metadata = {
+                'kind': 'experiments_history',
+                'sessionId': self.session_id,
+                'generations': [
+                    {key: exp.get(key) for key in ('gen', 'validated', 'hasResponses', 'designRows')}
+                    for exp in history if exp is not None]
+            }
+            table.write(fname, file_format)
+        return history
+
+    def import_arrow(self, fname, file_format=None):
+        """Reads a file written by `export_experimental_space_arrow`,
+        `export_generated_design_arrow` or `export_experiments_history_arrow`.
+        The client's attributes are not changed. Requires the pyarrow package.
+
+        # Arguments
+        fname (str):
+            The filesystem path of the file.
+
+        file_format (str, optional):
+            "parquet", "ipc" or "stream". See `export_experimental_space_arrow`.
+
+        # Returns
+        value (dict or list):
+            A Python `dict` for a space or a design, or a list for an experiments history,
+            in the same form as it was returned by the export method.
+
+            Numeric values are restored exactly, but in a column that mixes integer
+            and decimal values, integers are restored as decimals, for example "2.0".
+
+        # Raises
+        ValueError
+            If the file was not written by one of the export methods.
+        """
+
+        table = Table.read(fname, file_format)
+        kind = table.metadata.get('kind')
+        if kind == 'space':
+            return {
+                'type': table.metadata['type'],
+                'totalUnits': table.metadata.get('totalUnits'),
+                'table': table.to_wire()
+            }
+        if kind == 'design':
+            design = {key: table.metadata.get(key)
+                      for key in ('gen', 'validated', 'hasResponses', 'designRows')}
+            design['table'] = table.to_wire()
+            return design
+        if kind == 'experiments_history':
+            return self._history_from_table(table)
+        raise ValueError('The file {} does not contain a daptics export.'.format(fname))
+
+    def _history_from_table(self, table):
+        gens = table.column('Gen_')
+        columns = table.columns[3:]
+        history = []
+        start = 0
+        for info in table.metadata['generations']:
+            end = start
+            while end < len(gens) and gens.values[end] == info['gen']:
+                end += 1
+            exp = dict(info)
+            exp['table'] = Table(columns).take(range(start, end)).to_wire()
+            while len(history) < info['gen']:
+                history.append(None)
+            history.append(exp)
+            start = end
+        return history
+
+    def _write_experiments_history_csv(self, fname, history):
+        table = Table.from_history(history)
+        if table is not None:
+            table.write_csv(fname)
         return history
 
+    def experiments_history_table(self):
+        """Returns the client's `experiments_history` as a single columnar `Table`,
+        with the same "Seq_", "Gen_" and "Designed_" columns as the file written by
+        `export_experiments_history_csv`. The history is not retrieved if the
+        `experiments_history` attribute is None.
+
+        # Returns
+        table (`Table`):
+            None if there are no experiments in the history.
+
+        # Examples
+        ```python
+        >>> table = daptics.experiments_history_table()
+        >>> responses = table.column('Response').array()
+        >>> designed = table.column('Designed_').array() == 0
+        >>> responses[designed].max()
+        ```
+        """
+        return Table.from_history(self.experiments_history)
+
     def space_table_value_column_name(self, space_type, i):
         """Formats a single column name for the header row in an experimental space table.
 
@@ -3241,6 +5920,11 @@ mutation CreateAnalytics($sessionId:String!) {
         # Returns
         param_value (str):
             A valid value for the parameter, encoded as a string.
+
+        # Notes
+        The value of a "mixture" parameter is drawn without regard to the other
+        parameters, so a row of such values will usually not add up to the space's
+        `totalUnits`. Use `random_mixture` for a whole valid mixture.
         """
 
         if len(param) < 4:
@@ -3252,7 +5936,7 @@ mutation CreateAnalytics($sessionId:String!) {
             max_value = int(param[3])
             return str(random.randint(min_value, max_value))
         else:
-            if param[1] not in ['factorial', 'numerical']:
+            if param[1] not in ['factorial', 'numerical', 'categorical']:
                 raise InvalidSpaceParameterError(space_type, param)
             values = [s for s in param[2:] if s != '']
             return random.choice(values)
@@ -3280,12 +5964,63 @@ mutation CreateAnalytics($sessionId:String!) {
 
         space_type = space['type']
         params = space['table']['data']
-        experiment = [self.random_parameter_value(
-            space_type, param) for param in params] + ['']
+        if space_type == 'mixture' and space.get('totalUnits') is not None:
+            experiment = self.random_mixture(space) + ['']
+        else:
+            experiment = [self.random_parameter_value(
+                space_type, param) for param in params] + ['']
         if max_response_value is not None:
             return self.experiment_with_random_response(experiment, max_response_value)
         return experiment
 
+    def mixture_compositions(self, space):
+        """Returns the `MixtureCompositions` for a "mixture" space, which counts and
+        samples the mixtures whose units add up to the space's `totalUnits`. The
+        counting tables are re-used by later calls for the same space.
+
+        # Arguments
+        space (dict):
+            A Python `dict` that defines a "mixture" experimental space.
+
+        # Returns
+        mixtures (`MixtureCompositions`):
+            None if the space has no `totalUnits`.
+        """
+        cached = self._mixtures_cache
+        if cached is None or cached[0] is not space:
+            for param in space['table']['data']:
+                if len(param) < 4 or param[1] != 'unit':
+                    raise InvalidSpaceParameterError(space['type'], param)
+            cached = (space, MixtureCompositions.from_space(space))
+            self._mixtures_cache = cached
+        return cached[1]
+
+    def random_mixture(self, space):
+        """Uses a random number generator to select the parameter values of a
+        "mixture" space, drawn uniformly from all the mixtures whose units add up to
+        the space's `totalUnits`.
+
+        # Arguments
+        space (dict):
+            A Python `dict` that defines a "mixture" experimental space.
+
+        # Returns
+        param_values (list):
+            A valid value for each parameter, encoded as a string. If the space
+            has no `totalUnits`, each value is drawn with `random_parameter_value`.
+
+        # Raises
+        NoValidMixturesError
+            If no mixture adds up to the `totalUnits`.
+        """
+        mixtures = self.mixture_compositions(space)
+        if mixtures is None:
+            return [self.random_parameter_value(space['type'], param)
+                    for param in space['table']['data']]
+        if mixtures.count == 0:
+            raise NoValidMixturesError(mixtures.total_units)
+        return [str(units) for units in mixtures.unrank(random.randrange(mixtures.count))]
+
     def experiments_table_template(self, space):
         """Generates the column header for the experiments table, with no data
         rows. Can be used to export an empty experiments table template CSV file,
@@ -3306,7 +6041,35 @@ mutation CreateAnalytics($sessionId:String!) {
             raise SpaceOrDesignRequiredError()
         return {'colHeaders': col_headers, 'data': []}
 
-    def random_experiments_with_responses(self, space, design, num_extras=0, max_response_value=5.0):
+    def random_experiment_generator(self, space, seed=None):
+        """Returns a `RandomExperimentGenerator` for the space, which draws whole
+        experiments tables at a time with NumPy. The generator is re-used by later calls
+        for the same space, so that a seeded sequence of calls is reproducible.
+
+        # Arguments
+        space (dict):
+            A Python `dict` that defines the experimental space.
+
+        seed (int, optional):
+            If given, a new generator is created with this seed.
+
+        # Returns
+        generator (`RandomExperimentGenerator`)
+
+        # Raises
+        Exception
+            If the numpy package is not installed.
+        """
+        from .random_experiments import RandomExperimentGenerator
+
+        generator = self._random_generator
+        if seed is not None or generator is None or generator.space is not space:
+            generator = RandomExperimentGenerator(space, seed)
+            self._random_generator = generator
+        return generator
+
+    def random_experiments_with_responses(self, space, design, num_extras=0, max_response_value=5.0,
+                                          seed=None, unique_extras=False):
         """Generates an experiments table where each experiment row
         contains a randomly generated response value. The experiment rows
         are optionally  composed of "designed" rows and "extra" rows.
@@ -3330,12 +6093,39 @@ mutation CreateAnalytics($sessionId:String!) {
             The maximum value for generated responses. Each genreated response value
             is a randomly generated number in the range [0.0, max_response_value].
 
+        seed (int, optional):
+            If given, the random number generator is seeded, so that the same table
+            is generated again for the same seed. Requires the numpy package.
+
+        unique_extras (bool, optional):
+            If True, the extra rows are distinct experiments, none of which is in the
+            design. If the space does not have `num_extras` more experiments, all the
+            remaining experiments are returned. Requires a space.
+
         # Returns
         table (dict):
             A Python `dict` with `colHeaders` and `data` values, representing an
             experiments table.
+
+        # Notes
+        If the numpy package is installed and a space is given, the table is drawn
+        a column at a time by the `RandomExperimentGenerator` returned by
+        `random_experiment_generator`. Otherwise the values are generated one at a time
+        with `random_experiment_for_space` and `experiment_with_random_response`.
         """
 
+        if unique_extras and space is not None and num_extras > 0:
+            table = self.random_experiments_with_responses(
+                space, design, 0, max_response_value, seed)
+            table['data'].extend(self._unique_extras(
+                space, table['data'], num_extras, max_response_value, seed))
+            return table
+
+        if space is not None and (numpy is not None or seed is not None):
+            generator = self.random_experiment_generator(space, seed)
+            return generator.random_experiments_with_responses(
+                design, num_extras, max_response_value)
+
         col_headers = None
         designed_experiments = []
         extra_experiments = []
@@ -3351,3 +6141,37 @@ mutation CreateAnalytics($sessionId:String!) {
         if col_headers is None:
             raise SpaceOrDesignRequiredError()
         return {'colHeaders': col_headers, 'data': designed_experiments + extra_experiments}
+
+    def _unique_extras(self, space, designed, num_extras, max_response_value, seed):
+        design_space = self.design_space(space)
+        seen = set(design_space.ranks(designed))
+        seen.discard(None)
+        num_extras = min(num_extras, design_space.size - len(seen))
+        if num_extras <= 0:
+            return []
+        if design_space.size <= len(seen) + 4 * num_extras:
+            # Few experiments are left, so choose among them, rather than drawing
+            # experiments until enough new ones are found.
+            free = [i for i in range(design_space.size) if i not in seen]
+            if numpy is not None or seed is not None:
+                rng = self.random_experiment_generator(space, seed).rng
+                chosen = [free[i] for i in rng.choice(len(free), num_extras, replace=False).tolist()]
+            else:
+                chosen = random.sample(free, num_extras)
+            rows = {'table': {
+                'colHeaders': self.experiments_table_column_names(space),
+                'data': [design_space.unrank(i) + [''] for i in chosen]
+            }}
+            return self.random_experiments_with_responses(
+                space, rows, 0, max_response_value)['data']
+        extras = []
+        while len(extras) < num_extras:
+            rows = self.random_experiments_with_responses(
+                space, None, num_extras - len(extras), max_response_value, seed)['data']
+            seed = None
+            for row in rows:
+                index = design_space.rank(row)
+                if index not in seen:
+                    seen.add(index)
+                    extras.append(row)
+        return extras
@@ -0,0 +1,301 @@
+"""# Design Space
+
+A compact, local representation of an experimental space, which gives the exact
+number of experiments in the space and can rank, unrank and enumerate them without
+contacting the API or listing the whole space.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import itertools
+
+from .daptics_client import InvalidSpaceParameterError, UnsupportedSpaceTypeError
+from .mixture import MixtureCompositions
+from .space import SpaceDefinition, _to_float, _to_int
+
+# The space types whose experiments can be checked and enumerated locally.
+SPACE_TYPES = ('factorial', 'mixture')
+
+
+def check_space(space, population_size=None):
+    """Checks an experimental space definition locally, before it is submitted with
+    `DapticsClient.put_experimental_parameters`.
+
+    # Arguments
+    space (dict):
+        A Python `dict` that defines the experimental space.
+
+    population_size (int, optional):
+        If given, the space must have at least this many distinct experiments.
+
+    # Returns
+    problems (list):
+        A list of strings describing the problems found, empty if there are none.
+
+    # Notes
+    Only "factorial" and "mixture" spaces are checked. Other space types accepted by
+    the API, such as "sparsefactorial", are left for the server to validate, and no
+    problems are returned for them.
+    """
+    space_type = space.get('type')
+    if space_type not in SPACE_TYPES:
+        return []
+    params = (space.get('table') or {}).get('data') or []
+    if len(params) == 0:
+        return ['The space has no parameters.']
+    problems = []
+    total_units = None
+    if space_type == 'mixture':
+        total_units = _to_int(space.get('totalUnits'))
+        if total_units is None or total_units < 0:
+            problems.append('The totalUnits of a mixture space must be a non-negative integer.')
+    names = set()
+    for param in params:
+        name = param[0] if len(param) > 0 else None
+        if name in names:
+            problems.append('The parameter name {} is used more than once.'.format(name))
+        names.add(name)
+        if len(param) < 4:
+            problems.append('The parameter {} must have a name, a type and two values.'.format(name))
+        elif space_type == 'mixture':
+            problems.extend(_mixture_param_problems(param, total_units))
+        else:
+            problems.extend(_factorial_param_problems(param))
+    population_size = _to_int(population_size)
+    if len(problems) == 0:
+        size = DesignSpace(space).size
+        if size == 0:
+            problems.append('No mixture of the parameters adds up to {} units.'.format(total_units))
+        elif population_size is not None and size < population_size:
+            problems.append(
+                'The space has {} experiments, fewer than the populationSize {}.'.format(
+                    size, population_size))
+    return problems
+
+
+def _mixture_param_problems(param, total_units):
+    name = param[0]
+    if param[1] != 'unit':
+        return ['The type of the mixture parameter {} must be "unit".'.format(name)]
+    low, high = _to_int(param[2]), _to_int(param[3])
+    if low is None or high is None or low < 0 or low > high:
+        return ['The Min and Max of the parameter {} must be integers, '
+                'with 0 <= Min <= Max.'.format(name)]
+    if total_units is not None and high > total_units:
+        return ['The Max of the parameter {} is more than the totalUnits {}.'.format(
+            name, total_units)]
+    return []
+
+
+def _factorial_param_problems(param):
+    name = param[0]
+    if param[1] not in ('numerical', 'categorical'):
+        return ['The type of the parameter {} must be "numerical" or "categorical".'.format(name)]
+    values = [value for value in param[2:] if value != '']
+    if param[1] == 'numerical':
+        if any(_to_float(value) is None for value in values):
+            return ['The values of the numerical parameter {} must be numbers.'.format(name)]
+        keys = [_to_float(value) for value in values]
+    else:
+        keys = values
+    if len(set(keys)) != len(keys):
+        return ['The parameter {} has repeated values.'.format(name)]
+    if len(keys) < 2:
+        return ['The parameter {} must have at least two values.'.format(name)]
+    return []
+
+
+class DesignSpace(object):
+    """The experiments of an experimental space, numbered from 0 to `size - 1`.
+
+    For a "factorial" space, the experiments are numbered in the order of
+    `itertools.product` over each parameter's values, in the order they are given in
+    the space. For a "mixture" space, the mixtures whose units add up to the space's
+    `totalUnits` are numbered in lexicographic order, using `MixtureCompositions`.
+    Values of "numerical" parameters are compared as numbers, so "1" and "1.0" are
+    the same experiment.
+
+    # Arguments
+    space (dict):
+        A Python `dict` that defines the experimental space.
+
+    # Attributes
+    size (int):
+        The exact number of experiments in the space, which may be larger than 2**63.
+
+    # Raises
+    UnsupportedSpaceTypeError
+        If the type of the space is not "factorial" or "mixture".
+
+    InvalidSpaceParameterError
+        If a parameter cannot be read. Use `check_space` for a full list of problems.
+
+    # Examples
+    ```python
+    >>> design_space = DesignSpace(daptics.validated_params['space'])
+    >>> design_space.size
+    >>> design_space.unrank(design_space.size - 1)
+    >>> unique_rows = design_space.unique(extras['data'])
+    ```
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.definition = SpaceDefinition(space)
+        self.space_type = self.definition.space_type
+        if self.space_type not in SPACE_TYPES:
+            raise UnsupportedSpaceTypeError(self.space_type)
+        if len(self.definition.invalid) > 0:
+            raise InvalidSpaceParameterError(self.space_type, self.definition.invalid[0])
+        self.params = self.definition.params
+        self.names = self.definition.names
+        self.levels = [param.levels for param in self.params]
+        self.mixtures = None
+        if self.space_type == 'mixture' and self.definition.total_units is not None:
+            self.mixtures = MixtureCompositions(
+                [param.bounds for param in self.params], self.definition.total_units)
+            self.size = self.mixtures.count
+        else:
+            self.size = 1
+            for levels in self.levels:
+                self.size *= len(levels)
+            if len(self.levels) == 0:
+                self.size = 0
+        # The number of experiments for each step of a parameter's value,
+        # in a "factorial" space.
+        self._strides = []
+        stride = 1
+        for levels in reversed(self.levels):
+            self._strides.insert(0, stride)
+            stride *= len(levels)
+
+    def __contains__(self, values):
+        return self.rank(values) is not None
+
+    def codes(self, values):
+        """Returns the index of each of the experiment's values in its parameter's values,
+        or None if a value is not in the space. Extra values, such as a response, are
+        ignored."""
+        if len(values) < len(self.params):
+            return None
+        codes = []
+        for param, value in zip(self.params, values):
+            code = param.code(value)
+            if code is None:
+                return None
+            codes.append(code)
+        return codes
+
+    def rank(self, values):
+        """Returns the index of an experiment, a list of parameter values, or None if the
+        experiment is not in the space. Extra values, such as a response, are ignored."""
+        codes = self.codes(values)
+        if codes is None:
+            return None
+        if self.mixtures is not None:
+            return self.mixtures.rank([low + code for code, (low, _high)
+                                       in zip(codes, self.mixtures.bounds)])
+        return sum(code * stride for code, stride in zip(codes, self._strides))
+
+    def unrank(self, index):
+        """Returns the experiment with the given index, as a list of parameter values
+        encoded as strings.
+
+        # Raises
+        IndexError
+            If the index is not in the range [0, size).
+        """
+        if self.mixtures is not None:
+            return [str(units) for units in self.mixtures.unrank(index)]
+        if not 0 <= index < self.size:
+            raise IndexError('Experiment index {} is out of range.'.format(index))
+        return [levels[code] for levels, code in zip(self.levels, self._codes_at(index))]
+
+    def points(self, start=0, stop=None):
+        """Lazily enumerates the experiments with indices in [start, stop), in order.
+
+        # Returns
+        points (iterator):
+            An iterator over lists of parameter values, encoded as strings.
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        if start >= stop:
+            return iter(())
+        if self.mixtures is not None:
+            return (self.unrank(index) for index in range(start, stop))
+        points = self._odometer(self._codes_at(start))
+        return points if stop == self.size else itertools.islice(points, stop - start)
+
+    def _codes_at(self, index):
+        codes = []
+        for stride in self._strides:
+            code, index = divmod(index, stride)
+            codes.append(code)
+        return codes
+
+    def _odometer(self, codes):
+        levels = self.levels
+        while True:
+            yield [level[code] for level, code in zip(levels, codes)]
+            j = len(codes) - 1
+            while j >= 0:
+                codes[j] += 1
+                if codes[j] < len(levels[j]):
+                    break
+                codes[j] = 0
+                j -= 1
+            if j < 0:
+                return
+
+    def __iter__(self):
+        return self.points()
+
+    def ranks(self, rows):
+        """Returns the index of each row of an experiments table (None for a row that
+        is not in the space)."""
+        return [self.rank(row) for row in rows]
+
+    def unique(self, rows, exclude=None):
+        """Removes the rows of an experiments table that are not in the space, or that
+        are the same experiment as an earlier row or as a row in `exclude`.
+
+        # Arguments
+        rows (list):
+            The data rows of an experiments table.
+
+        exclude (list, optional):
+            The data rows of other experiments, for example a design.
+
+        # Returns
+        rows (list):
+            The remaining rows, in their original order.
+        """
+        seen = set(self.ranks(exclude or []))
+        seen.add(None)
+        unique_rows = []
+        for row in rows:
+            index = self.rank(row)
+            if index not in seen:
+                seen.add(index)
+                unique_rows.append(row)
+        return unique_rows
@@ -0,0 +1,203 @@
+"""# Mixture Compositions
+
+Counts, ranks and samples the experiments of a "mixture" experimental space: the
+combinations of integer units, each between its parameter's minimum and maximum,
+that add up to the space's `totalUnits`.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+from .space import SpaceDefinition
+from .table import numpy, _require_numpy
+
+# Rows are sampled with NumPy int64 arithmetic if every count fits.
+_INT64_LIMIT = 2 ** 63 - 1
+
+
+class MixtureCompositions(object):
+    """The valid mixtures of a "mixture" space, in lexicographic order of their units.
+
+    A table of counts is computed once: `counts[j][s]` is the number of ways the
+    parameters from `j` onwards can add up to `s` units. With it, the number of
+    mixtures is known exactly, each mixture has a rank, and a mixture can be found
+    from its rank, so that mixtures can be drawn uniformly without rejecting any.
+
+    # Arguments
+    bounds (list):
+        A list of `(min, max)` tuples of integers, one for each parameter.
+
+    total_units (int):
+        The number of units that the parameters of each mixture add up to.
+
+    # Attributes
+    count (int):
+        The number of valid mixtures, which may be 0, and can be larger than 2**63.
+
+    # Examples
+    ```python
+    >>> mixtures = MixtureCompositions.from_space(daptics.validated_params['space'])
+    >>> mixtures.count
+    >>> units = mixtures.sample(numpy.random.default_rng(42), 100000)
+    ```
+    """
+
+    def __init__(self, bounds, total_units):
+        self.bounds = [(int(low), int(high)) for low, high in bounds]
+        self.total_units = int(total_units)
+        total = self.total_units
+        counts = [[0] * (total + 1) for _ in range(len(self.bounds) + 1)]
+        counts[-1][0] = 1
+        for j in range(len(self.bounds) - 1, -1, -1):
+            low, high = self.bounds[j]
+            after = counts[j + 1]
+            # counts[j][s] is the sum of after[s - high .. s - low], a sliding window.
+            window = 0
+            for s in range(total + 1):
+                if s - low >= 0:
+                    window += after[s - low]
+                if s - high - 1 >= 0:
+                    window -= after[s - high - 1]
+                counts[j][s] = window
+        self.counts = counts
+        self.count = counts[0][total] if total >= 0 else 0
+        self._table = None
+
+    @classmethod
+    def from_space(cls, space):
+        """Creates the compositions for a "mixture" space `dict` or `SpaceDefinition`,
+        with "unit" parameter rows of name, type, minimum and maximum. Returns None if
+        the space has no `totalUnits`. Raises `ValueError` if a row cannot be read."""
+        definition = space if isinstance(space, SpaceDefinition) else SpaceDefinition(space)
+        if len(definition.invalid) > 0:
+            raise ValueError('Invalid mixture parameter: {}.'.format(definition.invalid[0]))
+        if definition.total_units is None:
+            return None
+        return cls([param.bounds for param in definition.params], definition.total_units)
+
+    def rank(self, units):
+        """Returns the index of a mixture, a list of integer units, in lexicographic
+        order, or None if the mixture is not valid."""
+        if len(units) != len(self.bounds):
+            return None
+        remaining = self.total_units
+        index = 0
+        for j, value in enumerate(units):
+            low, high = self.bounds[j]
+            value = int(value)
+            if not low <= value <= min(high, remaining):
+                return None
+            after = self.counts[j + 1]
+            index += sum(after[remaining - u] for u in range(low, value))
+            remaining -= value
+        return index if remaining == 0 else None
+
+    def unrank(self, index):
+        """Returns the mixture, a list of integer units, with the given index in
+        lexicographic order.
+
+        # Raises
+        IndexError
+            If the index is not in the range [0, count).
+        """
+        if not 0 <= index < self.count:
+            raise IndexError('Mixture index {} is out of range.'.format(index))
+        remaining = self.total_units
+        units = []
+        for j, (low, high) in enumerate(self.bounds):
+            after = self.counts[j + 1]
+            for value in range(low, min(high, remaining) + 1):
+                count = after[remaining - value]
+                if index < count:
+                    break
+                index -= count
+            units.append(value)
+            remaining -= value
+        return units
+
+    def sample(self, rng, n):
+        """Draws `n` mixtures uniformly, with replacement. Requires the numpy package.
+
+        # Arguments
+        rng (`numpy.random.Generator`):
+            The random number generator.
+
+        n (int):
+            The number of mixtures.
+
+        # Returns
+        units (`numpy.ndarray`):
+            An int64 array with one row of units for each mixture.
+
+        # Raises
+        ValueError
+            If there are no valid mixtures.
+        """
+        _require_numpy()
+        if self.count == 0:
+            raise ValueError('No mixture adds up to {} units.'.format(self.total_units))
+        table = self._int64_table()
+        if table is None:
+            return numpy.array([self.unrank(self._random_below(rng, self.count))
+                                for _ in range(n)], dtype=numpy.int64).reshape(n, len(self.bounds))
+        return self._unrank_array(table, rng.integers(0, self.count, size=n, dtype=numpy.int64))
+
+    def _int64_table(self):
+        if self._table is None:
+            if max(max(row) for row in self.counts) > _INT64_LIMIT:
+                self._table = False
+            else:
+                self._table = numpy.array(self.counts, dtype=numpy.int64)
+        return self._table if self._table is not False else None
+
+    def _unrank_array(self, table, index):
+        # The same walk as `unrank`, for all rows at once: for each parameter,
+        # step through its values, and keep the first value whose count of
+        # completions exceeds the row's remaining index.
+        n = len(index)
+        index = index.copy()
+        remaining = numpy.full(n, self.total_units, dtype=numpy.int64)
+        units = numpy.empty((n, len(self.bounds)), dtype=numpy.int64)
+        for j, (low, high) in enumerate(self.bounds):
+            after = table[j + 1]
+            chosen = numpy.full(n, -1, dtype=numpy.int64)
+            for value in range(low, high + 1):
+                rest = remaining - value
+                count = numpy.where(rest >= 0, after[numpy.maximum(rest, 0)], 0)
+                open_rows = chosen < 0
+                chosen[open_rows & (index < count)] = value
+                still_open = chosen < 0
+                index[still_open] -= count[still_open]
+                if not still_open.any():
+                    break
+            units[:, j] = chosen
+            remaining -= chosen
+        return units
+
+    def _random_below(self, rng, limit):
+        # An exactly uniform integer in [0, limit), for limits beyond int64.
+        bits = limit.bit_length()
+        num_bytes = (bits + 7) // 8
+        while True:
+            value = int.from_bytes(rng.bytes(num_bytes), 'big') >> (8 * num_bytes - bits)
+            if value < limit:
+                return value
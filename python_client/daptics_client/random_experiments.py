@@ -0,0 +1,222 @@
+"""# Random Experiments
+
+Draws random experiments and responses for an experimental space with NumPy,
+a whole table at a time, for simulations and tests.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import array
+
+from .daptics_client import InvalidSpaceParameterError, NoValidMixturesError
+from .mixture import MixtureCompositions
+from .space import SpaceDefinition
+from .table import FactorColumn, NumericColumn, Table, numpy, _require_numpy
+
+# The fractional parts of responses formatted with 3 decimals, indexed by thousandths.
+_THOUSANDTHS = ['.{:03d}'.format(i) for i in range(1000)]
+
+
+class RandomExperimentGenerator(object):
+    """Generates random experiments for an experimental space. The valid values of
+    every parameter are looked up once, when the generator is created, and tables are
+    then drawn column by column with a NumPy `Generator`. Requires the numpy package.
+    Use `random_experiments` for an experiments table `dict`, or `random_table` for a
+    columnar `Table`, which is much faster for millions of rows.
+
+    For a "factorial" space, each parameter's value is drawn from the parameter's
+    values. For a "mixture" space, mixtures are drawn uniformly from the mixtures whose
+    units add up to the space's `totalUnits`, using `MixtureCompositions`, so every
+    generated experiment is valid. Responses are drawn uniformly
+    from [0.0, max_response_value] and formatted with 3 decimals.
+
+    # Arguments
+    space (dict):
+        A Python `dict` that defines the experimental space.
+
+    seed (int, optional):
+        The seed for the random number generator. Generators created with the same
+        seed and space produce the same tables. If None, a fresh seed is used.
+
+    # Examples
+    ```python
+    >>> generator = RandomExperimentGenerator(daptics.validated_params['space'], seed=42)
+    >>> table = generator.random_experiments(1000000, max_response_value=5.0)
+    ```
+    """
+
+    def __init__(self, space, seed=None):
+        _require_numpy()
+        self.space = space
+        self.space_type = space['type']
+        self.rng = numpy.random.default_rng(seed)
+        definition = SpaceDefinition(space)
+        if len(definition.invalid) > 0:
+            raise InvalidSpaceParameterError(self.space_type, definition.invalid[0])
+        self.col_headers = []
+        self._values = []
+        for param in definition.params:
+            if param.param_type not in ('unit', 'numerical', 'categorical', 'factorial') or \
+                    len(param.levels) == 0:
+                raise InvalidSpaceParameterError(self.space_type, param.row)
+            self.col_headers.append(param.name)
+            self._values.append(numpy.array(param.levels, dtype=object))
+        self.col_headers.append('Response')
+        self.mixtures = None
+        if self.space_type == 'mixture':
+            self.mixtures = MixtureCompositions.from_space(definition)
+            if self.mixtures is not None and self.mixtures.count == 0:
+                raise NoValidMixturesError(self.mixtures.total_units)
+
+    def random_codes(self, n):
+        """Draws the parameter values for `n` experiments, as indices into each
+        parameter's values.
+
+        # Returns
+        codes (list):
+            One NumPy int32 array of `n` indices for each parameter.
+        """
+        if self.mixtures is not None:
+            units = self.mixtures.sample(self.rng, n)
+            return [(units[:, j] - low).astype(numpy.int32)
+                    for j, (low, _high) in enumerate(self.mixtures.bounds)]
+        return [self.rng.integers(0, len(values), size=n, dtype=numpy.int32)
+                for values in self._values]
+
+    def random_columns(self, n):
+        """Draws the parameter values for `n` experiments.
+
+        # Returns
+        columns (list):
+            One NumPy object array of `n` strings for each parameter.
+        """
+        return [values[codes] for values, codes in zip(self._values, self.random_codes(n))]
+
+    def random_response_values(self, n, max_response_value):
+        """Draws `n` response values in the range [0.0, max_response_value], rounded
+        to 3 decimals.
+
+        # Returns
+        responses (`numpy.ndarray`):
+            A float64 array.
+        """
+        return numpy.rint(self.rng.uniform(0.0, max_response_value, size=n) * 1000.0) / 1000.0
+
+    def random_responses(self, n, max_response_value):
+        """Draws `n` response values in the range [0.0, max_response_value].
+
+        # Returns
+        responses (`numpy.ndarray`):
+            An array of strings, formatted with 3 decimals.
+        """
+        thousandths = numpy.rint(self.random_response_values(n, max_response_value) * 1000.0)
+        thousandths = thousandths.astype(numpy.int64)
+        # Formats the whole and fractional parts separately, which is much
+        # faster than formatting each number.
+        whole = (thousandths // 1000).astype(str)
+        return numpy.char.add(whole, numpy.array(_THOUSANDTHS)[thousandths % 1000])
+
+    def random_table(self, n, max_response_value=None):
+        """Draws a columnar table of `n` random experiments, without creating a string
+        for every value. The parameters are `FactorColumn`s, and the responses a
+        `NumericColumn`, blank if `max_response_value` is None.
+
+        # Returns
+        table (`Table`)
+        """
+        columns = []
+        for name, values, codes in zip(self.col_headers, self._values, self.random_codes(n)):
+            columns.append(FactorColumn(name, values.tolist(), array.array('i', codes.tobytes())))
+        if max_response_value is None:
+            responses = numpy.full(n, numpy.nan)
+        else:
+            responses = self.random_response_values(n, max_response_value)
+        columns.append(NumericColumn(self.col_headers[-1], array.array('d', responses.tobytes())))
+        return Table(columns)
+
+    def random_experiments(self, n, max_response_value=None):
+        """Draws an experiments table of `n` random experiments.
+
+        # Arguments
+        n (int):
+            The number of experiments.
+
+        max_response_value (float, optional):
+            If None, the responses are empty strings. Otherwise, the maximum value for
+            the randomly generated responses.
+
+        # Returns
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items.
+        """
+        columns = self.random_columns(n)
+        if max_response_value is None:
+            responses = numpy.full(n, '', dtype=object)
+        else:
+            responses = self.random_responses(n, max_response_value).astype(object)
+        return {'colHeaders': list(self.col_headers), 'data': self._rows(columns + [responses])}
+
+    def with_random_responses(self, experiments, max_response_value):
+        """Replaces the last value (the response) of every row of a table with a random
+        response, as `DapticsClient.experiment_with_random_response` does for one row.
+
+        # Arguments
+        experiments (dict):
+            A Python `dict` with `colHeaders` and `data` items, for example a design.
+
+        max_response_value (float):
+            The maximum value for the randomly generated responses.
+
+        # Returns
+        table (dict):
+            A new Python `dict` with `colHeaders` and `data` items.
+        """
+        data = experiments['data']
+        responses = self.random_responses(len(data), max_response_value).tolist()
+        return {
+            'colHeaders': list(experiments['colHeaders']),
+            'data': [row[:-1] + [response] for row, response in zip(data, responses)]
+        }
+
+    def random_experiments_with_responses(self, design=None, num_extras=0, max_response_value=5.0):
+        """Draws responses for the rows of a design, followed by `num_extras` random extra
+        experiments with responses. See `DapticsClient.random_experiments_with_responses`.
+
+        # Returns
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items.
+        """
+        col_headers = list(self.col_headers)
+        data = []
+        if design is not None:
+            table = self.with_random_responses(design['table'], max_response_value)
+            col_headers = table['colHeaders']
+            data = table['data']
+        if num_extras > 0:
+            data.extend(self.random_experiments(num_extras, max_response_value)['data'])
+        return {'colHeaders': col_headers, 'data': data}
+
+    def _rows(self, columns):
+        if len(columns[0]) == 0:
+            return []
+        return numpy.column_stack(columns).tolist()
@@ -0,0 +1,157 @@
+"""# Space Definition
+
+The parameters of an experimental space, read once from the space table into the
+values each parameter allows, for use by the experiments validator, the design
+space and the random experiment generator.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import math
+
+
+def _to_float(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _to_int(value):
+    number = _to_float(value)
+    if number is None or number != int(number):
+        return None
+    return int(number)
+
+
+class SpaceParameter(object):
+    """One parameter of an experimental space, with the values it allows.
+
+    # Attributes
+    name (str):
+        The parameter name.
+
+    param_type (str):
+        The parameter type from the space table: "unit" for a "mixture" space, or
+        "numerical" or "categorical" for a "factorial" space.
+
+    levels (list):
+        The allowed values, as strings, in the order of the space table; for a "unit"
+        parameter, the integers from its minimum to its maximum.
+
+    bounds (tuple):
+        For a "unit" parameter, the minimum and maximum as integers, otherwise None.
+
+    row (list):
+        The row of the space table the parameter was read from.
+    """
+
+    def __init__(self, name, param_type, levels, bounds=None, row=None):
+        self.row = row
+        self.name = name
+        self.param_type = param_type
+        self.levels = levels
+        self.bounds = bounds
+        self._codes = {}
+        for code, level in enumerate(levels):
+            self._codes.setdefault(self.key(level), code)
+
+    @classmethod
+    def from_row(cls, space_type, row):
+        """Reads a parameter from a row of a space table. Returns None if the row
+        cannot be read."""
+        if len(row) < 4:
+            return None
+        if space_type == 'mixture':
+            low, high = _to_int(row[2]), _to_int(row[3])
+            if row[1] != 'unit' or low is None or high is None:
+                return None
+            levels = [str(units) for units in range(low, high + 1)]
+            return cls(row[0], row[1], levels, (low, high), row)
+        levels = [value for value in row[2:] if value != '']
+        if row[1] == 'numerical' and any(_to_float(level) is None for level in levels):
+            return None
+        return cls(row[0], row[1], levels, row=row)
+
+    def key(self, value):
+        """Returns the key used to compare a value with the allowed values: an integer
+        for a "unit" parameter, a float for a "numerical" parameter, or the string
+        itself. None if the value cannot be converted."""
+        if self.param_type == 'unit':
+            return _to_int(value)
+        if self.param_type == 'numerical':
+            return _to_float(value)
+        return value
+
+    def code(self, value):
+        """Returns the index in `levels` of the allowed value equal to `value`, or None
+        if the value is not allowed."""
+        key = self.key(value)
+        return None if key is None else self._codes.get(key)
+
+    def units(self, value):
+        """For a "unit" parameter, returns the value as an integer, or None if the value
+        is not allowed."""
+        code = self.code(value)
+        return None if code is None else self.bounds[0] + code
+
+
+class SpaceDefinition(object):
+    """The parameters of an experimental space.
+
+    # Arguments
+    space (dict):
+        A Python `dict` that defines the experimental space.
+
+    # Attributes
+    space_type (str):
+        "factorial" or "mixture".
+
+    total_units (int):
+        The `totalUnits` of a "mixture" space as an integer, or None.
+
+    params (list):
+        A `SpaceParameter` for each row of the space table that could be read.
+
+    invalid (list):
+        The rows of the space table that could not be read.
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.space_type = space['type']
+        self.total_units = _to_int(space.get('totalUnits'))
+        self.params = []
+        self.invalid = []
+        for row in space['table']['data']:
+            param = SpaceParameter.from_row(self.space_type, row)
+            if param is None:
+                self.invalid.append(row)
+            else:
+                self.params.append(param)
+
+    @property
+    def names(self):
+        """The names of the parameters."""
+        return [param.name for param in self.params]
@@ -0,0 +1,377 @@
+"""# Experiment Store
+
+A local SQLite database that keeps the sessions, validated experimental spaces,
+designs and experiments that a `DapticsClient` has received, so that they can be
+queried without contacting the API. Enable it with the client's `store_path` option.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class ExperimentStore(object):
+    """Persists the tables received by a client in an SQLite database.
+
+    Each generation of experiments is stored as one row per experiment, keyed by
+    session id, kind ("history" for experiments and responses, "design" for designed
+    experiments), generation number and row number, and indexed by whether the
+    experiment was designed or was an initial or extra experiment. Sessions, with their
+    campaign status and validated experimental space, are stored in a separate table.
+
+    A store may be shared by several clients (see `DapticsClient.session_client`)
+    and used from several threads.
+
+    # Arguments
+    path (str):
+        The file path of the database, which is created if it does not exist.
+        Use ":memory:" for a database that is not saved.
+
+    # Examples
+    ```python
+    >>> store = ExperimentStore('daptics.db')
+    >>> table = store.experiments(session_id, gen_from=3, designed=True)
+    >>> table['colHeaders']
+    ['Gen_', 'Designed_', 'param1', 'param2', 'Response']
+    ```
+    """
+
+    HISTORY = 'history'
+    """The kind of a stored generation of experiments and responses."""
+
+    DESIGN = 'design'
+    """The kind of a stored generation of designed experiments."""
+
+    SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    name TEXT,
+    tag TEXT,
+    gen INTEGER,
+    remaining INTEGER,
+    completed INTEGER,
+    params TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS generations (
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    gen INTEGER NOT NULL,
+    validated INTEGER,
+    has_responses INTEGER,
+    design_rows INTEGER,
+    col_headers TEXT,
+    updated_at REAL,
+    PRIMARY KEY (session_id, kind, gen)
+);
+CREATE TABLE IF NOT EXISTS experiments (
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    gen INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    designed INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, kind, gen, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS experiments_designed
+    ON experiments (session_id, kind, designed, gen);
+"""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.lock, self.conn:
+            self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def put_session(self, session):
+        """Saves a session's name, tag, campaign status and experimental space parameters.
+
+        # Arguments
+        session (dict):
+            A Python `dict` with the items returned by the `session` query: `sessionId`,
+            and optionally `name`, `tag`, `campaign` and `params`. Items that are missing
+            keep their stored values.
+        """
+        session_id = session['sessionId']
+        campaign = session.get('campaign') or {}
+        values = {
+            'name': session.get('name'),
+            'tag': session.get('tag'),
+            'gen': campaign.get('gen'),
+            'remaining': campaign.get('remaining'),
+            'completed': None if campaign.get('completed') is None else int(campaign['completed']),
+            'params': None if session.get('params') is None else json.dumps(session['params'])
+        }
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO sessions (session_id) VALUES (?)', (session_id,))
+            self.conn.execute(
+                'UPDATE sessions SET name = COALESCE(?, name), tag = COALESCE(?, tag), '
+                'gen = COALESCE(?, gen), remaining = COALESCE(?, remaining), '
+                'completed = COALESCE(?, completed), params = COALESCE(?, params), '
+                'updated_at = ? WHERE session_id = ?',
+                (values['name'], values['tag'], values['gen'], values['remaining'],
+                 values['completed'], values['params'], time.time(), session_id))
+
+    def get_session(self, session_id):
+        """Returns a stored session.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        # Returns
+        session (dict):
+            None if the session is not stored, or a Python `dict` shaped like the value of
+            the `session` query, with `sessionId`, `name`, `tag`, `campaign`, `params` and
+            `experiments` (the stored design for the campaign's generation, or None) items.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT name, tag, gen, remaining, completed, params FROM sessions '
+                'WHERE session_id = ?', (session_id,)).fetchone()
+        if row is None:
+            return None
+        name, tag, gen, remaining, completed, params = row
+        campaign = None
+        if gen is not None:
+            campaign = {'gen': gen, 'remaining': remaining, 'completed': bool(completed)}
+        return {
+            'sessionId': session_id,
+            'name': name,
+            'tag': tag,
+            'campaign': campaign,
+            'params': None if params is None else json.loads(params),
+            'experiments': None if gen is None else self.get_generation(
+                session_id, gen, self.DESIGN)
+        }
+
+    def sessions(self):
+        """Returns the ids of the stored sessions, in the order they were last updated."""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT session_id FROM sessions ORDER BY updated_at').fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def delete_session(self, session_id):
+        """Removes a session and all its experiments from the store."""
+        with self.lock, self.conn:
+            for table in ('experiments', 'generations', 'sessions'):
+                self.conn.execute(
+                    'DELETE FROM {} WHERE session_id = ?'.format(table), (session_id,))
+
+    def put_generation(self, session_id, experiments, kind=HISTORY):
+        """Saves one generation of experiments, replacing any stored rows for the
+        same session, kind and generation.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        experiments (dict):
+            A Python `dict` with `gen`, `validated`, `hasResponses`, `designRows` and `table` items,
+            as returned by the `experiments` query. Nothing is saved if it is None.
+
+        kind (str):
+            `ExperimentStore.HISTORY` or `ExperimentStore.DESIGN`.
+        """
+        if experiments is None:
+            return
+        with self.lock, self.conn:
+            self._put_generation(session_id, experiments, kind)
+
+    def put_history(self, session_id, history):
+        """Saves all the generations of an experiments history in one transaction.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        history (list):
+            A list as returned by the `experimentsHistory` query. Items that are None
+            are skipped.
+        """
+        if not history:
+            return
+        with self.lock, self.conn:
+            for experiments in history:
+                if experiments is not None:
+                    self._put_generation(session_id, experiments, self.HISTORY)
+
+    def _put_generation(self, session_id, experiments, kind):
+        gen = experiments['gen']
+        table = experiments.get('table') or {}
+        data = table.get('data') or []
+        design_rows = experiments.get('designRows')
+        if design_rows is None:
+            design_rows = len(data) if kind == self.DESIGN else 0
+        self.conn.execute(
+            'INSERT OR IGNORE INTO sessions (session_id, updated_at) VALUES (?, ?)',
+            (session_id, time.time()))
+        self.conn.execute(
+            'INSERT OR REPLACE INTO generations (session_id, kind, gen, validated, '
+            'has_responses, design_rows, col_headers, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (session_id, kind, gen, int(bool(experiments.get('validated'))),
+             int(bool(experiments.get('hasResponses'))), design_rows,
+             json.dumps(table.get('colHeaders') or []), time.time()))
+        self.conn.execute(
+            'DELETE FROM experiments WHERE session_id = ? AND kind = ? AND gen = ?',
+            (session_id, kind, gen))
+        self.conn.executemany(
+            'INSERT INTO experiments (session_id, kind, gen, row, designed, data) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            ((session_id, kind, gen, i, int(i < design_rows), json.dumps(row))
+             for i, row in enumerate(data)))
+
+    def get_generation(self, session_id, gen, kind=HISTORY):
+        """Returns one stored generation of experiments.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        gen (int):
+            The generation number.
+
+        kind (str):
+            `ExperimentStore.HISTORY` or `ExperimentStore.DESIGN`.
+
+        # Returns
+        experiments (dict):
+            None if the generation is not stored, or a Python `dict` in the same form
+            as was passed to `put_generation`.
+        """
+        generations = self._get_generations(session_id, kind, gen, gen)
+        return generations.get(gen)
+
+    def get_history(self, session_id):
+        """Returns the stored experiments history of a session.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        # Returns
+        history (list):
+            None if no generations are stored, or a list in the same form as the
+            `experimentsHistory` query's value, indexed by generation, with None for
+            generations that are not stored.
+        """
+        generations = self._get_generations(session_id, self.HISTORY, None, None)
+        if len(generations) == 0:
+            return None
+        history = [None] * (max(generations) + 1)
+        for gen, experiments in generations.items():
+            history[gen] = experiments
+        return history
+
+    def _get_generations(self, session_id, kind, gen_from, gen_to):
+        where, args = self._range(session_id, kind, gen_from, gen_to, None)
+        with self.lock:
+            meta = self.conn.execute(
+                'SELECT gen, validated, has_responses, design_rows, col_headers '
+                'FROM generations WHERE ' + where, args).fetchall()
+            rows = self.conn.execute(
+                'SELECT gen, data FROM experiments WHERE ' + where +
+                ' ORDER BY gen, row', args).fetchall()
+        generations = {}
+        for gen, validated, has_responses, design_rows, col_headers in meta:
+            generations[gen] = {
+                'gen': gen,
+                'validated': bool(validated),
+                'hasResponses': bool(has_responses),
+                'designRows': design_rows,
+                'table': {'colHeaders': json.loads(col_headers), 'data': []}
+            }
+        for gen, data in rows:
+            generations[gen]['table']['data'].append(json.loads(data))
+        return generations
+
+    def experiments(self, session_id, gen_from=None, gen_to=None, designed=None, kind=HISTORY):
+        """Selects stored experiments from a range of generations.
+
+        # Arguments
+        session_id (str):
+            The session id.
+
+        gen_from (int, optional):
+            The first generation to include. If None, start with the first stored generation.
+
+        gen_to (int, optional):
+            The last generation to include. If None, end with the last stored generation.
+
+        designed (bool, optional):
+            If True, only include designed experiments. If False, only include initial
+            and extra experiments. If None, include both.
+
+        kind (str):
+            `ExperimentStore.HISTORY` or `ExperimentStore.DESIGN`.
+
+        # Returns
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items. As in the file written by
+            `DapticsClient.export_experiments_history_csv`, the first two columns are "Gen_",
+            the generation number, and "Designed_", "Y" for designed experiments or "N".
+        """
+        where, args = self._range(session_id, kind, gen_from, gen_to, designed)
+        with self.lock:
+            headers = self.conn.execute(
+                'SELECT col_headers FROM generations WHERE session_id = ? AND kind = ? '
+                'ORDER BY gen DESC LIMIT 1', (session_id, kind)).fetchone()
+            rows = self.conn.execute(
+                'SELECT gen, designed, data FROM experiments WHERE ' + where +
+                ' ORDER BY gen, row', args).fetchall()
+        col_headers = [] if headers is None else json.loads(headers[0])
+        return {
+            'colHeaders': ['Gen_', 'Designed_'] + col_headers,
+            'data': [[gen, 'Y' if designed_ else 'N'] + json.loads(data)
+                     for gen, designed_, data in rows]
+        }
+
+    def _range(self, session_id, kind, gen_from, gen_to, designed):
+        where = ['session_id = ?', 'kind = ?']
+        args = [session_id, kind]
+        if designed is not None:
+            where.append('designed = ?')
+            args.append(int(bool(designed)))
+        if gen_from is not None:
+            where.append('gen >= ?')
+            args.append(gen_from)
+        if gen_to is not None:
+            where.append('gen <= ?')
+            args.append(gen_to)
+        return (' AND '.join(where), args)
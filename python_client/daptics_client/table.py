@@ -0,0 +1,565 @@
+"""# Columnar Tables
+
+A compact, column-oriented representation of the `colHeaders` and `data`
+tables that the API sends and receives. Numeric columns are kept in arrays of
+doubles and other columns as categorical codes, so that large experiment
+histories use a fraction of the memory of lists of strings, and columns can
+be used as NumPy arrays without copying. Tables can be written to and read
+from Parquet files and Arrow IPC files or streams if pyarrow is installed.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import array
+import csv
+import json
+import math
+import os
+import re
+import sys
+
+NUMPY_INSTALL = 'Please install with "pip install numpy>=1.17".'
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PYARROW_INSTALL = 'Please install with "pip install pyarrow".'
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Integers that can be held exactly in a double, written without
+# leading zeros, a plus sign or a negative zero, so that `str(int(value)) == value`.
+INTEGER_RE = re.compile(r'(0|-?[1-9][0-9]{0,14})\Z')
+
+# Per-row formats of the values in a `NumericColumn`.
+FORMAT_FLOAT = 0
+FORMAT_INTEGER = 1
+FORMAT_BLANK = 2
+
+
+def _require_numpy():
+    if numpy is None:
+        raise Exception('Could not import numpy. ' + NUMPY_INSTALL)
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise Exception('Could not import pyarrow. ' + PYARROW_INSTALL)
+
+
+def arrow_file_format(fname):
+    """Returns the Arrow file format implied by a file name's extension:
+    "parquet" for ".parquet" or ".pq", "stream" for ".arrows", or "ipc"."""
+    ext = os.path.splitext(fname)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext == '.arrows':
+        return 'stream'
+    return 'ipc'
+
+
+def _numeric_format(value):
+    # Returns the format of a wire value that can be held in a `NumericColumn`
+    # and written back unchanged, or None.
+    if type(value) != str:
+        return None
+    if value == '':
+        return FORMAT_BLANK
+    if INTEGER_RE.match(value):
+        return FORMAT_INTEGER
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if math.isfinite(number) and repr(number) == value:
+        return FORMAT_FLOAT
+    return None
+
+
+class NumericColumn(object):
+    """A table column whose values are numbers, held in an array of doubles.
+    Blank values are held as NaN.
+
+    # Arguments
+    name (str):
+        The column name.
+
+    values (`array.array`):
+        An array of type 'd' with one value for each row.
+
+    formats (bytearray, optional):
+        The format of each row's wire value, `FORMAT_FLOAT`, `FORMAT_INTEGER` or
+        `FORMAT_BLANK`. Only needed if integers and decimals are mixed in the column.
+
+    integer (bool):
+        If True, and `formats` is None, non-blank values are written as integers.
+    """
+
+    kind = 'numeric'
+
+    def __init__(self, name, values, formats=None, integer=False):
+        self.name = name
+        self.values = values
+        self.formats = formats
+        self.integer = integer
+
+    @classmethod
+    def from_wire(cls, name, values, formats):
+        """Creates a column from wire values, given their formats as returned
+        by `_numeric_format`."""
+        numbers = array.array('d', (math.nan if f == FORMAT_BLANK else float(v)
+                                    for v, f in zip(values, formats)))
+        kinds = set(formats)
+        kinds.discard(FORMAT_BLANK)
+        if len(kinds) > 1:
+            return cls(name, numbers, bytearray(formats))
+        return cls(name, numbers, integer=(kinds == {FORMAT_INTEGER}))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        """Returns the wire value (a string) for row `i`."""
+        return self._format(self.values[i], None if self.formats is None else self.formats[i])
+
+    def _format(self, number, fmt):
+        if fmt is None:
+            if math.isnan(number):
+                return ''
+            fmt = FORMAT_INTEGER if self.integer else FORMAT_FLOAT
+        if fmt == FORMAT_BLANK:
+            return ''
+        if fmt == FORMAT_INTEGER:
+            return str(int(number))
+        return repr(number)
+
+    def to_list(self):
+        """Returns the column's wire values, as a list of strings."""
+        if self.formats is None:
+            return [self._format(number, None) for number in self.values]
+        return [self._format(number, fmt) for number, fmt in zip(self.values, self.formats)]
+
+    def array(self):
+        """Returns the values as a NumPy float64 array that shares the column's memory.
+        Blank values are NaN. Requires the numpy package."""
+        _require_numpy()
+        return numpy.frombuffer(self.values, dtype=numpy.float64)
+
+    def to_arrow(self):
+        """Returns the column as a pyarrow int64 array, if all values are written as
+        integers, or else as a float64 array. Blank values are null."""
+        _require_pyarrow()
+        values = self.array() if numpy is not None else list(self.values)
+        arrow_array = pyarrow.array(values, type=pyarrow.float64(), from_pandas=True)
+        if self.formats is None and self.integer:
+            arrow_array = arrow_array.cast(pyarrow.int64())
+        return arrow_array
+
+    def take(self, indices):
+        """Returns a new column with the rows at the given indices."""
+        values = array.array('d', (self.values[i] for i in indices))
+        formats = None
+        if self.formats is not None:
+            formats = bytearray(self.formats[i] for i in indices)
+        return NumericColumn(self.name, values, formats, self.integer)
+
+    def nbytes(self):
+        """Returns the approximate number of bytes used by the column's data."""
+        size = self.values.itemsize * len(self.values)
+        if self.formats is not None:
+            size += len(self.formats)
+        return size
+
+
+class FactorColumn(object):
+    """A table column whose values are held as integer codes into a list of levels.
+
+    # Arguments
+    name (str):
+        The column name.
+
+    levels (list):
+        The distinct values in the column, in order of first appearance.
+
+    codes (`array.array`):
+        An array of type 'i' with one code, an index into `levels`, for each row.
+    """
+
+    kind = 'factor'
+
+    def __init__(self, name, levels, codes):
+        self.name = name
+        self.levels = levels
+        self.codes = codes
+
+    @classmethod
+    def from_wire(cls, name, values):
+        """Creates a column from a sequence of wire values."""
+        index = {}
+        codes = array.array('i', (index.setdefault(v, len(index)) for v in values))
+        return cls(name, list(index), codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        """Returns the value for row `i`."""
+        return self.levels[self.codes[i]]
+
+    def to_list(self):
+        """Returns the column's wire values."""
+        levels = self.levels
+        return [levels[code] for code in self.codes]
+
+    def array(self):
+        """Returns the codes as a NumPy int32 array that shares the column's memory.
+        Requires the numpy package."""
+        _require_numpy()
+        return numpy.frombuffer(self.codes, dtype=numpy.int32)
+
+    def to_arrow(self):
+        """Returns the column as a pyarrow dictionary array with int32 indices.
+        A None level is written as null."""
+        _require_pyarrow()
+        levels = self.levels
+        codes = self.codes
+        if None in levels:
+            null_code = levels.index(None)
+            codes = [None if code == null_code else code for code in codes]
+            levels = ['' if level is None else level for level in levels]
+        indices = pyarrow.array(codes, type=pyarrow.int32())
+        return pyarrow.DictionaryArray.from_arrays(indices, pyarrow.array(levels))
+
+    def take(self, indices):
+        """Returns a new column with the rows at the given indices."""
+        return FactorColumn(self.name, self.levels, array.array('i', (self.codes[i] for i in indices)))
+
+    def nbytes(self):
+        """Returns the approximate number of bytes used by the column's data."""
+        return (self.codes.itemsize * len(self.codes) +
+                sum(sys.getsizeof(level) for level in self.levels))
+
+
+class Table(object):
+    """A table with named, typed columns. Columns whose values are all numbers
+    (or blank) are `NumericColumn`s, and all others are `FactorColumn`s. Converting
+    a table from and back to the wire format returns exactly the same values.
+
+    # Arguments
+    columns (list):
+        The `NumericColumn` and `FactorColumn` columns of the table, all of the same length.
+
+    metadata (dict, optional):
+        Information about the table's contents, which must be serializable as JSON.
+        It is saved with the table in Parquet and Arrow files.
+
+    # Examples
+    ```python
+    >>> table = Table.from_wire(daptics.design['table'])
+    >>> table.column('Response').array().mean()
+    >>> table.to_wire() == daptics.design['table']
+    True
+    ```
+    """
+
+    def __init__(self, columns, metadata=None):
+        self.columns = list(columns)
+        self.metadata = metadata or {}
+        self.col_headers = [column.name for column in self.columns]
+        self._index = {name: i for i, name in enumerate(self.col_headers)}
+        lengths = set(len(column) for column in self.columns)
+        if len(lengths) > 1:
+            raise ValueError('Table columns have different lengths.')
+        self.num_rows = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_wire(cls, table):
+        """Creates a table from the wire format.
+
+        # Arguments
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items, as returned by the API.
+
+        # Returns
+        table (`Table`)
+        """
+        col_headers = table.get('colHeaders') or []
+        data = table.get('data') or []
+        for i, row in enumerate(data):
+            if len(row) != len(col_headers):
+                raise ValueError('Row {} has {} values, but there are {} columns.'.format(
+                    i + 1, len(row), len(col_headers)))
+        return cls.from_columns(col_headers, zip(*data) if data else [[]] * len(col_headers))
+
+    @classmethod
+    def from_columns(cls, col_headers, values):
+        """Creates a table from lists of wire values.
+
+        # Arguments
+        col_headers (list):
+            The column names.
+
+        values (list):
+            One sequence of wire values for each column.
+
+        # Returns
+        table (`Table`)
+        """
+        columns = []
+        for name, column_values in zip(col_headers, values):
+            formats = []
+            for value in column_values:
+                fmt = _numeric_format(value)
+                if fmt is None:
+                    formats = None
+                    break
+                formats.append(fmt)
+            if formats is None:
+                columns.append(FactorColumn.from_wire(name, column_values))
+            else:
+                columns.append(NumericColumn.from_wire(name, column_values, formats))
+        return cls(columns)
+
+    @classmethod
+    def from_history(cls, history):
+        """Creates one table from all the generations of an experiments history,
+        with "Seq_", "Gen_" and "Designed_" columns before the experiments columns,
+        as in the file written by `DapticsClient.export_experiments_history_csv`.
+
+        # Arguments
+        history (list):
+            The value of a client's `experiments_history` attribute.
+
+        # Returns
+        table (`Table`):
+            None if the history has no experiments.
+        """
+        col_headers = None
+        gens = array.array('d')
+        designed = array.array('i')
+        values = None
+        for gen, exp in enumerate(history or []):
+            if exp is None or exp.get('table') is None:
+                continue
+            if col_headers is None:
+                col_headers = exp['table']['colHeaders']
+                values = [[] for _name in col_headers]
+            drows = exp['designRows']
+            for i, row in enumerate(exp['table']['data']):
+                gens.append(gen)
+                designed.append(0 if i < drows else 1)
+                for column, value in zip(values, row):
+                    column.append(value)
+        if col_headers is None:
+            return None
+        table = cls.from_columns(col_headers, values)
+        seq = NumericColumn('Seq_', array.array('d', range(1, len(gens) + 1)), integer=True)
+        gen_column = NumericColumn('Gen_', gens, integer=True)
+        designed_column = FactorColumn('Designed_', ['Y', 'N'], designed)
+        return cls([seq, gen_column, designed_column] + table.columns)
+
+    def __len__(self):
+        return self.num_rows
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        """Returns the column with the given name.
+
+        # Raises
+        KeyError
+            If there is no such column.
+        """
+        return self.columns[self._index[name]]
+
+    def row(self, i):
+        """Returns the wire values of row `i`, as a list."""
+        return [column[i] for column in self.columns]
+
+    def rows(self):
+        """Iterates over the rows, as lists of wire values."""
+        return (list(row) for row in zip(*(column.to_list() for column in self.columns)))
+
+    def take(self, indices):
+        """Returns a new table with the rows at the given indices, in the given order.
+        `indices` may be a NumPy integer or boolean array."""
+        if numpy is not None and isinstance(indices, numpy.ndarray):
+            if indices.dtype == bool:
+                indices = numpy.flatnonzero(indices)
+            indices = indices.tolist()
+        indices = list(indices)
+        return Table([column.take(indices) for column in self.columns], self.metadata)
+
+    def to_wire(self):
+        """Returns the table in the wire format.
+
+        # Returns
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items.
+        """
+        return {'colHeaders': list(self.col_headers), 'data': list(self.rows())}
+
+    def write_csv(self, fname, header=True):
+        """Writes the table to a CSV file.
+
+        # Arguments
+        fname (str):
+            The filesystem path where the file will be written.
+
+        header (bool):
+            If True, the column names are written in the first row.
+        """
+        with open(fname, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile, delimiter=',', quoting=csv.QUOTE_NONE)
+            if header:
+                writer.writerow(self.col_headers)
+            writer.writerows(self.rows())
+
+    def nbytes(self):
+        """Returns the approximate number of bytes used by the table's data."""
+        return sum(column.nbytes() for column in self.columns)
+
+    def to_arrow(self):
+        """Converts the table to a `pyarrow.Table`. Numeric columns become int64 or
+        float64 columns with nulls for blank values, and other columns become
+        dictionary-encoded columns. The `metadata` is saved in the schema's metadata,
+        under the "daptics" key. Requires the pyarrow package.
+
+        # Returns
+        table (`pyarrow.Table`)
+        """
+        _require_pyarrow()
+        arrow_table = pyarrow.Table.from_arrays(
+            [column.to_arrow() for column in self.columns], names=self.col_headers)
+        return arrow_table.replace_schema_metadata({'daptics': json.dumps(self.metadata)})
+
+    @classmethod
+    def from_arrow(cls, arrow_table):
+        """Creates a table from a `pyarrow.Table`, such as one created by `to_arrow`.
+        Requires the pyarrow package.
+
+        # Arguments
+        arrow_table (`pyarrow.Table`)
+
+        # Returns
+        table (`Table`)
+        """
+        _require_pyarrow()
+        columns = []
+        for name, chunked in zip(arrow_table.column_names, arrow_table.columns):
+            arrow_array = chunked.combine_chunks() if chunked.num_chunks != 1 else chunked.chunk(0)
+            columns.append(_column_from_arrow(name, arrow_array))
+        metadata = arrow_table.schema.metadata or {}
+        return cls(columns, json.loads(metadata.get(b'daptics', b'{}')))
+
+    def write_parquet(self, fname):
+        """Writes the table to a Parquet file. Requires the pyarrow package."""
+        pyarrow.parquet.write_table(self.to_arrow(), fname)
+
+    @classmethod
+    def read_parquet(cls, fname):
+        """Reads a table from a Parquet file, memory-mapping the file.
+        Requires the pyarrow package."""
+        _require_pyarrow()
+        return cls.from_arrow(pyarrow.parquet.read_table(fname, memory_map=True))
+
+    def write_ipc(self, fname, stream=False):
+        """Writes the table to an Arrow IPC file, which can be memory-mapped by readers,
+        or, if `stream` is True, to an Arrow IPC stream. Requires the pyarrow package."""
+        arrow_table = self.to_arrow()
+        new_writer = pyarrow.ipc.new_stream if stream else pyarrow.ipc.new_file
+        with pyarrow.OSFile(fname, 'wb') as sink:
+            with new_writer(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+
+    @classmethod
+    def read_ipc(cls, fname):
+        """Reads a table from a memory-mapped Arrow IPC file or stream.
+        Requires the pyarrow package."""
+        _require_pyarrow()
+        with pyarrow.memory_map(fname, 'r') as source:
+            try:
+                arrow_table = pyarrow.ipc.open_file(source).read_all()
+            except pyarrow.ArrowInvalid:
+                source.seek(0)
+                arrow_table = pyarrow.ipc.open_stream(source).read_all()
+        return cls.from_arrow(arrow_table)
+
+    def write(self, fname, file_format=None):
+        """Writes the table with `write_parquet` or `write_ipc`.
+
+        # Arguments
+        fname (str):
+            The filesystem path where the file will be written.
+
+        file_format (str, optional):
+            "parquet", "ipc" or "stream". If None, the format is chosen from the
+            extension of `fname` with `arrow_file_format`.
+        """
+        file_format = file_format or arrow_file_format(fname)
+        if file_format == 'parquet':
+            self.write_parquet(fname)
+        elif file_format in ('ipc', 'stream'):
+            self.write_ipc(fname, stream=(file_format == 'stream'))
+        else:
+            raise ValueError('Unknown Arrow file format {}.'.format(file_format))
+
+    @classmethod
+    def read(cls, fname, file_format=None):
+        """Reads a table written by `write`. See `write` for the `file_format` argument."""
+        file_format = file_format or arrow_file_format(fname)
+        if file_format == 'parquet':
+            return cls.read_parquet(fname)
+        return cls.read_ipc(fname)
+
+
+def _column_from_arrow(name, arrow_array):
+    arrow_type = arrow_array.type
+    if pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type):
+        values = array.array('d')
+        floats = arrow_array.cast(pyarrow.float64())
+        if numpy is not None:
+            values.frombytes(floats.to_numpy(zero_copy_only=False).astype(numpy.float64).tobytes())
+        else:
+            values.extend(math.nan if v is None else v for v in floats.to_pylist())
+        return NumericColumn(name, values, integer=pyarrow.types.is_integer(arrow_type))
+    if pyarrow.types.is_dictionary(arrow_type):
+        levels = arrow_array.dictionary.to_pylist()
+        codes = arrow_array.indices.to_pylist()
+        if arrow_array.null_count > 0:
+            null_code = len(levels)
+            levels.append(None)
+            codes = [null_code if code is None else code for code in codes]
+        return FactorColumn(name, levels, array.array('i', codes))
+    return FactorColumn.from_wire(name, arrow_array.to_pylist())
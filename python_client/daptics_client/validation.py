@@ -0,0 +1,266 @@
+"""# Experiments Validation
+
+Checks experiments tables against a validated experimental space on the
+client, so that malformed tables can be corrected before they are uploaded.
+
+Daptics API Version 0.15.1
+Copyright (c) 2024 Daptics Inc.
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), the
+rights to use, copy, modify, merge, publish, and/or distribute, copies of
+the Software, and to permit persons to whom the Software is furnished to do
+so, subject to the following conditions:
+
+You do not have the right to sub-license or sell copies of the Software.
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+IN THE SOFTWARE.
+"""
+
+import math
+
+from .space import SpaceDefinition, _to_float
+from .table import FactorColumn, numpy
+
+RESPONSE_COLUMN = 'Response'
+
+
+class ValidationReport(object):
+    """The result of checking an experiments table with an `ExperimentsValidator`.
+
+    # Attributes
+    errors (list):
+        A list of Python `dict`s, one for each error found, with these items:
+        `row`, the number of the data row (starting at 1 for the first row after the
+        header, or 0 for an error in the header), `column`, the column name (or None
+        if the error is not about a single column), `value`, the value that was
+        rejected, and `message`, a description of the error.
+
+    num_rows (int):
+        The number of data rows that were checked.
+    """
+
+    def __init__(self, errors=None, num_rows=0):
+        self.errors = errors or []
+        self.num_rows = num_rows
+
+    @property
+    def valid(self):
+        """True if no errors were found."""
+        return len(self.errors) == 0
+
+    def __len__(self):
+        return len(self.errors)
+
+    def extend(self, errors, num_rows=0):
+        """Adds the errors and row count from checking another part of a table."""
+        self.errors.extend(errors)
+        self.num_rows += num_rows
+
+    def rows(self):
+        """Returns the sorted numbers of the rows that have errors."""
+        return sorted(set(error['row'] for error in self.errors))
+
+    def format(self, max_errors=10):
+        """Returns a description of the first `max_errors` errors, one per line."""
+        lines = []
+        for error in sorted(self.errors, key=lambda e: e['row'])[:max_errors]:
+            location = 'header' if error['row'] == 0 else 'row {}'.format(error['row'])
+            if error['column'] is not None:
+                location += ', column {}'.format(error['column'])
+            lines.append('{}: {}'.format(location, error['message']))
+        if len(self.errors) > max_errors:
+            lines.append('... and {} more errors'.format(len(self.errors) - max_errors))
+        return '\n'.join(lines)
+
+
+class ExperimentsValidator(object):
+    """An index of the values allowed by a validated experimental space, used to
+    check experiments tables before they are uploaded with `put_experiments`.
+
+    For a "factorial" space, each parameter's value must be one of the parameter's
+    values in the space (compared as numbers for "numerical" parameters). For a "mixture"
+    space, each value must be an integer between the parameter's minimum and maximum,
+    and the values in each row must add up to the space's `totalUnits`. Non-empty
+    responses must be numbers.
+
+    Each column is checked once for each distinct value in the column, rather than once
+    for each row, and rows are then selected with NumPy, if it is installed.
+
+    # Arguments
+    space (dict):
+        The validated experimental space, the `space` item of the client's
+        `validated_params` attribute.
+
+    # Examples
+    ```python
+    >>> validator = ExperimentsValidator(daptics.validated_params['space'])
+    >>> report = validator.validate(experiments)
+    >>> if not report.valid:
+    ...     print(report.format())
+    ```
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.definition = SpaceDefinition(space)
+        self.space_type = self.definition.space_type
+        self.total_units = self.definition.total_units
+        self.params = self.definition.params
+        self.col_headers = self.definition.names + [RESPONSE_COLUMN]
+
+    def check_header(self, col_headers):
+        """Checks the column names of an experiments table. Columns of the space that
+        are missing, and columns that are not in the space, are reported. The columns
+        may be in any order, since `check_rows` finds them by name.
+
+        # Returns
+        errors (list):
+            A list of error `dict`s, as described for `ValidationReport`.
+        """
+        errors = []
+        if list(col_headers) == self.col_headers:
+            return errors
+        missing = [name for name in self.col_headers if name not in col_headers]
+        unknown = [name for name in col_headers if name not in self.col_headers]
+        for name in missing:
+            errors.append(self._error(0, name, None, 'Missing column.'))
+        for name in unknown:
+            errors.append(self._error(0, name, None, 'Unknown column.'))
+        return errors
+
+    def check_rows(self, col_headers, rows, first_row=1, require_responses=False):
+        """Checks the data rows of an experiments table. The header should have been
+        checked with `check_header`; only the columns that are in the space are checked.
+
+        # Arguments
+        col_headers (list):
+            The column names of the table.
+
+        rows (list):
+            The data rows, lists of strings.
+
+        first_row (int, optional):
+            The row number reported for the first row in `rows`, so that a large table
+            can be checked in parts.
+
+        require_responses (bool, optional):
+            If True, report empty responses.
+
+        # Returns
+        errors (list):
+            A list of error `dict`s, as described for `ValidationReport`.
+        """
+        errors = []
+        width = len(col_headers)
+        good = []
+        for i, row in enumerate(rows):
+            if len(row) == width:
+                good.append(row)
+            else:
+                errors.append(self._error(
+                    first_row + i, None, row,
+                    'The row has {} values, but there are {} columns.'.format(len(row), width)))
+        if len(errors) > 0:
+            # Only the rows of the right width are checked by column, so row
+            # numbers must be looked up.
+            row_numbers = [first_row + i for i, row in enumerate(rows) if len(row) == width]
+        else:
+            row_numbers = None
+
+        def row_number(i):
+            return first_row + i if row_numbers is None else row_numbers[i]
+
+        position = {name: j for j, name in enumerate(col_headers)}
+        units = []
+        for param in self.params:
+            name = param.name
+            if name not in position:
+                continue
+            column = FactorColumn.from_wire(name, (row[position[name]] for row in good))
+            if self.space_type == 'mixture':
+                level_units = [param.units(level) for level in column.levels]
+                message = 'Must be an integer from {} to {}.'.format(*param.bounds)
+                units.append((column, level_units))
+            else:
+                level_units = [param.code(level) for level in column.levels]
+                message = 'Must be one of the values of the parameter in the space.'
+            bad = [code for code, value in enumerate(level_units) if value is None]
+            for i in self._rows_with_codes(column, bad):
+                errors.append(self._error(row_number(i), name, column[i], message))
+
+        if RESPONSE_COLUMN in position:
+            column = FactorColumn.from_wire(
+                RESPONSE_COLUMN, (row[position[RESPONSE_COLUMN]] for row in good))
+            bad = [code for code, level in enumerate(column.levels)
+                   if (level != '' and _to_float(level) is None) or
+                   (level == '' and require_responses)]
+            for i in self._rows_with_codes(column, bad):
+                errors.append(self._error(
+                    row_number(i), RESPONSE_COLUMN, column[i], 'Must be a number.'))
+
+        if self.space_type == 'mixture' and self.total_units is not None and len(good) > 0 \
+                and len(units) == len(self.params):
+            for i, total in self._wrong_totals(units, len(good)):
+                errors.append(self._error(
+                    row_number(i), None, total,
+                    'The units add up to {}, but must add up to {}.'.format(
+                        total, self.total_units)))
+        return errors
+
+    def validate(self, table, require_responses=False):
+        """Checks an experiments table.
+
+        # Arguments
+        table (dict):
+            A Python `dict` with `colHeaders` and `data` items.
+
+        require_responses (bool, optional):
+            If True, report empty responses.
+
+        # Returns
+        report (`ValidationReport`)
+        """
+        col_headers = table.get('colHeaders') or []
+        rows = table.get('data') or []
+        report = ValidationReport(self.check_header(col_headers))
+        report.extend(self.check_rows(col_headers, rows, 1, require_responses), len(rows))
+        return report
+
+    def _rows_with_codes(self, column, codes):
+        if len(codes) == 0:
+            return []
+        if numpy is not None:
+            return numpy.flatnonzero(numpy.isin(column.array(), codes)).tolist()
+        codes = set(codes)
+        return [i for i, code in enumerate(column.codes) if code in codes]
+
+    def _wrong_totals(self, units, num_rows):
+        # Rows with an invalid value are already reported, so are not totalled.
+        if numpy is not None:
+            totals = numpy.zeros(num_rows)
+            for column, level_units in units:
+                values = numpy.array([math.nan if u is None else u for u in level_units])
+                totals += values[column.array()]
+            wrong = numpy.flatnonzero(~numpy.isnan(totals) & (totals != self.total_units))
+            return [(i, int(totals[i])) for i in wrong.tolist()]
+        totals = [0] * num_rows
+        for column, level_units in units:
+            for i, code in enumerate(column.codes):
+                if totals[i] is not None:
+                    value = level_units[code]
+                    totals[i] = None if value is None else totals[i] + value
+        return [(i, total) for i, total in enumerate(totals)
+                if total is not None and total != self.total_units]
+
+    def _error(self, row, column, value, message):
+        return {'row': row, 'column': column, 'value': value, 'message': message}
@@ -39,6 +39,8 @@ class Subscription:
         self.coroutine = coroutine
         self.timeout = timeout
         self.kwargs = kwargs
+        self.doc = None
+        self.variables = None
 
     def __repr__(self):
         return {'channel': self.channel, 'timeout': self.timeout}
@@ -75,22 +77,37 @@ class Subscription:
         # print('Returning {}'.format(last_message))
         return last_message
 
+    def drain(self):
+        """
+        Discards any messages that are waiting in the channel's queue,
+        for example updates that arrived while the subscription was not running.
+        """
+        while not self.channel.messages.empty():
+            self.channel.messages.get_nowait()
+
 class Absinthe:
     """
     A context manager that wraps a Phoenix socket. It joins the
     `__absinthe__:control` Phoenix channel on entry, and manages a list
     of subscriptions. On exit, subcriptions are automatically unsubscribed,
     and the manager leaves the Absinthe control channel.
+
+    `max_queue` is the size of the message queue of each subscription
+    channel. Use 0 for an unbounded queue, if the subscription is kept
+    open while it is not running.
     """
-    def __init__(self, socket):
+    def __init__(self, socket, max_queue=2 ** 5):
         self.socket = socket
         self._control = socket.channel(ChannelTopic.absinthe.value)
         self._subscriptions = {}
+        self._max_queue = max_queue
 
     async def join(self):
+        self.socket.add_reconnect_callback(self._resubscribe)
         await self._control.join()
 
     async def leave(self):
+        self.socket.remove_reconnect_callback(self._resubscribe)
         await self.unsubscribe_all()
         await self._control.leave()
 
@@ -107,12 +124,18 @@ class Absinthe:
         await self.join()
         response = await self.push_doc(doc, variables=variables, timeout=10)
         sub_id = self._get_subscription_id(response)
-        sub_channel = self.socket.channel(sub_id)
-        self._subscriptions[sub_id] = Subscription(sub_channel, coroutine, timeout, **kwargs)
+        sub_channel = self.socket.channel(sub_id, max_queue=self._max_queue)
+        subscription = Subscription(sub_channel, coroutine, timeout, **kwargs)
+        subscription.doc = doc
+        subscription.variables = variables
+        self._subscriptions[sub_id] = subscription
         if start:
             await self.run_subscription(sub_id)
         return sub_id
 
+    def get_subscription(self, sub_id):
+        return self._subscriptions.get(sub_id)
+
     async def run_subscription(self, sub_id):
         if sub_id in self._subscriptions:
             sub = self._subscriptions[sub_id]
@@ -120,18 +143,34 @@ class Absinthe:
 
     async def unsubscribe(self, sub_id):
         if sub_id in self._subscriptions:
-            del self._subscriptions[sub_id]
-            await self._do_unsubscribe(sub_id)
+            sub = self._subscriptions.pop(sub_id)
+            await self._do_unsubscribe(sub)
 
     async def unsubscribe_all(self):
-        subs = self._subscriptions.keys()
+        subs = self._subscriptions.values()
         self._subscriptions = {}
-        for sub_id in subs:
-            await self._do_unsubscribe(sub_id)
-
-    async def _do_unsubscribe(self, sub_id):
+        for sub in subs:
+            await self._do_unsubscribe(sub)
+
+    async def _do_unsubscribe(self, sub):
+        # After a reconnect, the server's subscription id is the
+        # topic of the subscription channel.
+        topic = sub.channel.topic
+        self.socket.remove_channel(topic)
         await self._control.push(AbsintheEvent.unsubscribe.value,
-            {'subscriptionId': sub_id})
+            {'subscriptionId': topic})
+
+    async def _resubscribe(self):
+        """
+        Called by the socket after it reconnects. The server has forgotten
+        the subscriptions, so subscribe again with the same documents and move
+        each subscription channel to its new subscription id. Subscriptions
+        keep the ids returned by `subscribe`.
+        """
+        for sub in list(self._subscriptions.values()):
+            response = await self.push_doc(sub.doc, variables=sub.variables, timeout=10)
+            new_id = self._get_subscription_id(response)
+            sub.channel = self.socket.rename_channel(sub.channel.topic, new_id)
 
     async def __aenter__(self):
         await self.join()
@@ -47,7 +47,7 @@ import urllib
 import websockets
 from async_timeout import timeout as atimeout
 
-from .channel import Channel
+from .channel import Channel, State
 from .exceptions import ConnectionClosed, CommunicationError
 from .message import PhoenixEvent, str_to_msg
 
@@ -58,7 +58,18 @@ logger = logging.getLogger(__name__)
 
 
 class Phoenix:
-    def __init__(self, url, params=None, loop=None, heartbeat_secs=30, timeout_secs=3, ssl=None):
+    """
+    If the connection is lost unexpectedly and `reconnect` is True, the socket
+    tries to reconnect up to `max_reconnect_tries` times, waiting
+    `reconnect_backoff_secs` before the first try and doubling the wait
+    (up to `max_reconnect_backoff_secs`) after each failure. Channels that
+    were joined are joined again, and coroutine functions registered with
+    `add_reconnect_callback` are then awaited. Pushes that are waiting for
+    a reply when the connection is lost fail at once with a `CommunicationError`.
+    """
+    def __init__(self, url, params=None, loop=None, heartbeat_secs=30, timeout_secs=3, ssl=None,
+                 reconnect=True, max_reconnect_tries=5, reconnect_backoff_secs=0.5,
+                 max_reconnect_backoff_secs=30):
         if loop is None:
             loop = asyncio.get_event_loop()
         self.loop = loop
@@ -76,10 +87,22 @@ class Phoenix:
         self._connection_lost = False
         self._timeout_secs = timeout_secs
         self._ssl = ssl
+        self._auto_reconnect = reconnect
+        self._max_reconnect_tries = max_reconnect_tries
+        self._reconnect_backoff_secs = reconnect_backoff_secs
+        self._max_reconnect_backoff_secs = max_reconnect_backoff_secs
+        self._reconnect_callbacks = []
+        self._reconnect_future = None
+        self._closing = False
 
     async def connect(self):
         if self.connected:
             return
+        self._closing = False
+        self._reconnect_tries = 0
+        await self._open()
+
+    async def _open(self):
         try:
             url_parts = [self.url]
             if self.params:
@@ -88,11 +111,11 @@ class Phoenix:
                     url_parts.append(qs)
             url_with_params = '?'.join(url_parts)
             logger.info('connect to {}'.format(url_with_params))
-            self.connected = True
             async with atimeout(self._timeout_secs * 2, loop=self.loop):
                 self._socket = await websockets.connect(url_with_params,
                                                         ssl=self._ssl,
                                                         loop=self.loop)
+            self.connected = True
             self._coroutines = [asyncio.ensure_future(self.recv(), loop=self.loop),
                                 asyncio.ensure_future(self.heartbeat(), loop=self.loop),
                                 asyncio.ensure_future(self.wait_for_disconnection(), loop=self.loop)]
@@ -104,6 +127,9 @@ class Phoenix:
             raise TimeoutError('timeout in opening a websocket')
 
     async def disconnect(self):
+        self._closing = True
+        if self.reconnecting and self._reconnect_future is not asyncio.current_task(self.loop):
+            self._reconnect_future.cancel()
         if not self.connected:
             return
 
@@ -122,6 +148,88 @@ class Phoenix:
         for co in self._coroutines:
             co.cancel()
         self._coroutines = []
+        self._fail_waited_messages('disconnected')
+
+    @property
+    def reconnecting(self):
+        return self._reconnect_future is not None and not self._reconnect_future.done()
+
+    async def wait_for_reconnect(self):
+        if self.reconnecting:
+            await asyncio.shield(self._reconnect_future)
+
+    def add_reconnect_callback(self, callback):
+        if callback not in self._reconnect_callbacks:
+            self._reconnect_callbacks.append(callback)
+
+    def remove_reconnect_callback(self, callback):
+        if callback in self._reconnect_callbacks:
+            self._reconnect_callbacks.remove(callback)
+
+    def _fail_waited_messages(self, reason):
+        waited_messages = self._waited_messages
+        self._waited_messages = {}
+        for future in waited_messages.values():
+            if not future.done():
+                future.set_exception(CommunicationError(reason))
+
+    def _start_reconnect(self):
+        if self._closing or not self._auto_reconnect:
+            return False
+        if not self.reconnecting:
+            self._fail_waited_messages('connection lost')
+            self._reconnect_future = asyncio.ensure_future(self._reconnect(), loop=self.loop)
+        return True
+
+    async def _reconnect(self):
+        for co in self._coroutines:
+            co.cancel()
+        self._coroutines = []
+        self.connected = False
+
+        while self._reconnect_tries < self._max_reconnect_tries and not self._closing:
+            delay = min(self._reconnect_backoff_secs * 2 ** self._reconnect_tries,
+                        self._max_reconnect_backoff_secs)
+            self._reconnect_tries += 1
+            logger.info('reconnect in {:.1f}s, try {}/{}'.format(
+                delay, self._reconnect_tries, self._max_reconnect_tries))
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+                await self._rejoin_channels()
+                for callback in list(self._reconnect_callbacks):
+                    await callback()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning('failed to reconnect', exc_info=True)
+                await self._close_socket()
+                continue
+            self._reconnect_tries = 0
+            logger.info('reconnected')
+            return
+
+        logger.error('could not reconnect')
+        self._closing = True
+        self._connection_lost = True
+        self._remove_all_channels()
+        await self._close_socket()
+
+    async def _rejoin_channels(self):
+        for channel in list(self._channels.values()):
+            if channel.status != State.CLOSED:
+                channel.status = State.CLOSED
+                channel.join_ref = None
+                await channel.join()
+
+    async def _close_socket(self):
+        self.connected = False
+        for co in self._coroutines:
+            co.cancel()
+        self._coroutines = []
+        self._fail_waited_messages('connection lost')
+        if self._socket is not None:
+            await self._socket.close()
 
     def channel(self, topic, params=None, channel_t=Channel, **kwargs):
         try:
@@ -136,6 +244,22 @@ class Phoenix:
     def remove_channel(self, topic):
         self._channels.pop(topic, None)
 
+    def rename_channel(self, topic, new_topic):
+        """
+        Moves a channel to a new topic, keeping its message queue. Messages that
+        already arrived for the new topic are added to the queue.
+        """
+        channel = self._channels.pop(topic, None)
+        if channel is None:
+            return self.channel(new_topic)
+        early = self._channels.pop(new_topic, None)
+        channel.topic = new_topic
+        self._channels[new_topic] = channel
+        if early is not None:
+            while not early.messages.empty():
+                channel.messages.put_nowait(early.messages.get_nowait())
+        return channel
+
     def _remove_all_channels(self):
         self._channels.clear()
 
@@ -235,14 +359,16 @@ class Phoenix:
                             unkown_channel = self.channel(message.topic)
                         await self._channels[message.topic].messages.put(message)
         except ConnectionClosed:
-            pass
+            self._start_reconnect()
         except Exception:
             logger.error('Error in data transfer', exc_info=True)
-            await asyncio.shield(self.disconnect(), loop=self.loop)
+            if not self._start_reconnect():
+                await asyncio.shield(self.disconnect(), loop=self.loop)
 
     async def wait_for_disconnection(self):
         await self._socket.connection_lost_waiter
-        await self.disconnect()
+        if not self._start_reconnect():
+            await self.disconnect()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._do_exit(exc_type)
@@ -32,5 +32,10 @@ setuptools.setup(
     python_requires='>=3.7',
     install_requires=[
         'requests>=2.22', 'gql>=2,<3', 'async-timeout>=3', 'websockets>=9'
-    ]
+    ],
+    extras_require={
+        'async': ['aiohttp>=3.6'],
+        'arrow': ['pyarrow>=6'],
+        'numpy': ['numpy>=1.17']
+    }
 )